@@ -1,4 +1,4 @@
-import { PredictionRequest, PredictionResult } from '@/types';
+import { InferenceTier, PredictionRequest, PredictionResult, SchedulePage, ScheduleQuery, SlatePrediction, TeamProfile } from '@/types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -24,3 +24,62 @@ export async function predictWinner(request: PredictionRequest): Promise<Predict
     throw error;
   }
 }
+
+// Streams predictions for every game in [start, end] (YYYY-MM-DD), calling
+// onPrediction as each NDJSON line arrives instead of one POST per game.
+export async function streamSlatePredictions(
+  start: string,
+  end: string,
+  onPrediction: (prediction: SlatePrediction) => void,
+  tier: InferenceTier = 'full',
+): Promise<void> {
+  const params = new URLSearchParams({ start, end, tier });
+  const response = await fetch(`${API_BASE_URL}/api/predictions/stream/?${params}`);
+
+  if (!response.ok || !response.body) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split('\n');
+    buffered = lines.pop() ?? '';
+    lines.filter(line => line.trim()).forEach(line => onPrediction(JSON.parse(line)));
+  }
+
+  if (buffered.trim()) {
+    onPrediction(JSON.parse(buffered));
+  }
+}
+
+// One page of games with their predictions already joined in. Pass the
+// previous page's next_cursor to continue; the browser revalidates with ETags.
+export async function getSchedulePage(query: ScheduleQuery = {}): Promise<SchedulePage> {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined && value !== '') params.set(key, String(value));
+  });
+
+  const response = await fetch(`${API_BASE_URL}/api/schedule/?${params}`);
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+  }
+  return response.json();
+}
+
+export async function getTeamProfile(abbreviation: string): Promise<TeamProfile> {
+  const response = await fetch(`${API_BASE_URL}/api/teams/${abbreviation}/`);
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+  }
+  return response.json();
+}
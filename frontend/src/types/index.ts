@@ -118,6 +118,7 @@ export interface TeamStats {
   def_reb: number;
   turnovers: number;
   ast_to_to_ratio: number;
+  elo: number;
 }
 
 export interface HeadToHead {
@@ -131,7 +132,8 @@ export interface HeadToHead {
 export interface PredictionResult {
   winner: string;
   confidence: number;
-  model_type: 'ML' | 'rule-based';
+  model_type: 'ML' | 'linear' | 'elo';
+  tier: InferenceTier;
   team1_win_probability?: number;
   team2_win_probability?: number;
   team1_stats: TeamStats;
@@ -139,9 +141,89 @@ export interface PredictionResult {
   head_to_head: HeadToHead;
 }
 
+export interface SlatePrediction {
+  game_id: string;
+  game_date: string;
+  status: string;
+  home_team: string;
+  away_team: string;
+  winner?: string;
+  confidence?: number;
+  model_type?: 'ML' | 'linear' | 'elo';
+  tier?: InferenceTier;
+  home_win_probability?: number;
+  away_win_probability?: number;
+  error?: string;
+}
+
+export interface ScheduledGamePrediction {
+  predicted_winner: string;
+  home_win_probability: number;
+  away_win_probability: number;
+  confidence: number;
+  model_version: string;
+  is_correct: boolean | null;
+}
+
+export interface ScheduledGame {
+  game_id: string;
+  game_date: string;
+  status: string;
+  home_team: string;
+  away_team: string;
+  home_score: number | null;
+  away_score: number | null;
+  prediction: ScheduledGamePrediction | null;
+}
+
+export interface SchedulePage {
+  results: ScheduledGame[];
+  next_cursor: string | null;
+}
+
+export interface ScheduleQuery {
+  start?: string;
+  end?: string;
+  team?: string;
+  limit?: number;
+  cursor?: string;
+}
+
+export interface TeamSeasonProfile extends Omit<TeamStats, 'abbreviation' | 'elo'> {
+  home_wins: number;
+  home_losses: number;
+  away_wins: number;
+  away_losses: number;
+}
+
+export interface RecentGame {
+  game_date: string;
+  opponent: string;
+  home: boolean;
+  result: 'W' | 'L';
+  points: number;
+  opponent_points: number;
+}
+
+export interface TeamProfile {
+  abbreviation: string;
+  data_version: string;
+  model_type: 'ML' | 'linear' | 'elo';
+  current: TeamStats;
+  seasons: Record<string, TeamSeasonProfile>;
+  recent_form: { wins: number; losses: number; games: RecentGame[] };
+  head_to_head: Record<string, { wins: number; losses: number; total: number; win_pct: number }>;
+  odds: Record<string, { home: number; away: number }>;
+}
+
+// 'fast' is the linear model (single dot product), 'full' the random forest
+export type InferenceTier = 'fast' | 'full';
+
 export interface PredictionRequest {
   team1: string;
   team2: string;
+  tier?: InferenceTier;
+  latency_budget_ms?: number;
 }
 
 export interface AppState {
@@ -0,0 +1,305 @@
+"""
+Walk-forward backtest over the training data
+
+Replays nba_training_data.csv in date order. At the start of every period
+(a week or a month) a forest is trained on every earlier game and scored
+on the games of that period, so each prediction only uses what was known
+on the day. Folds are independent and run in parallel processes.
+
+The CSV's team stats are season-end aggregates, which would leak the
+outcome of later games, so each row is rebuilt as of its game date:
+
+    record, recent form and points   the team's games earlier that season
+    shooting, rebounds, turnovers     the team's previous-season values (the
+                                      league average of the season for the
+                                      first season, so no team is singled out)
+    Elo                               pre-game ratings, as in train_model.py
+    head-to-head                      earlier meetings only
+
+The as-of matrix is cached under backtest_cache/, keyed by the CSV's
+contents, so repeated runs only pay for the folds. Per-period accuracy,
+Brier score and expected calibration error (with an Elo-only baseline)
+go to nba_backtest.csv; the overall calibration table and the run's stage
+timings go to nba_backtest.report.json.
+
+Usage (after training_data.py, from the nba_ai/ project directory):
+
+    python backtest.py
+    python backtest.py --interval month --workers 4 --min-train 1000
+"""
+import argparse
+import hashlib
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import brier_score_loss
+from sklearn.preprocessing import MinMaxScaler
+
+from predictor.features import MATCHUP_WEIGHT, SEASON_WEIGHT, TEAM_STAT_KEYS, model_columns
+from predictor.runreport import RunReport
+from train_model import SEASON_FEATURES, add_elo_features
+
+TRAINING_DATA_FILE = 'nba_training_data.csv'
+RESULTS_FILE = 'nba_backtest.csv'
+CACHE_DIR = 'backtest_cache'
+# Bump when the as-of feature construction changes, so old caches are ignored
+ASOF_VERSION = 1
+
+INTERVALS = {'week': 'W-SUN', 'month': 'M'}  # weeks run Monday to Sunday
+CALIBRATION_BINS = 10
+
+# Stats rebuilt from earlier games of the season; the rest come from the previous season
+SEASON_TO_DATE_KEYS = ['wins', 'losses', 'win_pct', 'recent_win_pct', 'avg_pts', 'avg_pts_allowed']
+
+
+def team_games(df):
+    """One row per team per game: row, team, season, date, points for and against, won"""
+    sides = []
+    for side, other in (('team1', 'team2'), ('team2', 'team1')):
+        sides.append(pd.DataFrame({
+            'row': np.arange(len(df)), 'side': side, 'team': df[f'{side}_abbr'].to_numpy(),
+            'season': df['season'].to_numpy(), 'game_date': df['game_date'].to_numpy(),
+            'pts': df[f'{side}_score'].to_numpy(), 'pts_allowed': df[f'{other}_score'].to_numpy(),
+            'won': (df[f'{side}_score'] > df[f'{other}_score']).to_numpy().astype(float),
+        }))
+    return pd.concat(sides, ignore_index=True).sort_values(['team', 'season', 'game_date', 'row'], kind='stable')
+
+
+def season_to_date_stats(games):
+    """SEASON_TO_DATE_KEYS for each team game from that team's earlier games of the season"""
+    by_team_season = games.groupby(['team', 'season'], sort=False)
+    played = by_team_season.cumcount()
+    wins = by_team_season['won'].cumsum() - games['won']
+    stats = pd.DataFrame(index=games.index)
+    stats['wins'] = wins
+    stats['losses'] = played - wins
+    stats['win_pct'] = np.where(played > 0, wins / played.where(played > 0, 1), 0)
+    stats['recent_win_pct'] = by_team_season['won'].transform(
+        lambda won: won.shift(1).rolling(5, min_periods=1).mean()
+    )
+    for key, column in (('avg_pts', 'pts'), ('avg_pts_allowed', 'pts_allowed')):
+        stats[key] = by_team_season[column].transform(lambda values: values.shift(1).expanding().mean())
+    return stats
+
+
+def season_aggregates(df):
+    """{(team, season): {stat: season-end value}} as stored in the CSV"""
+    aggregates = {}
+    for side in ('team1', 'team2'):
+        columns = [f'{side}_{key}' for key in TEAM_STAT_KEYS]
+        for (team, season), row in df.groupby([f'{side}_abbr', 'season'])[columns].first().iterrows():
+            aggregates[(team, season)] = dict(zip(TEAM_STAT_KEYS, row.to_numpy()))
+    return aggregates
+
+
+def asof_frame(df):
+    """df with every model feature replaced by its value as of the game date (see module docstring)"""
+    df = df.reset_index(drop=True).copy()
+    games = team_games(df)
+    to_date = season_to_date_stats(games)
+
+    aggregates = season_aggregates(df)
+    seasons = sorted(df['season'].unique())
+    previous = dict(zip(seasons[1:], seasons[:-1]))
+    league = {
+        season: pd.DataFrame([stats for (_, s), stats in aggregates.items() if s == season]).mean().to_dict()
+        for season in seasons
+    }
+
+    def prior(team, season, key):
+        """The team's previous-season value, else the league average of this season"""
+        before = aggregates.get((team, previous.get(season)))
+        return before[key] if before is not None else league[season][key]
+
+    for key in TEAM_STAT_KEYS:
+        if key in SEASON_TO_DATE_KEYS:
+            values = to_date[key].copy()
+            # A team's first game of a season has no earlier games
+            missing = values.isna()
+            values[missing] = [
+                prior(team, season, key) for team, season in games.loc[missing, ['team', 'season']].values
+            ]
+        else:
+            values = pd.Series(
+                [prior(team, season, key) for team, season in games[['team', 'season']].values], index=games.index,
+            )
+        for side in ('team1', 'team2'):
+            mine = (games['side'] == side).to_numpy()
+            df.loc[games.loc[mine, 'row'].to_numpy(), f'{side}_{key}'] = values[mine].to_numpy()
+
+    df = add_elo_features(df)
+
+    # Head-to-head from earlier meetings only
+    wins = Counter()
+    team1_wins, team2_wins = np.zeros(len(df)), np.zeros(len(df))
+    for i in df['game_date'].argsort(kind='stable'):
+        team1, team2 = df.at[i, 'team1_abbr'], df.at[i, 'team2_abbr']
+        team1_wins[i], team2_wins[i] = wins[(team1, team2)], wins[(team2, team1)]
+        wins[(team1, team2) if df.at[i, 'team1_score'] > df.at[i, 'team2_score'] else (team2, team1)] += 1
+    total = team1_wins + team2_wins
+    df['team1_matchup_win_pct'] = np.divide(team1_wins, total, out=np.full(len(df), 0.5), where=total > 0)
+    df['team2_matchup_win_pct'] = np.divide(team2_wins, total, out=np.full(len(df), 0.5), where=total > 0)
+    return df
+
+
+def cache_path(csv_path):
+    with open(csv_path, 'rb') as f:
+        digest = hashlib.sha1(f.read())
+    digest.update(f"{ASOF_VERSION}|{','.join(model_columns())}".encode())
+    return os.path.join(CACHE_DIR, f"asof_{digest.hexdigest()[:16]}.npz")
+
+
+def load_asof_matrix(csv_path=TRAINING_DATA_FILE):
+    """(X, y, dates, Elo probabilities, cache path, whether it was cached) for the CSV's games.
+
+    X holds the unscaled as-of features in model_columns() order.
+    """
+    path = cache_path(csv_path)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return data['X'], data['y'], data['dates'], data['elo'], path, True
+
+    df = asof_frame(pd.read_csv(csv_path))
+    X = df[model_columns()].to_numpy(dtype=float)
+    y = df['winner'].to_numpy()
+    dates = pd.to_datetime(df['game_date']).to_numpy()
+    elo = df['elo_win_prob'].to_numpy()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    np.savez(path, X=X, y=y, dates=dates, elo=elo)
+    return X, y, dates, elo, path, False
+
+
+def calibration_bins(y, probabilities, bins=CALIBRATION_BINS):
+    """[(bin low, bin high, games, mean predicted, observed rate)] for non-empty probability bins"""
+    index = np.minimum((probabilities * bins).astype(int), bins - 1)
+    rows = []
+    for b in range(bins):
+        mine = index == b
+        if mine.any():
+            rows.append((b / bins, (b + 1) / bins, int(mine.sum()),
+                         float(probabilities[mine].mean()), float(y[mine].mean())))
+    return rows
+
+
+def expected_calibration_error(y, probabilities):
+    """Games-weighted mean gap between predicted and observed win rates over the calibration bins"""
+    bins = calibration_bins(y, probabilities)
+    return sum(n * abs(predicted - observed) for _, _, n, predicted, observed in bins) / len(y)
+
+
+def weighted(X, scaler):
+    """The train_model.py weighting of unscaled as-of rows"""
+    n_season = len(SEASON_FEATURES)
+    return np.hstack([scaler.transform(X[:, :n_season]) * SEASON_WEIGHT, X[:, n_season:] * MATCHUP_WEIGHT])
+
+
+_matrix = {}
+
+
+def _load_worker(path):
+    with np.load(path) as data:
+        _matrix.update(X=data['X'], y=data['y'])
+
+
+def run_fold(fold):
+    """Train on fold['train'] rows, score fold['test'] rows; returns metrics and probabilities"""
+    X, y = _matrix['X'], _matrix['y']
+    train, test = fold['train'], fold['test']
+    start = time.perf_counter()
+    scaler = MinMaxScaler().fit(X[train, :len(SEASON_FEATURES)])
+    model = RandomForestClassifier(n_estimators=fold['trees'], random_state=42, n_jobs=1)
+    model.fit(weighted(X[train], scaler), y[train])
+    probabilities = model.predict_proba(weighted(X[test], scaler))[:, 1]
+    return {**{key: fold[key] for key in ('period', 'start', 'end')}, 'train_games': len(train),
+            'probabilities': probabilities, 'fit_s': round(time.perf_counter() - start, 3)}
+
+
+def walk_forward_folds(dates, interval, min_train, trees):
+    """One fold per period with games: train on every earlier game, test on the period's games"""
+    periods = pd.PeriodIndex(pd.DatetimeIndex(dates), freq=INTERVALS[interval])
+    folds = []
+    for period in sorted(set(periods)):
+        test = np.flatnonzero(periods == period)
+        train = np.flatnonzero(dates < period.start_time.to_datetime64())
+        if len(train) >= min_train:
+            folds.append({'period': str(period), 'start': str(period.start_time.date()),
+                          'end': str(period.end_time.date()), 'train': train, 'test': test, 'trees': trees})
+    return folds
+
+
+def period_metrics(result, y, elo):
+    probabilities = result['probabilities']
+    return {
+        'period': result['period'], 'start': result['start'], 'end': result['end'],
+        'train_games': result['train_games'], 'games': len(y),
+        'accuracy': round(float(((probabilities > 0.5) == y).mean()), 4),
+        'brier': round(brier_score_loss(y, probabilities, pos_label=1), 4),
+        'ece': round(expected_calibration_error(y, probabilities), 4),
+        'elo_accuracy': round(float(((elo > 0.5) == y).mean()), 4),
+        'elo_brier': round(brier_score_loss(y, elo, pos_label=1), 4),
+        'fit_s': result['fit_s'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interval', choices=list(INTERVALS), default='week', help='retrain at the start of every')
+    parser.add_argument('--min-train', type=int, default=500, help='games needed before the first scored period')
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='fold processes')
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    report = RunReport('backtest', args.output)
+    with report.stage('asof_features') as stage:
+        X, y, dates, elo, path, cached = load_asof_matrix()
+        stage.update(rows=len(X), cached=cached)
+    print(f"As-of features for {len(X)} games {'loaded from' if cached else 'saved to'} {path}")
+
+    folds = walk_forward_folds(dates, args.interval, args.min_train, args.trees)
+    if not folds:
+        raise SystemExit(f"No {args.interval} has {args.min_train} earlier games to train on")
+    print(f"{len(folds)} {args.interval}ly folds on {args.workers} worker(s)...")
+    with report.stage('folds', folds=len(folds), workers=args.workers):
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_load_worker, initargs=(path,)) as pool:
+            results = list(pool.map(run_fold, folds))
+
+    rows = [period_metrics(result, y[fold['test']], elo[fold['test']]) for fold, result in zip(folds, results)]
+    pd.DataFrame(rows).to_csv(args.output, index=False)
+
+    print(f"\n{'period':<24} {'train':>6} {'games':>6} {'acc':>6} {'brier':>7} {'ece':>6} {'elo acc':>8} {'elo brier':>10}")
+    for row in rows:
+        print(f"{row['period']:<24} {row['train_games']:>6} {row['games']:>6} {row['accuracy']:>6.3f} "
+              f"{row['brier']:>7.4f} {row['ece']:>6.3f} {row['elo_accuracy']:>8.3f} {row['elo_brier']:>10.4f}")
+
+    tested = np.concatenate([fold['test'] for fold in folds])
+    probabilities = np.concatenate([result['probabilities'] for result in results])
+    overall = {
+        'games': len(tested),
+        'accuracy': round(float(((probabilities > 0.5) == y[tested]).mean()), 4),
+        'brier': round(brier_score_loss(y[tested], probabilities, pos_label=1), 4),
+        'ece': round(expected_calibration_error(y[tested], probabilities), 4),
+        'elo_accuracy': round(float(((elo[tested] > 0.5) == y[tested]).mean()), 4),
+        'elo_brier': round(brier_score_loss(y[tested], elo[tested], pos_label=1), 4),
+    }
+    calibration = calibration_bins(y[tested], probabilities)
+    print(f"\nOverall on {overall['games']} games: accuracy {overall['accuracy']:.3f}, Brier {overall['brier']:.4f}, "
+          f"ECE {overall['ece']:.3f} (Elo alone: accuracy {overall['elo_accuracy']:.3f}, Brier {overall['elo_brier']:.4f})")
+    print(f"\n{'predicted':<12} {'games':>6} {'mean':>6} {'observed':>9}")
+    for low, high, n, predicted, observed in calibration:
+        print(f"{low:.1f}-{high:.1f}      {n:>6} {predicted:>6.3f} {observed:>9.3f}")
+    print(f"\nPer-period results saved to {args.output}")
+
+    report.details.update(interval=args.interval, trees=args.trees, min_train=args.min_train, **overall,
+                          calibration=[dict(zip(('low', 'high', 'games', 'predicted', 'observed'), row))
+                                       for row in calibration])
+    report.save()
+
+
+if __name__ == "__main__":
+    main()
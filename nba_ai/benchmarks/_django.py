@@ -0,0 +1,27 @@
+"""
+Django bootstrap shared by the benchmark scripts
+"""
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None, migrate=False):
+    """Configure Django, optionally pointing the default database at db_path"""
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nba_ai.settings')
+
+    import django
+    from django.conf import settings
+
+    if db_path is not None:
+        # Connections are opened lazily, so this must happen before first use
+        settings.DATABASES['default']['NAME'] = str(db_path)
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
@@ -0,0 +1,73 @@
+"""
+Response format benchmark for predict_winner
+
+Bytes on the wire and CPU time per response for every representation a
+client can negotiate: JSON or MessagePack (Accept / ?format=), the full
+response or the probabilities-only shape (`fields=`), each sent as is or
+compressed with gzip or Brotli (Accept-Encoding). Formats whose optional
+package (msgpack, brotli) is not installed are skipped.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.bench_formats --iterations 20000
+"""
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks._django import setup_django
+from benchmarks.bench_serialization import measure, sample_team_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    from predictor.compression import ENCODINGS, compress
+    from predictor.encoding import FORMATS, msgpack
+
+    rng = np.random.default_rng(42)
+    team1_stats, team2_stats = sample_team_stats('BOS', rng), sample_team_stats('LAL', rng)
+    h2h = {'team1_wins': 7, 'team2_wins': 5, 'total': 12, 'team1_win_pct': 7 / 12, 'team2_win_pct': 5 / 12}
+    core = {
+        'winner': 'BOS', 'confidence': 63.0, 'model_type': 'ML', 'tier': 'full',
+        'team1_win_probability': 63.0, 'team2_win_probability': 37.0,
+    }
+
+    renders = []
+    for body_format in ['json', 'msgpack'] if msgpack is not None else ['json']:
+        encode, splice_body, response_class = FORMATS[body_format]
+        # Team stat blocks are encoded once at data load in predictor.inference
+        team1_bytes, team2_bytes = encode(team1_stats), encode(team2_stats)
+
+        def full(encode=encode, splice_body=splice_body, response_class=response_class,
+                 team1_bytes=team1_bytes, team2_bytes=team2_bytes):
+            return response_class(splice_body(core, {
+                'team1_stats': team1_bytes, 'team2_stats': team2_bytes, 'head_to_head': encode(h2h),
+            })).content
+
+        def probabilities_only(splice_body=splice_body, response_class=response_class):
+            return response_class(splice_body(core)).content
+
+        renders += [(f"{body_format}", full), (f"{body_format} fields=(none)", probabilities_only)]
+
+    if msgpack is not None:
+        assert msgpack.unpackb(renders[2][1]()) == json.loads(renders[0][1]())
+
+    print(f"{args.iterations} iterations; codings: identity, {', '.join(reversed(ENCODINGS))}\n")
+    print(f"{'format':<26} {'coding':<9} {'cpu us/resp':>12} {'bytes':>8}")
+    for name, render in renders:
+        for encoding in [None, *reversed(ENCODINGS)]:
+            if encoding is None:
+                cpu_us, size = measure(render, args.iterations)
+            else:
+                cpu_us, size = measure(lambda render=render, encoding=encoding: compress(render(), encoding),
+                                       args.iterations)
+            print(f"{name:<26} {encoding or 'identity':<9} {cpu_us:>12.2f} {size:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Data/model pipeline micro-benchmarks at 1x, 10x and 100x the real dataset
+
+Stages and what "size" means for each:
+
+    aggregate   training_data.compute_team_stats on one season's game log
+                with 1230 * scale games (per-season cost is what grows)
+    pair        training_data.build_training_rows on the same log
+    matchup     train_model.add_matchup_stats on a 3690 * scale row frame
+    elo         train_model.add_elo_features on the same frame
+    fit         RandomForestClassifier(100 trees) on that frame
+    predict_1   single-row predict_proba latency
+    predict_1k  1000-row batched predict_proba
+    ingest      utils.ingest_scoreboard_games of 123 * scale finished games
+                into a throwaway SQLite database
+
+For every stage the growth exponent between consecutive scales is printed
+(1.0 = linear, 2.0 = quadratic), and anything clearly superlinear is
+flagged. A stage stops scaling once a run exceeds --budget seconds.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.bench_pipeline --scales 1,10,100 --budget 60
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._django import setup_django
+from benchmarks import synthetic
+
+SUPERLINEAR_EXPONENT = 1.3
+
+
+def timed(fn, repeat=1):
+    """Median seconds of fn() with its stdout swallowed"""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+class Stages:
+    """Builds the inputs for one scale and times each stage on them"""
+
+    def __init__(self, scale):
+        import training_data
+        import train_model
+
+        self.scale = scale
+        self.training_data = training_data
+        self.train_model = train_model
+        self._log = self._frame = self._model = self._X = None
+
+    @property
+    def log(self):
+        if self._log is None:
+            self._log = synthetic.league_game_log(games=synthetic.GAMES_PER_SEASON * self.scale)
+        return self._log
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            self._frame = synthetic.training_frame(scale=self.scale)
+        return self._frame
+
+    @property
+    def X(self):
+        if self._X is None:
+            frame = self.frame.copy()
+            frame['team1_matchup_win_pct'] = 0.5
+            frame['team2_matchup_win_pct'] = 0.5
+            frame = self.train_model.add_elo_features(frame)
+            self._X, self._y, _ = self.train_model.build_feature_matrix(frame)
+        return self._X
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sklearn.ensemble import RandomForestClassifier
+            self._model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1).fit(self.X, self._y)
+        return self._model
+
+    def aggregate(self):
+        log = self.log
+        return timed(lambda: self.training_data.compute_team_stats(log))
+
+    def pair(self):
+        log = self.log
+        stats = self.training_data.compute_team_stats(log)
+        return timed(lambda: self.training_data.build_training_rows(log, stats, '2024-25'))
+
+    def matchup(self):
+        frame = self.frame
+        return timed(lambda: self.train_model.add_matchup_stats(frame.copy()))
+
+    def elo(self):
+        frame = self.frame
+        return timed(lambda: self.train_model.add_elo_features(frame.copy()))
+
+    def fit(self):
+        from sklearn.ensemble import RandomForestClassifier
+        X, y = self.X, self._y
+        return timed(lambda: RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1).fit(X, y))
+
+    def predict_1(self):
+        model, row = self.model, self.X[:1]
+        return timed(lambda: model.predict_proba(row), repeat=50)
+
+    def predict_1k(self):
+        model, rows = self.model, self.X[:1000]
+        return timed(lambda: model.predict_proba(rows), repeat=5)
+
+    def ingest(self):
+        from django.db import connection
+        from predictor.models import Team, Season, Game
+        from predictor.utils import ingest_scoreboard_games
+
+        Game.objects.all().delete()
+        if not Team.objects.exists():
+            Team.objects.bulk_create([
+                Team(nba_team_id=team_id, abbreviation=abbr, city=city, name=name,
+                     conference=conference, division=division)
+                for team_id, abbr, city, name, conference, division in synthetic.TEAMS
+            ])
+        season, _ = Season.objects.get_or_create(
+            year='2024-25', defaults={'start_date': '2024-10-22', 'end_date': '2025-04-13'},
+        )
+        frame = synthetic.scoreboard_frame(games=synthetic.GAMES_PER_SEASON // 10 * self.scale)
+        elapsed = timed(lambda: ingest_scoreboard_games(frame, season))
+        connection.close()
+        return elapsed
+
+
+STAGES = ['aggregate', 'pair', 'matchup', 'elo', 'fit', 'predict_1', 'predict_1k', 'ingest']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='1,10,100', help='comma-separated size multipliers')
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--budget', type=float, default=60.0, help='stop scaling a stage once a run takes longer')
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    stages = args.stages.split(',')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'pipeline.sqlite3', migrate=True)
+
+        results = {stage: {} for stage in stages}
+        exhausted = set()
+        for scale in scales:
+            runner = Stages(scale)
+            for stage in stages:
+                if stage in exhausted:
+                    results[stage][scale] = None
+                    continue
+                seconds = getattr(runner, stage)()
+                results[stage][scale] = seconds
+                print(f"  {stage:<11} x{scale:<4} {seconds * 1000:>12.2f} ms", flush=True)
+                if seconds > args.budget:
+                    exhausted.add(stage)
+
+    print(f"\n{'stage':<11}" + ''.join(f"{'x' + str(scale):>14}" for scale in scales) + f"{'exponent':>10}")
+    report = {}
+    for stage in stages:
+        timings = results[stage]
+        cells = ''.join(
+            f"{timings[scale] * 1000:>11.2f} ms" if timings.get(scale) is not None else f"{'skipped':>14}"
+            for scale in scales
+        )
+        measured = [(scale, timings[scale]) for scale in scales if timings.get(scale)]
+        exponents = [
+            math.log(t2 / t1) / math.log(s2 / s1)
+            for (s1, t1), (s2, t2) in zip(measured, measured[1:])
+        ]
+        worst = max(exponents) if exponents else None
+        flag = '  <- superlinear' if worst is not None and worst > SUPERLINEAR_EXPONENT else ''
+        print(f"{stage:<11}{cells}{'-' if worst is None else f'{worst:.2f}':>10}{flag}")
+        report[stage] = {'seconds': {str(k): v for k, v in timings.items()}, 'exponent': worst}
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
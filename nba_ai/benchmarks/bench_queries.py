@@ -0,0 +1,124 @@
+"""
+ORM query benchmark for the Game / GamePrediction indexes
+
+Seeds a synthetic league history into a throwaway SQLite database, then runs
+the real access patterns (admin change lists, ingestion and team lookups)
+with the composite indexes dropped and again with them in place, reporting
+query plans and timings for both.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.bench_queries --seasons 30 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._django import setup_django
+
+
+def build_queries():
+    """Named querysets mirroring how the app reads these tables"""
+    from django.db.models import Q
+    from django.utils import timezone
+    from predictor.models import Team, Season, Game, GamePrediction
+
+    season = Season.objects.get(is_current=True)
+    team = Team.objects.get(abbreviation='BOS')
+    today = timezone.now()
+
+    return {
+        'admin_game_list': lambda: Game.objects.order_by('-game_date')[:100],
+        'season_finished': lambda: Game.objects.filter(season=season, status='finished').order_by('-game_date')[:100],
+        'upcoming_by_status': lambda: Game.objects.filter(status='scheduled', game_date__lte=today).order_by('game_date')[:100],
+        'team_home_games': lambda: Game.objects.filter(home_team=team).order_by('-game_date')[:20],
+        'team_schedule': lambda: Game.objects.filter(Q(home_team=team) | Q(away_team=team)).order_by('-game_date')[:20],
+        'model_accuracy': lambda: GamePrediction.objects.filter(model_version='v2.0', is_correct=True),
+    }
+
+
+def time_query(make_queryset, repeat):
+    """Median wall time in milliseconds of evaluating a fresh queryset"""
+    samples = []
+    for _ in range(repeat):
+        queryset = make_queryset()
+        start = time.perf_counter()
+        if queryset.query.is_sliced:
+            list(queryset)
+        else:
+            queryset.count()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run_pass(queries, repeat):
+    results = {}
+    for name, make_queryset in queries.items():
+        results[name] = {
+            'plan': make_queryset().explain(),
+            'median_ms': round(time_query(make_queryset, repeat), 3),
+        }
+    return results
+
+
+def set_indexes(enabled):
+    """Drop or recreate the Meta.indexes declared on Game and GamePrediction"""
+    from django.db import connection
+    from predictor.models import Game, GamePrediction
+
+    with connection.schema_editor() as editor:
+        for model in (Game, GamePrediction):
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type=int, default=30, help='seasons of synthetic history to seed')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per query')
+    parser.add_argument('--json', dest='json_path', help='also write results to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3', migrate=True)
+
+        from benchmarks.synthetic import seed_league
+
+        print(f"Seeding {args.seasons} seasons of synthetic games...")
+        start = time.perf_counter()
+        games = seed_league(seasons=args.seasons)
+        print(f"Seeded {games} games in {time.perf_counter() - start:.1f}s\n")
+
+        queries = build_queries()
+
+        set_indexes(False)
+        before = run_pass(queries, args.repeat)
+        set_indexes(True)
+        after = run_pass(queries, args.repeat)
+
+    print(f"{'query':<22} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in queries:
+        b, a = before[name]['median_ms'], after[name]['median_ms']
+        print(f"{name:<22} {b:>10.3f} {a:>10.3f} {b / a if a else float('inf'):>7.1f}x")
+
+    for name in queries:
+        print(f"\n== {name}")
+        print(f"  before: {before[name]['plan']}")
+        print(f"  after:  {after[name]['plan']}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'games': games, 'before': before, 'after': after}, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Response serialization benchmark for predict_winner
+
+Compares the previous path (walk every dict through convert_to_python, then
+JsonResponse) with predictor.encoding: native NumPy handling plus team stat
+blocks pre-encoded once and spliced in, and the `fields=` probabilities-only
+shape. Reports CPU time per response and bytes on the wire.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.bench_serialization --iterations 20000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks._django import setup_django
+
+STAT_KEYS = [
+    'win_pct', 'wins', 'losses', 'recent_win_pct', 'avg_pts', 'avg_pts_allowed',
+    'fg_pct', 'fg3_pct', 'ft_pct', 'off_reb', 'def_reb', 'turnovers', 'ast_to_to_ratio',
+]
+
+
+def sample_team_stats(abbr, rng):
+    """Stats shaped like a pandas row: NumPy scalars, as views used to receive them"""
+    stats = {'abbreviation': abbr}
+    for key in STAT_KEYS:
+        stats[key] = np.int64(rng.integers(10, 70)) if key in ('wins', 'losses') else np.float64(rng.random() * 100)
+    return stats
+
+
+def convert_to_python(obj):
+    if isinstance(obj, dict):
+        return {k: convert_to_python(v) for k, v in obj.items()}
+    elif isinstance(obj, (np.integer, np.int64)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64)):
+        return float(obj)
+    else:
+        return obj
+
+
+def measure(render, iterations):
+    """(CPU microseconds per response, response size in bytes)"""
+    body = render()
+    start = time.process_time()
+    for _ in range(iterations):
+        render()
+    return (time.process_time() - start) / iterations * 1e6, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.http import JsonResponse
+    from predictor.encoding import EncodedJsonResponse, dumps, orjson, splice
+
+    rng = np.random.default_rng(42)
+    team1_stats, team2_stats = sample_team_stats('BOS', rng), sample_team_stats('LAL', rng)
+    h2h = {'team1_wins': 7, 'team2_wins': 5, 'total': 12, 'team1_win_pct': 7 / 12, 'team2_win_pct': 5 / 12}
+    core = {
+        'winner': 'BOS', 'confidence': 63.0, 'model_type': 'ML',
+        'team1_win_probability': 63.0, 'team2_win_probability': 37.0,
+    }
+
+    # Done once at data load in predictor.inference
+    team1_json, team2_json = dumps(convert_to_python(team1_stats)), dumps(convert_to_python(team2_stats))
+
+    def legacy():
+        return JsonResponse({
+            **core,
+            'team1_stats': convert_to_python(team1_stats),
+            'team2_stats': convert_to_python(team2_stats),
+            'head_to_head': convert_to_python(h2h),
+        }).content
+
+    def spliced():
+        return EncodedJsonResponse(splice(core, {
+            'team1_stats': team1_json, 'team2_stats': team2_json, 'head_to_head': dumps(h2h),
+        })).content
+
+    def probabilities_only():
+        return EncodedJsonResponse(splice(core)).content
+
+    assert json.loads(legacy()) == json.loads(spliced())
+
+    print(f"encoder: {'orjson' if orjson else 'json (stdlib)'}, {args.iterations} iterations\n")
+    print(f"{'path':<22} {'cpu us/resp':>12} {'bytes':>8}")
+    for name, render in [('legacy', legacy), ('spliced', spliced), ('fields=(none)', probabilities_only)]:
+        cpu_us, size = measure(render, args.iterations)
+        print(f"{name:<22} {cpu_us:>12.2f} {size:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Concurrent read/write benchmark for the SQLite configuration
+
+One writer thread mimics get_recent_games (short write transactions that
+insert and update game rows) while reader threads issue the kind of indexed
+SELECTs the API serves. The run is repeated with SQLite's defaults and a
+fresh connection per read, then with settings.SQLITE_PRAGMAS and persistent
+reader connections.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.bench_sqlite_concurrency --readers 8 --duration 5
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from nba_ai.settings import SQLITE_PRAGMAS
+
+SCHEMA = """
+CREATE TABLE game (
+    id INTEGER PRIMARY KEY,
+    nba_game_id TEXT UNIQUE,
+    home_team_id INTEGER,
+    away_team_id INTEGER,
+    game_date TEXT,
+    status TEXT,
+    home_score INTEGER,
+    away_score INTEGER
+);
+CREATE INDEX game_home_team_date_idx ON game (home_team_id, game_date);
+"""
+
+
+def connect(path, tuned, timeout):
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    if tuned:
+        for name, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def seed(path, tuned, rows):
+    conn = connect(path, tuned, timeout=5)
+    conn.executescript(SCHEMA)
+    conn.execute('BEGIN')
+    conn.executemany(
+        'INSERT INTO game (nba_game_id, home_team_id, away_team_id, game_date, status, home_score, away_score) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(f"seed{i}", i % 30, (i + 7) % 30, f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", 'finished', 110, 100)
+         for i in range(rows)],
+    )
+    conn.execute('COMMIT')
+    conn.close()
+
+
+def writer(path, tuned, stop, batch, stats):
+    conn = connect(path, tuned, timeout=20)
+    written = 0
+    while not stop.is_set():
+        conn.execute('BEGIN IMMEDIATE')
+        for _ in range(batch):
+            conn.execute(
+                'INSERT INTO game (nba_game_id, home_team_id, away_team_id, game_date, status) VALUES (?, ?, ?, ?, ?)',
+                (f"live{written}", written % 30, (written + 3) % 30, '2025-10-19', 'scheduled'),
+            )
+            conn.execute("UPDATE game SET status = 'live', home_score = ? WHERE id = ?", (written % 130, written % 1000 + 1))
+            written += 1
+        conn.execute('COMMIT')
+    conn.close()
+    stats['writes'] = written
+
+
+def reader(path, tuned, persistent, stop, latencies, errors):
+    conn = connect(path, tuned, timeout=5) if persistent else None
+    team = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            c = conn or connect(path, tuned, timeout=5)
+            c.execute(
+                'SELECT * FROM game WHERE home_team_id = ? ORDER BY game_date DESC LIMIT 20', (team % 30,)
+            ).fetchall()
+            if conn is None:
+                c.close()
+            latencies.append((time.perf_counter() - start) * 1000)
+        except sqlite3.OperationalError:
+            errors.append(1)
+        team += 1
+    if conn is not None:
+        conn.close()
+
+
+def run(label, tuned, persistent, readers, duration, rows, batch):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'concurrency.sqlite3')
+        seed(path, tuned, rows)
+
+        stop = threading.Event()
+        stats, latencies, errors = {}, [], []
+        threads = [threading.Thread(target=writer, args=(path, tuned, stop, batch, stats))]
+        threads += [
+            threading.Thread(target=reader, args=(path, tuned, persistent, stop, latencies, errors))
+            for _ in range(readers)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+
+    latencies.sort()
+    pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3) if latencies else None
+    return {
+        'config': label,
+        'reads_per_sec': round(len(latencies) / duration, 1),
+        'read_p50_ms': pick(0.50),
+        'read_p99_ms': pick(0.99),
+        'read_max_ms': round(latencies[-1], 3) if latencies else None,
+        'read_mean_ms': round(statistics.fmean(latencies), 3) if latencies else None,
+        'read_errors': len(errors),
+        'writes': stats.get('writes', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per configuration')
+    parser.add_argument('--rows', type=int, default=50000, help='rows seeded before the run')
+    parser.add_argument('--batch', type=int, default=50, help='rows written per write transaction')
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = [
+        run('default', tuned=False, persistent=False, readers=args.readers,
+            duration=args.duration, rows=args.rows, batch=args.batch),
+        run('tuned', tuned=True, persistent=True, readers=args.readers,
+            duration=args.duration, rows=args.rows, batch=args.batch),
+    ]
+
+    columns = ['config', 'reads_per_sec', 'read_p50_ms', 'read_p99_ms', 'read_max_ms', 'read_errors', 'writes']
+    print(' '.join(f"{c:>14}" for c in columns))
+    for row in results:
+        print(' '.join(f"{str(row[c]):>14}" for c in columns))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Fast vs full inference tier benchmark
+
+For the linear tier (one dot product), the random forest and the Elo
+fallback, measures:
+
+    predict_1    model call for one feature row
+    predict_1k   model call for 1000 rows at once
+    request      predict_winner end to end through the test client,
+                 probabilities only (fields=)
+
+and how often each tier picks the same winner as the forest across every
+ordered pair of teams. Needs nba_training_data.csv and both models from
+train_model.py in the project directory.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.bench_tiers --requests 500
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks._django import setup_django
+
+
+def timings_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {'p50': round(statistics.median(samples), 4), 'p99': round(samples[int(0.99 * (len(samples) - 1))], 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help='samples per model-call measurement')
+    parser.add_argument('--requests', type=int, default=300, help='requests per tier through predict_winner')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client
+    from predictor import inference
+
+    if inference.model is None or inference.linear_model is None:
+        raise SystemExit("Both nba_predictor_model.pkl and nba_predictor_linear.pkl are needed: run train_model.py")
+
+    teams = inference.FEATURE_STORE.teams
+    pairs = [(a, b) for a in teams for b in teams if a != b]
+    home_idx = [inference.team_index(a) for a, _ in pairs]
+    away_idx = [inference.team_index(b) for _, b in pairs]
+
+    full_X = inference.feature_rows(home_idx, away_idx)
+    fast_X = inference.feature_rows(home_idx, away_idx, elo=inference.LINEAR_ELO_FEATURE)
+    full_prob = inference.predict_proba(full_X)[:, 1]
+    fast_prob = inference.predict_fast(fast_X)
+    elo_prob = inference.FEATURE_STORE.elo_probability(home_idx, away_idx)
+    batch = np.resize(np.arange(len(pairs)), 1000)
+
+    tiers = {
+        'full': (lambda X: inference.predict_proba(X), full_X, full_prob),
+        'fast': (lambda X: inference.predict_fast(X), fast_X, fast_prob),
+        'elo': (None, None, elo_prob),
+    }
+
+    client = Client(HTTP_HOST='localhost')
+    report = {}
+    for name, (call, X, probabilities) in tiers.items():
+        entry = {
+            'agreement_with_full': round(float(np.mean((probabilities > 0.5) == (full_prob > 0.5))), 4),
+            'mean_abs_diff_vs_full': round(float(np.mean(np.abs(probabilities - full_prob))), 4),
+        }
+        if call is not None:
+            entry['predict_1_ms'] = timings_ms(lambda: call(X[:1]), args.repeat)
+            entry['predict_1k_ms'] = timings_ms(lambda: call(X[batch]), max(5, args.repeat // 20))
+
+            payloads = [json.dumps({'team1': a, 'team2': b, 'tier': name, 'fields': ''}) for a, b in pairs]
+            cursor = iter(payloads * (args.requests // len(payloads) + 1))
+            entry['request_ms'] = timings_ms(
+                lambda: client.post('/api/predict_winner/', next(cursor), content_type='application/json'),
+                args.requests,
+            )
+        report[name] = entry
+
+    print(json.dumps(report, indent=2))
+    print(f"\n{'tier':<6} {'1 row p50':>10} {'1k rows p50':>12} {'request p50':>12} {'request p99':>12} {'agree':>7}")
+    for name, entry in report.items():
+        one = entry.get('predict_1_ms', {}).get('p50', '-')
+        thousand = entry.get('predict_1k_ms', {}).get('p50', '-')
+        request = entry.get('request_ms', {})
+        print(f"{name:<6} {one:>10} {thousand:>12} {request.get('p50', '-'):>12} {request.get('p99', '-'):>12} "
+              f"{entry['agreement_with_full']:>7.1%}")
+
+
+if __name__ == '__main__':
+    main()
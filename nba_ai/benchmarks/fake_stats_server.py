@@ -0,0 +1,394 @@
+"""
+Local stand-in for the NBA endpoints used by ingestion
+
+Serves stats.nba.com-shaped responses for the endpoints this project calls:
+
+    /stats/scoreboardv2?GameDate=MM/DD/YYYY    utils.get_recent_games
+    /stats/leaguegamelog?Season=2024-25        training_data.collect_all_games_efficient
+    /static/json/liveData/scoreboard/todaysScoreboard_00.json
+                                               live.LiveScorePoller
+
+Payloads are synthetic (deterministic per date/season, built from
+benchmarks.synthetic) unless a recorded response exists in --fixtures, named
+`scoreboardv2_2024-10-22.json`, `leaguegamelog_2024-25.json` or
+`todaysScoreboard_00.json`. nba_api's `endpoint.nba_response.get_json()` gives
+exactly what to save.
+
+Latency, jitter, injected 500s and a token-bucket rate limit that answers 429
+with Retry-After are all configurable, so the fetch/retry/back-off paths can be
+load-tested without network access. `use_fake_stats(url)` points nba_api at
+the server (teams.get_teams() is bundled with nba_api and never goes over the
+network).
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.fake_stats_server --port 8765 --latency 0.2 --error-rate 0.05
+    python -m benchmarks.fake_stats_server --ingest-days 14 --rate-limit 2
+    python -m benchmarks.fake_stats_server --gamelog-seasons 2023-24 2024-25
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import GAMES_PER_DAY, TEAMS, league_game_log
+
+LIVE_PATH = '/static/json/liveData/scoreboard/todaysScoreboard_00.json'
+ERROR_BODY = b'{"Message":"An error has occurred."}'
+
+GAME_HEADER = [
+    'GAME_DATE_EST', 'GAME_SEQUENCE', 'GAME_ID', 'GAME_STATUS_ID', 'GAME_STATUS_TEXT', 'GAMECODE',
+    'HOME_TEAM_ID', 'VISITOR_TEAM_ID', 'SEASON', 'LIVE_PERIOD', 'LIVE_PC_TIME',
+    'NATL_TV_BROADCASTER_ABBREVIATION', 'LIVE_PERIOD_TIME_BCAST', 'WH_STATUS',
+]
+LINE_SCORE = [
+    'GAME_DATE_EST', 'GAME_SEQUENCE', 'GAME_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_CITY_NAME',
+    'TEAM_NAME', 'TEAM_WINS_LOSSES', 'PTS_QTR1', 'PTS_QTR2', 'PTS_QTR3', 'PTS_QTR4', 'PTS',
+]
+# ScoreboardV2 refuses a response that lacks any of these result sets
+SCOREBOARD_EXTRA_SETS = [
+    'SeriesStandings', 'LastMeeting', 'EastConfStandingsByDay', 'WestConfStandingsByDay',
+    'Available', 'TeamLeaders', 'TicketLinks',
+]
+
+# How long a synthetic live game stays in progress, and the gap between tip-offs
+LIVE_GAME_SECONDS = 120
+LIVE_TIPOFF_SPACING = 30
+
+
+def result_set(name, headers, rows):
+    return {'name': name, 'headers': headers, 'rowSet': rows}
+
+
+def season_start_year(game_date):
+    return game_date.year if game_date.month >= 8 else game_date.year - 1
+
+
+@lru_cache(maxsize=512)
+def slate(game_date, seed):
+    """Deterministic [(game_id, home_index, away_index, home_pts, away_pts)] for one date"""
+    rng = random.Random(f"{seed}:{game_date.isoformat()}")
+    order = rng.sample(range(len(TEAMS)), GAMES_PER_DAY * 2)
+    games = []
+    for n in range(GAMES_PER_DAY):
+        home, away = order[2 * n], order[2 * n + 1]
+        home_pts = rng.randint(95, 130)
+        away_pts = rng.randint(95, 130)
+        if away_pts == home_pts:
+            away_pts -= 1
+        games.append((f"002{game_date:%y%m%d}{n:02d}", home, away, home_pts, away_pts))
+    return games
+
+
+def quarters(total):
+    base = total // 4
+    return [base, base, base, total - 3 * base]
+
+
+def scoreboard_payload(game_date, seed, today=None):
+    """ScoreboardV2 response for one date: past dates are final, today onward is scheduled"""
+    today = today or date.today()
+    final = game_date < today
+    season = str(season_start_year(game_date))
+    date_est = f"{game_date.isoformat()}T00:00:00"
+
+    header_rows, line_rows = [], []
+    for sequence, (game_id, home, away, home_pts, away_pts) in enumerate(slate(game_date, seed), start=1):
+        tipoff = f"{7 + sequence // 3}:{(sequence % 2) * 30:02d} pm ET"
+        home_team, away_team = TEAMS[home], TEAMS[away]
+        header_rows.append([
+            date_est, sequence, game_id, 3 if final else 1, 'Final' if final else tipoff,
+            f"{game_date:%Y%m%d}/{away_team[1]}{home_team[1]}", home_team[0], away_team[0], season,
+            4 if final else 0, '', None, 'Q4 ' if final else '', 1,
+        ])
+        for team, pts in ((away_team, away_pts), (home_team, home_pts)):
+            line_rows.append([
+                date_est, sequence, game_id, team[0], team[1], team[2], team[3], '0-0',
+                *(quarters(pts) if final else [None] * 4), pts if final else None,
+            ])
+
+    return {
+        'resource': 'scoreboardV2',
+        'parameters': {'GameDate': f"{game_date:%m/%d/%Y}", 'LeagueID': '00', 'DayOffset': '0'},
+        'resultSets': [
+            result_set('GameHeader', GAME_HEADER, header_rows),
+            result_set('LineScore', LINE_SCORE, line_rows),
+            *(result_set(name, [], []) for name in SCOREBOARD_EXTRA_SETS),
+        ],
+    }
+
+
+@lru_cache(maxsize=16)
+def league_game_log_payload(season, seed):
+    """LeagueGameLog response for one season label such as '2024-25'"""
+    frame = league_game_log(season_start=int(season[:4]), seed=seed)
+    split = json.loads(frame.to_json(orient='split', index=False))
+    return {
+        'resource': 'leaguegamelog',
+        'parameters': {'Season': season, 'SeasonType': 'Regular Season', 'LeagueID': '00'},
+        'resultSets': [result_set('LeagueGameLog', split['columns'], split['data'])],
+    }
+
+
+def live_payload(seed, elapsed, today=None):
+    """todaysScoreboard_00 for today's slate, advancing with server uptime.
+
+    Game n tips off n * LIVE_TIPOFF_SPACING seconds after start and goes
+    final LIVE_GAME_SECONDS later, with scores climbing linearly to the
+    slate's final score.
+    """
+    today = today or date.today()
+    games = []
+    for n, (game_id, home, away, home_pts, away_pts) in enumerate(slate(today, seed)):
+        played = (elapsed - n * LIVE_TIPOFF_SPACING) / LIVE_GAME_SECONDS
+        if played <= 0:
+            status, share = 1, 0.0
+        elif played < 1:
+            status, share = 2, played
+        else:
+            status, share = 3, 1.0
+        games.append({
+            'gameId': game_id,
+            'gameStatus': status,
+            'gameStatusText': ('Scheduled', 'Live', 'Final')[status - 1],
+            'period': min(4, int(share * 4) + 1) if status == 2 else (4 if status == 3 else 0),
+            'homeTeam': {'teamId': TEAMS[home][0], 'teamTricode': TEAMS[home][1], 'score': int(home_pts * share)},
+            'awayTeam': {'teamId': TEAMS[away][0], 'teamTricode': TEAMS[away][1], 'score': int(away_pts * share)},
+        })
+    return {'meta': {'version': 1, 'code': 200}, 'scoreboard': {'gameDate': today.isoformat(), 'games': games}}
+
+
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Return 0 if a token was taken, else seconds until one is available"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class FakeStatsServer:
+    """Threaded HTTP server answering like stats.nba.com and cdn.nba.com"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=None, burst=5, fixtures=None, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.started = time.monotonic()
+        self.stats_lock = threading.Lock()
+        self.counts = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, body, headers = server.handle(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_port}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, endpoint, status):
+        with self.stats_lock:
+            per_endpoint = self.counts.setdefault(endpoint, {})
+            per_endpoint[str(status)] = per_endpoint.get(str(status), 0) + 1
+
+    def handle(self, raw_path):
+        """Return (status, body bytes, extra headers) for one request"""
+        parts = urlsplit(raw_path)
+        query = {key.lower(): values[0] for key, values in parse_qs(parts.query).items()}
+        endpoint = parts.path.rstrip('/').rsplit('/', 1)[-1] or '/'
+
+        if self.bucket is not None:
+            wait = self.bucket.take()
+            if wait:
+                self.record(endpoint, 429)
+                return 429, b'{"Message":"Too Many Requests"}', {'Retry-After': str(max(1, round(wait)))}
+
+        with self.stats_lock:
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate and self.rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.record(endpoint, 500)
+            return 500, ERROR_BODY, {}
+
+        try:
+            payload = self.payload(parts.path, query)
+        except (KeyError, ValueError) as e:
+            self.record(endpoint, 400)
+            return 400, json.dumps({'Message': f"Bad request: {e}"}).encode(), {}
+        if payload is None:
+            self.record(endpoint, 404)
+            return 404, b'{"Message":"Not found"}', {}
+
+        self.record(endpoint, 200)
+        return 200, payload if isinstance(payload, bytes) else json.dumps(payload).encode(), {}
+
+    def fixture(self, name):
+        if self.fixtures is None:
+            return None
+        path = self.fixtures / f"{name}.json"
+        return path.read_bytes() if path.exists() else None
+
+    def payload(self, path, query):
+        path = path.rstrip('/')
+        if path == '/stats/scoreboardv2':
+            game_date = datetime.strptime(query['gamedate'], '%m/%d/%Y').date()
+            return self.fixture(f"scoreboardv2_{game_date.isoformat()}") or scoreboard_payload(game_date, self.seed)
+        if path == '/stats/leaguegamelog':
+            season = query['season']
+            return self.fixture(f"leaguegamelog_{season}") or league_game_log_payload(season, self.seed)
+        if path == LIVE_PATH:
+            return self.fixture('todaysScoreboard_00') or live_payload(self.seed, time.monotonic() - self.started)
+        return None
+
+    def summary(self):
+        with self.stats_lock:
+            return {endpoint: dict(counts) for endpoint, counts in self.counts.items()}
+
+
+@contextmanager
+def use_fake_stats(url):
+    """Point nba_api's stats and live clients at a FakeStatsServer for the duration"""
+    from nba_api.live.nba.library.http import NBALiveHTTP
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    previous = NBAStatsHTTP.base_url, NBALiveHTTP.base_url
+    NBAStatsHTTP.base_url = f"{url}/stats/{{endpoint}}"
+    NBALiveHTTP.base_url = f"{url}/static/json/liveData/{{endpoint}}"
+    try:
+        yield
+    finally:
+        NBAStatsHTTP.base_url, NBALiveHTTP.base_url = previous
+
+
+def drive_ingest(server, days):
+    """Run utils.get_recent_games against the server on a throwaway database"""
+    from benchmarks._django import setup_django
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'ingest.sqlite3', migrate=True)
+        from predictor import utils
+        from predictor.models import Game, Season
+
+        utils.setup_teams()
+        Season.objects.get_or_create(year='2024-25', defaults={
+            'start_date': date(2024, 10, 22), 'end_date': date(2025, 4, 13), 'is_current': True,
+        })
+        started = time.perf_counter()
+        with use_fake_stats(server.url):
+            created = utils.get_recent_games(days=days)
+        return {
+            'days': days,
+            'games_created': created,
+            'games_finished': Game.objects.filter(status='finished', home_score__isnull=False).count(),
+            'elapsed_s': round(time.perf_counter() - started, 2),
+        }
+
+
+def drive_gamelog(server, seasons):
+    """Run training_data.collect_all_games_efficient against the server"""
+    import training_data
+
+    started = time.perf_counter()
+    with use_fake_stats(server.url):
+        df = training_data.collect_all_games_efficient(seasons=seasons)
+    return {'seasons': seasons, 'rows': len(df), 'elapsed_s': round(time.perf_counter() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra uniform random delay, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 500')
+    parser.add_argument('--rate-limit', type=float, help='requests per second before answering 429')
+    parser.add_argument('--burst', type=int, default=5, help='requests allowed back to back under --rate-limit')
+    parser.add_argument('--fixtures', help='directory of recorded responses served in place of synthetic ones')
+    parser.add_argument('--seed', type=int, default=42)
+    drive = parser.add_mutually_exclusive_group()
+    drive.add_argument('--ingest-days', type=int, help='run get_recent_games for this many days, then exit')
+    drive.add_argument('--gamelog-seasons', nargs='+', help='run collect_all_games_efficient, then exit')
+    args = parser.parse_args()
+
+    server = FakeStatsServer(
+        host=args.host, port=0 if (args.ingest_days or args.gamelog_seasons) else args.port,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, burst=args.burst, fixtures=args.fixtures, seed=args.seed,
+    )
+
+    with server:
+        if args.ingest_days:
+            report = drive_ingest(server, args.ingest_days)
+        elif args.gamelog_seasons:
+            report = drive_gamelog(server, args.gamelog_seasons)
+        else:
+            print(f"Serving fake NBA stats on {server.url} (Ctrl+C to stop)", file=sys.stderr)
+            try:
+                server.thread.join()
+            except KeyboardInterrupt:
+                pass
+            report = {}
+        report['requests'] = server.summary()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Load test for the prediction API
+
+Boots the Django app in-process over WSGI (wsgiref, threaded) or ASGI
+(uvicorn, if installed), or targets an already running server with --url,
+then drives predict_winner at a fixed concurrency with a realistic mix of
+matchups:
+
+    hot      a handful of popular pairs requested over and over
+    random   any two distinct teams
+    invalid  an unknown abbreviation (expected to answer 404)
+
+Results are printed as JSON. With --save-baseline they are stored under
+benchmarks/baselines/, and later runs are compared against that baseline so
+regressions across commits stand out.
+
+Usage (from the nba_ai/ project directory):
+
+    python -m benchmarks.loadtest --server wsgi --concurrency 16 --duration 20
+    python -m benchmarks.loadtest --server asgi --save-baseline
+"""
+import argparse
+import http.client
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks._django import PROJECT_DIR, setup_django
+from benchmarks.synthetic import TEAMS
+
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+ENDPOINT = '/api/predict_winner/'
+
+ABBREVIATIONS = [abbr for _, abbr, *_ in TEAMS]
+HOT_PAIRS = [('BOS', 'LAL'), ('GSW', 'LAL'), ('NYK', 'BOS'), ('DEN', 'PHX'), ('MIL', 'MIA')]
+DEFAULT_MIX = {'hot': 0.6, 'random': 0.35, 'invalid': 0.05}
+EXPECTED_STATUS = {'hot': 200, 'random': 200, 'invalid': 404}
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_wsgi():
+    setup_django()
+    logging.getLogger('django.request').setLevel(logging.ERROR)  # expected 404s from the invalid mix
+    from nba_ai.wsgi import application
+
+    server = make_server('127.0.0.1', 0, application, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+
+def start_asgi():
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("The ASGI server needs uvicorn: pip install uvicorn")
+
+    setup_django()
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    from nba_ai.asgi import application
+
+    config = uvicorn.Config(application, host='127.0.0.1', port=0, log_level='warning', lifespan='off')
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    def stop():
+        server.should_exit = True
+    return f"http://127.0.0.1:{port}", stop
+
+
+def pick_request(rng, mix):
+    kind = rng.choices(list(mix), weights=list(mix.values()))[0]
+    if kind == 'hot':
+        team1, team2 = rng.choice(HOT_PAIRS)
+    elif kind == 'random':
+        team1, team2 = rng.sample(ABBREVIATIONS, 2)
+    else:
+        team1, team2 = 'XXX', rng.choice(ABBREVIATIONS)
+    return kind, json.dumps({'team1': team1, 'team2': team2})
+
+
+def worker(base_url, mix, seed, deadline, results):
+    target = urlsplit(base_url)
+    rng = random.Random(seed)
+    conn = None
+    while time.perf_counter() < deadline:
+        kind, body = pick_request(rng, mix)
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+            conn.request('POST', ENDPOINT, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close' or response.version == 10:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            status = 0
+            if conn is not None:
+                conn.close()
+            conn = None
+        results.append((kind, status, (time.perf_counter() - start) * 1000))
+    if conn is not None:
+        conn.close()
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+def summarize(results, duration):
+    latencies = sorted(latency for _, _, latency in results)
+    status_counts = {}
+    errors = shed = 0
+    for kind, status, _ in results:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+        if status == 503:
+            # Turned away by admission control (predictor.admission), by design
+            shed += 1
+        elif status != EXPECTED_STATUS[kind]:
+            errors += 1
+    return {
+        'requests': len(results),
+        'throughput_rps': round(len(results) / duration, 1),
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': round(latencies[-1], 3) if latencies else None,
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        },
+        'error_rate': round(errors / len(results), 4) if results else None,
+        'shed_rate': round(shed / len(results), 4) if results else None,
+        'status_counts': status_counts,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Print deltas against the baseline; return the list of regressions"""
+    regressions = []
+    checks = [
+        ('throughput_rps', report['throughput_rps'], baseline['throughput_rps'], False),
+        ('p50_ms', report['latency_ms']['p50'], baseline['latency_ms']['p50'], True),
+        ('p99_ms', report['latency_ms']['p99'], baseline['latency_ms']['p99'], True),
+        ('error_rate', report['error_rate'], baseline['error_rate'], True),
+    ]
+    print(f"\nvs baseline {baseline.get('git_commit')} ({baseline.get('timestamp')}):", file=sys.stderr)
+    for name, current, previous, lower_is_better in checks:
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous if previous else (0.0 if current == previous else float('inf'))
+        worse = change > tolerance if lower_is_better else change < -tolerance
+        if worse:
+            regressions.append(name)
+        print(f"  {name:<15} {previous:>10} -> {current:<10} {change:+.1%}{'  REGRESSION' if worse else ''}",
+              file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi')
+    parser.add_argument('--url', help='target a running server instead of booting one')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds of measured load')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds of unmeasured load first')
+    parser.add_argument('--mix', default=','.join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help='request mix weights, e.g. hot=0.6,random=0.35,invalid=0.05')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='relative change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    mix = {kind: float(weight) for kind, weight in (item.split('=') for item in args.mix.split(','))}
+    unknown = set(mix) - set(EXPECTED_STATUS)
+    if unknown:
+        parser.error(f"unknown mix entries: {', '.join(sorted(unknown))}")
+
+    label = 'external' if args.url else args.server
+    base_url, stop = (args.url, lambda: None) if args.url else (start_wsgi() if args.server == 'wsgi' else start_asgi())
+
+    try:
+        for phase, seconds in (('warmup', args.warmup), ('measure', args.duration)):
+            if seconds <= 0:
+                continue
+            results = []
+            deadline = time.perf_counter() + seconds
+            threads = [
+                threading.Thread(target=worker, args=(base_url, mix, args.seed + i, deadline, results))
+                for i in range(args.concurrency)
+            ]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+    finally:
+        stop()
+
+    report = {
+        'server': label,
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 2),
+        'mix': mix,
+        **summarize(results, elapsed),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    print(json.dumps(report, indent=2))
+
+    baseline_path = BASELINE_DIR / f"loadtest_{label}_c{args.concurrency}.json"
+    regressions = []
+    if baseline_path.exists() and not args.save_baseline:
+        regressions = compare(report, json.loads(baseline_path.read_text()), args.tolerance)
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+        print(f"\nBaseline saved to {baseline_path}", file=sys.stderr)
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""
+Synthetic league history for benchmarks
+
+Everything here is deterministic for a given seed so runs are comparable
+across commits.
+"""
+import random
+from datetime import datetime, timedelta
+
+# (nba_team_id, abbreviation, city, name, conference, division)
+TEAMS = [
+    (1610612737, 'ATL', 'Atlanta', 'Hawks', 'East', 'Southeast'),
+    (1610612738, 'BOS', 'Boston', 'Celtics', 'East', 'Atlantic'),
+    (1610612739, 'CLE', 'Cleveland', 'Cavaliers', 'East', 'Central'),
+    (1610612740, 'NOP', 'New Orleans', 'Pelicans', 'West', 'Southwest'),
+    (1610612741, 'CHI', 'Chicago', 'Bulls', 'East', 'Central'),
+    (1610612742, 'DAL', 'Dallas', 'Mavericks', 'West', 'Southwest'),
+    (1610612743, 'DEN', 'Denver', 'Nuggets', 'West', 'Northwest'),
+    (1610612744, 'GSW', 'Golden State', 'Warriors', 'West', 'Pacific'),
+    (1610612745, 'HOU', 'Houston', 'Rockets', 'West', 'Southwest'),
+    (1610612746, 'LAC', 'LA', 'Clippers', 'West', 'Pacific'),
+    (1610612747, 'LAL', 'Los Angeles', 'Lakers', 'West', 'Pacific'),
+    (1610612748, 'MIA', 'Miami', 'Heat', 'East', 'Southeast'),
+    (1610612749, 'MIL', 'Milwaukee', 'Bucks', 'East', 'Central'),
+    (1610612750, 'MIN', 'Minnesota', 'Timberwolves', 'West', 'Northwest'),
+    (1610612751, 'BKN', 'Brooklyn', 'Nets', 'East', 'Atlantic'),
+    (1610612752, 'NYK', 'New York', 'Knicks', 'East', 'Atlantic'),
+    (1610612753, 'ORL', 'Orlando', 'Magic', 'East', 'Southeast'),
+    (1610612754, 'IND', 'Indiana', 'Pacers', 'East', 'Central'),
+    (1610612755, 'PHI', 'Philadelphia', '76ers', 'East', 'Atlantic'),
+    (1610612756, 'PHX', 'Phoenix', 'Suns', 'West', 'Pacific'),
+    (1610612757, 'POR', 'Portland', 'Trail Blazers', 'West', 'Northwest'),
+    (1610612758, 'SAC', 'Sacramento', 'Kings', 'West', 'Pacific'),
+    (1610612759, 'SAS', 'San Antonio', 'Spurs', 'West', 'Southwest'),
+    (1610612760, 'OKC', 'Oklahoma City', 'Thunder', 'West', 'Northwest'),
+    (1610612761, 'TOR', 'Toronto', 'Raptors', 'East', 'Atlantic'),
+    (1610612762, 'UTA', 'Utah', 'Jazz', 'West', 'Northwest'),
+    (1610612763, 'MEM', 'Memphis', 'Grizzlies', 'West', 'Southwest'),
+    (1610612764, 'WAS', 'Washington', 'Wizards', 'East', 'Southeast'),
+    (1610612765, 'DET', 'Detroit', 'Pistons', 'East', 'Central'),
+    (1610612766, 'CHA', 'Charlotte', 'Hornets', 'East', 'Southeast'),
+]
+
+GAMES_PER_SEASON = 1230
+GAMES_PER_DAY = 8
+MODEL_VERSIONS = ['v1.0', 'v1.1', 'v2.0']
+
+
+def season_label(start_year):
+    """1999 -> '1999-00'"""
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def seed_league(seasons=30, games_per_season=GAMES_PER_SEASON, predictions=True,
+                last_season=2025, seed=42, batch_size=5000):
+    """Populate the configured database with a synthetic league history.
+
+    The final season is left half played (remaining games 'scheduled') so
+    queries over upcoming games have realistic selectivity.
+    Returns the number of games created.
+    """
+    from django.utils import timezone
+    from predictor.models import Team, Season, Game, GamePrediction
+
+    rng = random.Random(seed)
+
+    teams = Team.objects.bulk_create([
+        Team(nba_team_id=team_id, abbreviation=abbr, city=city, name=name,
+             conference=conference, division=division)
+        for team_id, abbr, city, name, conference, division in TEAMS
+    ])
+    strength = {team.pk: rng.gauss(0, 4) for team in teams}
+
+    games_created = 0
+    first_season = last_season - seasons + 1
+    for start_year in range(first_season, last_season + 1):
+        season = Season.objects.create(
+            year=season_label(start_year),
+            start_date=datetime(start_year, 10, 20).date(),
+            end_date=datetime(start_year + 1, 4, 13).date(),
+            is_current=start_year == last_season,
+        )
+        tip_off = timezone.make_aware(datetime(start_year, 10, 20, 19, 0))
+        played = games_per_season if start_year < last_season else games_per_season // 2
+
+        games = []
+        for number in range(games_per_season):
+            home, away = rng.sample(teams, 2)
+            game = Game(
+                nba_game_id=f"{start_year}{number:05d}",
+                home_team=home,
+                away_team=away,
+                season=season,
+                game_date=tip_off + timedelta(days=number // GAMES_PER_DAY, minutes=number % GAMES_PER_DAY),
+                status='scheduled',
+            )
+            if number < played:
+                margin = strength[home.pk] - strength[away.pk] + 3 + rng.gauss(0, 12)
+                base = rng.gauss(112, 8)
+                game.status = 'finished'
+                game.home_score = max(70, round(base + margin / 2))
+                game.away_score = max(70, round(base - margin / 2))
+                if game.home_score == game.away_score:
+                    game.home_score += 1
+            games.append(game)
+
+        created = Game.objects.bulk_create(games, batch_size=batch_size)
+        games_created += len(created)
+
+        if predictions:
+            preds = []
+            for game in created:
+                home_prob = min(0.95, max(0.05, 0.55 + (strength[game.home_team_id] - strength[game.away_team_id]) / 20))
+                preds.append(GamePrediction(
+                    game=game,
+                    predicted_winner_id=game.home_team_id if home_prob >= 0.5 else game.away_team_id,
+                    home_win_probability=home_prob,
+                    away_win_probability=1 - home_prob,
+                    confidence_score=max(home_prob, 1 - home_prob),
+                    model_version=rng.choice(MODEL_VERSIONS),
+                ))
+            GamePrediction.objects.bulk_create(preds, batch_size=batch_size)
+
+    GamePrediction.objects.update_accuracy()
+    return games_created
+
+
+# Size of the real nba_training_data.csv: three seasons of regular-season games
+BASE_SEASONS = 3
+
+
+def league_game_log(games=GAMES_PER_SEASON, season_start=2024, seed=42):
+    """LeagueGameLog-shaped frame (two team rows per game) for one season.
+
+    `games` may exceed a real season's 1230 to stress per-season stages.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    team_ids = np.array([team[0] for team in TEAMS])
+    abbrs = np.array([team[1] for team in TEAMS])
+    names = np.array([f"{team[2]} {team[3]}" for team in TEAMS])
+    strength = rng.normal(0, 4, len(TEAMS))
+
+    home = rng.integers(0, len(TEAMS), games)
+    away = (home + rng.integers(1, len(TEAMS), games)) % len(TEAMS)
+    days = np.arange(games) // GAMES_PER_DAY
+    dates = (np.datetime64(f"{season_start}-10-20") + days).astype(str)
+    game_ids = np.array([f"002{season_start % 100:02d}{n:05d}" for n in range(games)])
+
+    margin = strength[home] - strength[away] + 3 + rng.normal(0, 12, games)
+    base = rng.normal(112, 8, games)
+    home_pts = np.maximum(70, np.round(base + margin / 2)).astype(int)
+    away_pts = np.maximum(70, np.round(base - margin / 2)).astype(int)
+    away_pts = np.where(home_pts == away_pts, away_pts - 1, away_pts)
+
+    frames = []
+    for side, team, opponent, pts, opp_pts in (
+        ('home', home, away, home_pts, away_pts),
+        ('away', away, home, away_pts, home_pts),
+    ):
+        fga = rng.integers(80, 95, games)
+        fg3a = rng.integers(28, 45, games)
+        fta = rng.integers(15, 30, games)
+        fg3m = np.minimum(fg3a, rng.binomial(fg3a, 0.36))
+        ftm = rng.binomial(fta, 0.78)
+        fgm = np.clip((pts - 3 * fg3m - ftm) // 2 + fg3m, fg3m, fga)
+        oreb = rng.integers(6, 15, games)
+        dreb = rng.integers(28, 40, games)
+        ast = rng.integers(20, 32, games)
+        tov = rng.integers(9, 18, games)
+        joiner = ' vs. ' if side == 'home' else ' @ '
+        frames.append(pd.DataFrame({
+            'SEASON_ID': f"2{season_start}",
+            'TEAM_ID': team_ids[team],
+            'TEAM_ABBREVIATION': abbrs[team],
+            'TEAM_NAME': names[team],
+            'GAME_ID': game_ids,
+            'GAME_DATE': dates,
+            'MATCHUP': np.char.add(np.char.add(abbrs[team], joiner), abbrs[opponent]),
+            'WL': np.where(pts > opp_pts, 'W', 'L'),
+            'MIN': 240,
+            'FGM': fgm, 'FGA': fga, 'FG_PCT': np.round(fgm / fga, 3),
+            'FG3M': fg3m, 'FG3A': fg3a, 'FG3_PCT': np.round(fg3m / fg3a, 3),
+            'FTM': ftm, 'FTA': fta, 'FT_PCT': np.round(ftm / fta, 3),
+            'OREB': oreb, 'DREB': dreb, 'REB': oreb + dreb,
+            'AST': ast, 'STL': rng.integers(4, 12, games), 'BLK': rng.integers(2, 9, games),
+            'TOV': tov, 'PF': rng.integers(15, 25, games),
+            'PTS': pts, 'PLUS_MINUS': pts - opp_pts, 'VIDEO_AVAILABLE': 1,
+        }))
+    return pd.concat(frames, ignore_index=True).sort_values(['GAME_DATE', 'GAME_ID'], kind='stable')
+
+
+def training_frame(scale=1, seed=42):
+    """nba_training_data.csv-shaped frame, `scale` times the real dataset.
+
+    Built directly from per-season team aggregates rather than through
+    training_data.py, so setup stays cheap at large scales.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    abbrs = np.array([team[1] for team in TEAMS])
+    stat_ranges = {
+        'recent_win_pct': (0.0, 1.0), 'avg_pts': (105, 122), 'avg_pts_allowed': (105, 122),
+        'fg_pct': (0.44, 0.50), 'fg3_pct': (0.33, 0.39), 'ft_pct': (0.74, 0.83),
+        'off_reb': (8, 13), 'def_reb': (31, 36), 'turnovers': (11, 16), 'ast_to_to_ratio': (1.5, 2.3),
+    }
+
+    frames = []
+    for offset in range(BASE_SEASONS * scale):
+        start = 2024 - offset
+        wins = rng.integers(15, 68, len(TEAMS))
+        season_stats = {'wins': wins, 'losses': 82 - wins, 'win_pct': wins / 82}
+        for key, (low, high) in stat_ranges.items():
+            season_stats[key] = rng.uniform(low, high, len(TEAMS))
+
+        team1 = rng.integers(0, len(TEAMS), GAMES_PER_SEASON)
+        team2 = (team1 + rng.integers(1, len(TEAMS), GAMES_PER_SEASON)) % len(TEAMS)
+        team1_home = rng.integers(0, 2, GAMES_PER_SEASON)
+        edge = season_stats['win_pct'][team1] - season_stats['win_pct'][team2] + 0.03 * (2 * team1_home - 1)
+        winner = (rng.random(GAMES_PER_SEASON) < 0.5 + edge).astype(int)
+        team1_score = rng.integers(95, 130, GAMES_PER_SEASON)
+        margin = rng.integers(1, 20, GAMES_PER_SEASON)
+
+        columns = {'team1_abbr': abbrs[team1], 'team2_abbr': abbrs[team2]}
+        for side, index, home_flag in (('team1', team1, team1_home), ('team2', team2, 1 - team1_home)):
+            for key, values in season_stats.items():
+                columns[f'{side}_{key}'] = values[index]
+            columns[f'{side}_home'] = home_flag
+        columns.update({
+            'team1_score': team1_score,
+            'team2_score': np.where(winner == 1, team1_score - margin, team1_score + margin),
+            'winner': winner,
+            'season': season_label(start),
+            'game_date': (np.datetime64(f"{start}-10-20") + np.arange(GAMES_PER_SEASON) // GAMES_PER_DAY).astype(str),
+        })
+        frames.append(pd.DataFrame(columns))
+    return pd.concat(frames[::-1], ignore_index=True)
+
+
+def scoreboard_frame(games, start_date='2024-10-22', seed=42):
+    """ScoreboardV2 GameHeader-shaped frame of finished games, as ingestion reads it"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    team_ids = np.array([team[0] for team in TEAMS])
+    home = rng.integers(0, len(TEAMS), games)
+    away = (home + rng.integers(1, len(TEAMS), games)) % len(TEAMS)
+    dates = (np.datetime64(start_date) + np.arange(games) // GAMES_PER_DAY).astype(str)
+    minutes = np.arange(games) % GAMES_PER_DAY
+    return pd.DataFrame({
+        'GAME_ID': [f"0029{n:06d}" for n in range(games)],
+        'GAME_DATE_EST': dates,
+        'GAMETIME_EST': [f"7:{m:02d} PM" for m in minutes],
+        'GAME_STATUS_TEXT': 'Final',
+        'HOME_TEAM_ID': team_ids[home],
+        'VISITOR_TEAM_ID': team_ids[away],
+        'PTS_HOME': rng.integers(95, 130, games),
+        'PTS_AWAY': rng.integers(95, 130, games),
+    })
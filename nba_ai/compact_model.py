@@ -0,0 +1,171 @@
+"""
+Post-training compaction for the random forest
+
+Fits forests over a grid of depth and leaf-size limits (tree-count limits
+are taken as prefixes of each fitted forest), rounds split thresholds to
+float32, optionally compresses the pickle, and reports artifact size, load
+time, single-row and batch latency, and test accuracy for every variant.
+The smallest variant within --tolerance of the unconstrained forest's
+accuracy is saved.
+
+Rounding is exact: every threshold becomes the largest float32 not above
+it, and scikit-learn compares float32 inputs, so no prediction changes.
+
+Usage (after training_data.py, from the nba_ai/ project directory):
+
+    python compact_model.py
+    python compact_model.py --depths none,12,8 --leaves 1,10 --trees 100,40 --replace
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from train_model import add_elo_features, add_matchup_stats, build_feature_matrix
+
+MODEL_FILE = 'nba_predictor_model.pkl'
+COMPACT_FILE = 'nba_predictor_model.compact.pkl'
+COMPRESSION = ('zlib', 3)
+
+
+def round_thresholds(forest):
+    """Round every split threshold down to float32 in place (predictions are unchanged)"""
+    for tree in forest.estimators_:
+        state = tree.tree_.__getstate__()
+        nodes = state['nodes'].copy()
+        thresholds = nodes['threshold']
+        rounded = thresholds.astype(np.float32)
+        # Step down where float32 rounding went up, so `x <= t` keeps its answer for float32 x
+        too_high = rounded.astype(np.float64) > thresholds
+        rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+        nodes['threshold'] = rounded.astype(np.float64)
+        state['nodes'] = nodes
+        tree.tree_.__setstate__(state)
+    return forest
+
+
+def truncate(forest, n_trees):
+    """The forest's first n_trees trees as a standalone model"""
+    smaller = copy.copy(forest)
+    smaller.estimators_ = forest.estimators_[:n_trees]
+    smaller.n_estimators = n_trees
+    return smaller
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure(model, X_test, y_test, workdir, compress):
+    """Size, load time, latency and accuracy of one saved variant"""
+    path = os.path.join(workdir, 'variant.pkl')
+    joblib.dump(model, path, compress=COMPRESSION if compress else 0)
+    size = os.path.getsize(path)
+    load_ms = median_ms(lambda: joblib.load(path), repeat=3)
+    loaded = joblib.load(path)
+
+    row = X_test[:1]
+    batch = np.resize(X_test, (1000, X_test.shape[1]))
+    return {
+        'size_mb': round(size / 1e6, 3),
+        'load_ms': round(load_ms, 1),
+        'predict_1_ms': round(median_ms(lambda: loaded.predict_proba(row), repeat=25), 2),
+        'predict_1k_ms': round(median_ms(lambda: loaded.predict_proba(batch), repeat=5), 2),
+        'accuracy': round(accuracy_score(y_test, loaded.predict(X_test)), 4),
+        'nodes': int(sum(tree.tree_.node_count for tree in loaded.estimators_)),
+    }
+
+
+def parse_list(value, cast=int):
+    return [None if item.lower() == 'none' else cast(item) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depths', default='none,16,12,8', help='max_depth values ("none" = unlimited)')
+    parser.add_argument('--leaves', default='1,5,20', help='min_samples_leaf values')
+    parser.add_argument('--trees', default='100,50,25', help='tree counts (prefixes of each fitted forest)')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='accuracy loss allowed vs the baseline')
+    parser.add_argument('--no-compress', action='store_true', help='only consider uncompressed artifacts')
+    parser.add_argument('--output', default=COMPACT_FILE)
+    parser.add_argument('--replace', action='store_true', help=f'write the chosen variant to {MODEL_FILE}')
+    parser.add_argument('--report', help='also write the report as JSON to this path')
+    args = parser.parse_args()
+
+    depths, leaves, tree_counts = parse_list(args.depths), parse_list(args.leaves), parse_list(args.trees)
+    compress_options = [False] if args.no_compress else [False, True]
+
+    print("Loading training data...")
+    df = pd.read_csv('nba_training_data.csv')
+    print("Adding matchup data...")
+    df = add_elo_features(add_matchup_stats(df))
+    X, y, _ = build_feature_matrix(df)
+    # Same split as train_model.py so accuracies are comparable
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    results = []
+    chosen_models = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = RandomForestClassifier(n_estimators=100, random_state=42).fit(X_train, y_train)
+        results.append({'variant': 'baseline', 'max_depth': None, 'min_samples_leaf': 1, 'trees': 100,
+                        'float32': False, 'compressed': False,
+                        **measure(baseline, X_test, y_test, workdir, compress=False)})
+        chosen_models['baseline'] = baseline
+
+        for depth in depths:
+            for leaf in leaves:
+                forest = RandomForestClassifier(
+                    n_estimators=max(tree_counts), max_depth=depth, min_samples_leaf=leaf, random_state=42,
+                ).fit(X_train, y_train)
+                round_thresholds(forest)
+                for n_trees in sorted(tree_counts, reverse=True):
+                    model = truncate(forest, n_trees)
+                    for compress in compress_options:
+                        name = f"d{depth or 'inf'}-l{leaf}-t{n_trees}{'-z' if compress else ''}"
+                        row = {'variant': name, 'max_depth': depth, 'min_samples_leaf': leaf, 'trees': n_trees,
+                               'float32': True, 'compressed': compress,
+                               **measure(model, X_test, y_test, workdir, compress)}
+                        results.append(row)
+                        chosen_models[name] = model
+                        print(f"  {name:<18} {row['size_mb']:>8.2f} MB  acc {row['accuracy']:.3f}")
+
+    floor = results[0]['accuracy'] - args.tolerance
+    eligible = [row for row in results if row['accuracy'] >= floor]
+    best = min(eligible, key=lambda row: (row['size_mb'], row['predict_1_ms']))
+
+    print(f"\n{'variant':<18} {'size MB':>8} {'load ms':>8} {'1 row ms':>9} {'1k rows ms':>11} {'nodes':>9} {'accuracy':>9}")
+    for row in results:
+        marker = '  <- chosen' if row is best else ('' if row['accuracy'] >= floor else '  (below tolerance)')
+        print(f"{row['variant']:<18} {row['size_mb']:>8.2f} {row['load_ms']:>8.1f} {row['predict_1_ms']:>9.2f} "
+              f"{row['predict_1k_ms']:>11.2f} {row['nodes']:>9} {row['accuracy']:>9.3f}{marker}")
+
+    output = MODEL_FILE if args.replace else args.output
+    joblib.dump(chosen_models[best['variant']], output, compress=COMPRESSION if best['compressed'] else 0)
+    base = results[0]
+    print(f"\nChosen {best['variant']}: {best['size_mb']:.2f} MB vs {base['size_mb']:.2f} MB, "
+          f"accuracy {best['accuracy']:.3f} vs {base['accuracy']:.3f} (tolerance {args.tolerance})")
+    print(f"Model saved to {output}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'tolerance': args.tolerance, 'chosen': best['variant'], 'variants': results}, f, indent=2)
+        print(f"Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
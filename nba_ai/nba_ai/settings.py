@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'predictor.profiling.ProfilingMiddleware',
+    'predictor.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,10 +78,30 @@ WSGI_APPLICATION = 'nba_ai.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Applied to every new SQLite connection. WAL lets the API keep serving reads
+# while ingestion writes; synchronous=NORMAL is durable enough under WAL.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+    'cache_size': -64 * 1024,  # negative = KiB, so 64 MB
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests; health checks drop dead ones
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+            # Take the write lock up front so writers queue on busy_timeout
+            # instead of failing with "database is locked" on lock upgrade
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -135,7 +157,8 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        # The HTML API browser is for development only
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     ],
 }
 
@@ -151,4 +174,50 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
-CORS_ALLOW_ALL_ORIGINS = True  # Only for development
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True  # Only for development
+
+# Live scoreboard polled by `manage.py poll_live_scores`
+NBA_LIVE_SCOREBOARD_URL = 'https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json'
+
+# predict_winner requests with a latency_budget_ms below this use the fast (linear) tier
+FULL_TIER_LATENCY_MS = 25
+
+# Admission control for predict_winner (predictor.admission), per process: past
+# the queue, the last prediction for the matchup is served stale, else a 503
+INFERENCE_CONCURRENCY = 4
+INFERENCE_QUEUE_SIZE = 16
+INFERENCE_QUEUE_TIMEOUT_MS = 100
+
+# Shadow models (PredictionModel.is_shadow) run on served feature rows in the background
+SHADOW_MODELS_ENABLED = True
+SHADOW_MAX_PENDING = 64  # batches waiting for the worker before new ones are dropped
+SHADOW_REFRESH_SECONDS = 300
+
+# Opt-in request profiling (predictor.profiling): send `X-Profile: cprofile` or
+# `X-Profile: sample` to an /api/ endpoint, or profile a random share of them.
+# Stored profiles are inspected with `manage.py request_profiles`
+PROFILING_ENABLED = True
+PROFILING_SAMPLE_RATE = 0.0  # share of API requests profiled without the header
+PROFILING_TOKEN = None  # when set, the header must be `X-Profile: <kind>:<token>`; without it only DEBUG honours the header
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 200  # ring buffer: older profiles are deleted
+PROFILING_SAMPLE_INTERVAL_MS = 1
+
+# Response compression (predictor.compression): Brotli if installed, else gzip
+COMPRESSION_MIN_BYTES = 200
+COMPRESSION_PATH_PREFIXES = ['/api/']  # no BREACH mitigation for Brotli: keep it off cookie-bearing pages
+COMPRESSION_BROTLI_QUALITY = 4
+
+# Background jobs (predictor.jobs), run by `manage.py run_jobs`
+JOB_SCHEDULES = [
+    # "at" is HH:MM in TIME_ZONE; the most recent slot runs once per slot
+    {'name': 'nightly-ingest', 'job_type': 'ingest', 'at': '09:00', 'args': {'days': 2}, 'max_attempts': 3},
+    {'name': 'nightly-ratings', 'job_type': 'rebuild_ratings', 'at': '09:30'},
+    {'name': 'nightly-retrain', 'job_type': 'retrain', 'at': '10:00', 'args': {'collect': True, 'incremental': True}},
+    {'name': 'precompute-predictions', 'job_type': 'precompute', 'every_minutes': 60, 'args': {'days': 7}},
+]
+JOB_CONCURRENCY = {'ingest': 1, 'collect_training_data': 1, 'retrain': 1, 'precompute': 1, 'rebuild_ratings': 1}
+JOB_POLL_SECONDS = 5
+JOB_RETRY_SECONDS = 300
+JOB_STALE_SECONDS = 6 * 3600  # running jobs older than this are treated as abandoned
+JOB_SCRIPT_TIMEOUT_SECONDS = 3 * 3600
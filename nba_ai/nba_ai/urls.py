@@ -6,4 +6,7 @@ from predictor import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/predict_winner/', csrf_exempt(views.predict_winner), name='predict_winner'),
+    path('api/schedule/', views.schedule, name='schedule'),
+    path('api/teams/<str:abbr>/', views.team_profile, name='team_profile'),
+    path('api/predictions/stream/', views.stream_slate_predictions, name='stream_slate_predictions'),
 ]
\ No newline at end of file
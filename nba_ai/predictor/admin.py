@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Team, Season, Game, TeamStats, GamePrediction, PredictionModel
+from django.utils import timezone
+from .models import Team, Season, Game, TeamStats, TeamRating, GamePrediction, PredictionModel, ShadowPrediction, Job
+from .paginators import EstimatedCountPaginator
 
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
@@ -19,7 +21,10 @@ class SeasonAdmin(admin.ModelAdmin):
 @admin.register(Game)
 class GameAdmin(admin.ModelAdmin):
     list_display = ['__str__', 'status', 'home_score', 'away_score', 'game_date']
+    list_select_related = ['home_team', 'away_team']
     list_filter = ['status', 'season', 'playoff_game', 'game_date']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = ['home_team__name', 'away_team__name', 'nba_game_id']
     ordering = ['-game_date']
     date_hierarchy = 'game_date'
@@ -28,15 +33,28 @@ class GameAdmin(admin.ModelAdmin):
 @admin.register(TeamStats)
 class TeamStatsAdmin(admin.ModelAdmin):
     list_display = ['team', 'season', 'wins', 'losses', 'win_percentage', 'points_per_game']
+    list_select_related = ['team', 'season']
     list_filter = ['season']
     search_fields = ['team__name']
     ordering = ['-season__year', '-win_percentage']
 
 
+@admin.register(TeamRating)
+class TeamRatingAdmin(admin.ModelAdmin):
+    list_display = ['team', 'date', 'rating', 'season']
+    list_select_related = ['team', 'season']
+    list_filter = ['season', 'team']
+    ordering = ['-date']
+    raw_id_fields = ['game']
+
+
 @admin.register(GamePrediction)
 class GamePredictionAdmin(admin.ModelAdmin):
     list_display = ['game', 'predicted_winner', 'confidence_score', 'is_correct', 'created_at']
+    list_select_related = ['game__home_team', 'game__away_team', 'predicted_winner']
     list_filter = ['predicted_winner', 'is_correct', 'model_version']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = ['game__home_team__name', 'game__away_team__name']
     ordering = ['-created_at']
     readonly_fields = ['is_correct']
@@ -44,7 +62,43 @@ class GamePredictionAdmin(admin.ModelAdmin):
 
 @admin.register(PredictionModel)
 class PredictionModelAdmin(admin.ModelAdmin):
-    list_display = ['name', 'version', 'algorithm', 'accuracy', 'is_active', 'created_at']
-    list_filter = ['algorithm', 'is_active']
+    list_display = ['name', 'version', 'algorithm', 'accuracy', 'is_active', 'is_shadow', 'created_at']
+    list_filter = ['algorithm', 'is_active', 'is_shadow']
     search_fields = ['name', 'version']
-    ordering = ['-created_at']
\ No newline at end of file
+    ordering = ['-created_at']
+
+
+@admin.register(ShadowPrediction)
+class ShadowPredictionAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'team1_win_probability', 'served_team1_win_probability', 'is_correct', 'created_at']
+    list_filter = ['model_version', 'is_correct']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_fields = ['team1', 'team2']
+    ordering = ['-created_at']
+    raw_id_fields = ['game']
+    readonly_fields = ['is_correct']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'job_type', 'status', 'run_at', 'attempts', 'worker', 'started_at', 'finished_at']
+    list_filter = ['status', 'job_type']
+    search_fields = ['job_type', 'dedupe_key', 'worker']
+    ordering = ['-created_at']
+    readonly_fields = ['worker', 'started_at', 'finished_at', 'attempts', 'result', 'error', 'created_at']
+    actions = ['requeue']
+
+    @admin.action(description="Queue selected finished jobs to run again now")
+    def requeue(self, request, queryset):
+        active_keys = set(Job.objects.active().exclude(dedupe_key=None).values_list('dedupe_key', flat=True))
+        count = 0
+        for job in queryset.filter(status__in=['succeeded', 'failed']):
+            # Skip jobs whose dedupe key is already held by a queued or running copy
+            if job.dedupe_key and job.dedupe_key in active_keys:
+                continue
+            Job.objects.filter(pk=job.pk).update(status='queued', run_at=timezone.now(), attempts=0, error='')
+            if job.dedupe_key:
+                active_keys.add(job.dedupe_key)
+            count += 1
+        self.message_user(request, f"Queued {count} jobs")
@@ -0,0 +1,106 @@
+"""
+Admission control for prediction requests
+
+At most INFERENCE_CONCURRENCY requests of a process run inference at once.
+Up to INFERENCE_QUEUE_SIZE more wait for a slot, each for at most
+INFERENCE_QUEUE_TIMEOUT_MS; anything beyond that is turned away at once
+instead of piling onto the model and slowing every request down.
+
+A turned-away request is answered with the last prediction this process
+computed for the same matchup and tier, marked stale, or with a 503 and
+Retry-After when there is none.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class Overloaded(Exception):
+    """No inference slot within the queue limits"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """A bounded number of inference slots with a short, deadline-limited queue"""
+
+    def __init__(self, concurrency, queue_size, timeout):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0}
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            getattr(settings, 'INFERENCE_CONCURRENCY', 4),
+            getattr(settings, 'INFERENCE_QUEUE_SIZE', 16),
+            getattr(settings, 'INFERENCE_QUEUE_TIMEOUT_MS', 100) / 1000,
+        )
+
+    def retry_after(self):
+        """Seconds a turned-away client should wait before trying again"""
+        return max(1, math.ceil(self.timeout))
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    @contextmanager
+    def admit(self):
+        """Hold an inference slot for the block; raises Overloaded if none is free in time"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.queue_size:
+                    self.stats['rejected'] += 1
+                    raise Overloaded('Inference queue is full', self.retry_after())
+                self.waiting += 1
+                self.stats['queued'] += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                self._count('timed_out')
+                raise Overloaded('Timed out waiting for an inference slot', self.retry_after())
+
+        self._count('admitted')
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+class RecentPredictions:
+    """The last probability payload per (team1, team2, tier), for serving stale under load"""
+
+    def __init__(self):
+        self._payloads = {}
+
+    def store(self, key, payload):
+        # Keys are limited to known team pairs and tiers, so this stays small
+        self._payloads[key] = (payload, time.time())
+
+    def stale(self, key):
+        """A copy of the last payload for key marked stale, or None"""
+        entry = self._payloads.get(key)
+        if entry is None:
+            return None
+        payload, computed_at = entry
+        return {**payload, 'stale': True, 'stale_seconds': round(time.time() - computed_at, 1)}
+
+    def clear(self):
+        self._payloads.clear()
+
+
+controller = AdmissionController.from_settings()
+recent = RecentPredictions()
@@ -0,0 +1,114 @@
+"""
+Response compression
+
+CompressionMiddleware compresses responses (streaming ones chunk by chunk)
+with the best coding the client lists in Accept-Encoding: Brotli when the
+optional `brotli` package is installed, else gzip. Bodies under
+COMPRESSION_MIN_BYTES are sent as they are, since the coding overhead
+outweighs the savings on a probabilities-only prediction.
+
+Only paths under COMPRESSION_PATH_PREFIXES (the cookie-less JSON API) are
+compressed: Brotli has no equivalent of the random gzip padding Django
+uses against BREACH, so pages that reflect input next to a CSRF token or
+session data are left to GZipMiddleware if anything.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered
+    brotli = None
+
+# Preferred first
+ENCODINGS = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(header):
+    """The coding to use for a request's Accept-Encoding, or None for identity"""
+    accepted = accepted_encodings(header or '')
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for coding in ENCODINGS:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding):
+    """Compress a complete body with 'br' or 'gzip'"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4))
+    return compress_string(body, max_random_bytes=GZipMiddleware.max_random_bytes)
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of chunks, flushing after each so lines are not held back"""
+    if encoding != 'br':
+        yield from compress_sequence(chunks, max_random_bytes=GZipMiddleware.max_random_bytes)
+        return
+    compressor = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4))
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for responses whose client accepts it (see module docstring)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path.startswith(tuple(getattr(settings, 'COMPRESSION_PATH_PREFIXES', ['/api/']))):
+            return response
+        if response.has_header('Content-Encoding') or (response.streaming and response.is_async):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_BYTES', 200):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed bytes differ from what a strong ETag promised
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,91 @@
+"""
+Streaming Elo ratings
+
+Games are processed in date order with a constant amount of work each, so
+ratings can be rebuilt from any history in one pass and then kept current
+one finished game at a time. Margin of victory scales the update, and
+ratings regress part of the way to the mean between seasons.
+
+This module has no Django dependency so the training scripts can use it
+directly; predictor.ratings persists ratings for the app.
+"""
+BASE_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 100.0
+# Share of a rating's distance from the mean kept across a season boundary
+SEASON_CARRYOVER = 0.75
+
+
+def expected_score(rating, opponent_rating, home_advantage=HOME_ADVANTAGE):
+    """Probability a team rated `rating` beats `opponent_rating`, playing at home"""
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating - home_advantage) / 400.0))
+
+
+def carry_over(rating, carryover=SEASON_CARRYOVER):
+    """A rating regressed toward the mean for a new season"""
+    return BASE_RATING + (rating - BASE_RATING) * carryover
+
+
+def margin_multiplier(margin, winner_edge):
+    """Scale updates up for blowouts, damped when the favourite was expected to win big"""
+    return (abs(margin) + 3) ** 0.8 / (7.5 + 0.006 * winner_edge)
+
+
+class EloEngine:
+    """In-memory ratings keyed by team (abbreviation or id)"""
+
+    def __init__(self, ratings=None, k=K_FACTOR, home_advantage=HOME_ADVANTAGE, carryover=SEASON_CARRYOVER):
+        self.ratings = dict(ratings or {})
+        self.k = k
+        self.home_advantage = home_advantage
+        self.carryover = carryover
+        self.season = None
+
+    def rating(self, team):
+        return self.ratings.get(team, BASE_RATING)
+
+    def start_season(self, season):
+        """Regress every rating toward the mean when the season changes"""
+        if self.season is not None and season != self.season:
+            for team, rating in self.ratings.items():
+                self.ratings[team] = carry_over(rating, self.carryover)
+        self.season = season
+
+    def win_probability(self, home, away):
+        return expected_score(self.rating(home), self.rating(away), self.home_advantage)
+
+    def update(self, home, away, home_score, away_score):
+        """Apply one final score; returns the (home, away) ratings before the game"""
+        home_rating, away_rating = self.rating(home), self.rating(away)
+        home_won = home_score > away_score
+        edge = home_rating + self.home_advantage - away_rating
+        shift = self.k * margin_multiplier(home_score - away_score, edge if home_won else -edge) * (
+            (1.0 if home_won else 0.0) - expected_score(home_rating, away_rating, self.home_advantage)
+        )
+        self.ratings[home] = home_rating + shift
+        self.ratings[away] = away_rating - shift
+        return home_rating, away_rating
+
+
+def matchup_elo(df, engine=None):
+    """Pre-game Elo for every row of an nba_training_data.csv-shaped frame.
+
+    Returns (team1_elo, team2_elo, engine) where the lists follow df's row
+    order and the engine holds the ratings after the last game.
+    """
+    engine = engine or EloEngine()
+    team1_elo = [0.0] * len(df)
+    team2_elo = [0.0] * len(df)
+
+    order = df['game_date'].argsort(kind='stable')
+    columns = [df[column].to_numpy() for column in (
+        'season', 'team1_abbr', 'team2_abbr', 'team1_home', 'team1_score', 'team2_score',
+    )]
+    for i in order:
+        season, team1, team2, team1_home, team1_score, team2_score = (column[i] for column in columns)
+        engine.start_season(season)
+        if team1_home:
+            team1_elo[i], team2_elo[i] = engine.update(team1, team2, team1_score, team2_score)
+        else:
+            team2_elo[i], team1_elo[i] = engine.update(team2, team1, team2_score, team1_score)
+    return team1_elo, team2_elo, engine
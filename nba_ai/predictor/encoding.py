@@ -0,0 +1,113 @@
+"""
+Response encoding
+
+Encodes payloads that may contain NumPy scalars without walking them first,
+and splices pre-encoded JSON fragments (e.g. per-team stat blocks built once
+at data load) into responses instead of re-encoding them per request.
+The same is offered as MessagePack when the optional `msgpack` package is
+installed and the client asks for it.
+"""
+import json
+
+import numpy as np
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: responses are JSON only
+    msgpack = None
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+
+def _default(obj):
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Encode obj to compact JSON bytes, handling NumPy types natively"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def splice(payload, fragments=None):
+    """Encode payload, then append {key: pre-encoded bytes} members in order"""
+    body = dumps(payload)
+    if not fragments:
+        return body
+
+    members = b','.join(dumps(key) + b':' + fragment for key, fragment in fragments.items())
+    separator = b',' if len(body) > 2 else b''
+    return body[:-1] + separator + members + b'}'
+
+
+def packb(obj):
+    """Encode obj to MessagePack bytes, handling NumPy types"""
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def _map_header(n):
+    if n < 16:
+        return bytes([0x80 | n])
+    if n < 1 << 16:
+        return b'\xde' + n.to_bytes(2, 'big')
+    return b'\xdf' + n.to_bytes(4, 'big')
+
+
+def splice_msgpack(payload, fragments=None):
+    """MessagePack counterpart of splice(): fragments are pre-packed values"""
+    body = packb(payload)
+    if not fragments:
+        return body
+
+    members = b''.join(packb(key) + fragment for key, fragment in fragments.items())
+    return _map_header(len(payload) + len(fragments)) + body[len(_map_header(len(payload))):] + members
+
+
+def response_format(request):
+    """'msgpack' when the client prefers MessagePack (Accept or ?format=) and it is available, else 'json'"""
+    if msgpack is None:
+        return 'json'
+    requested = request.GET.get('format')
+    if requested in ('json', 'msgpack'):
+        return requested
+    preferred = request.get_preferred_type([JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, 'application/x-msgpack'])
+    return 'json' if preferred in (None, JSON_CONTENT_TYPE) else 'msgpack'
+
+
+class EncodedJsonResponse(HttpResponse):
+    """HttpResponse for a body that is already JSON-encoded bytes"""
+
+    def __init__(self, body, **kwargs):
+        kwargs.setdefault('content_type', JSON_CONTENT_TYPE)
+        super().__init__(body, **kwargs)
+
+
+class EncodedMsgpackResponse(HttpResponse):
+    """HttpResponse for a body that is already MessagePack-encoded bytes"""
+
+    def __init__(self, body, **kwargs):
+        kwargs.setdefault('content_type', MSGPACK_CONTENT_TYPE)
+        super().__init__(body, **kwargs)
+
+
+# response_format() -> (encode, splice, response class)
+FORMATS = {
+    'json': (dumps, splice, EncodedJsonResponse),
+    'msgpack': (packb, splice_msgpack, EncodedMsgpackResponse),
+}
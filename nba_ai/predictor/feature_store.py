@@ -0,0 +1,151 @@
+"""
+Shared-memory feature store
+
+The per-team model inputs (the registry's team features plus the current
+Elo rating) and the head-to-head win counts live in one contiguous
+float32 block in multiprocessing.shared_memory, named after the data
+version. The first worker to load a version fills it and the others map
+the same pages. Feature rows are gathered by team index, so serving does
+no per-request dict building or DataFrame scans.
+
+Where shared memory is unavailable the store keeps a private array with
+the same layout.
+"""
+import atexit
+import hashlib
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .elo import expected_score
+from .features import MATCHUP_WEIGHT, SEASON_WEIGHT, TEAM_STAT_KEYS
+
+# Written after the data, so attaching workers know the block is filled
+MAGIC = 0x4E424146
+HEADER_BYTES = 16
+ATTACH_TIMEOUT_SECONDS = 2.0
+
+ELO_INDEX = len(TEAM_STAT_KEYS)
+VECTOR_WIDTH = len(TEAM_STAT_KEYS) + 1
+
+
+def block_name(version):
+    """Shared memory name for a data version of this project directory"""
+    digest = hashlib.sha1(f"{os.getcwd()}|{version}".encode()).hexdigest()[:16]
+    return f"nba_ai_features_{digest}"
+
+
+def block_size(n_teams):
+    return HEADER_BYTES + 4 * n_teams * (VECTOR_WIDTH + n_teams)
+
+
+def _untracked(**kwargs):
+    """A SharedMemory the resource tracker leaves alone.
+
+    Python < 3.13 tracks attached blocks as well as created ones and unlinks
+    them when the process exits, which would pull the block out from under
+    the other workers; the creator unlinks its block itself (_release).
+    """
+    block = shared_memory.SharedMemory(**kwargs)
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def _release(block):
+    # unlink() unregisters the name, so register it again first
+    resource_tracker.register(block._name, 'shared_memory')
+    block.unlink()
+
+
+def _attach(name, size):
+    """Map an existing block once its creator has filled it, else None"""
+    block = _untracked(name=name)
+    header = np.ndarray((1,), dtype=np.uint32, buffer=block.buf)
+    deadline = time.monotonic() + ATTACH_TIMEOUT_SECONDS
+    while block.size >= size and header[0] != MAGIC and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if block.size >= size and header[0] == MAGIC:
+        return block
+    del header
+    block.close()
+    return None
+
+
+class FeatureStore:
+    """Team vectors and head-to-head wins for one data version"""
+
+    def __init__(self, teams, buffer, block=None):
+        self.teams = list(teams)
+        self.index = {abbr: i for i, abbr in enumerate(self.teams)}
+        self.shared = block is not None
+        self._block = block
+        n = len(self.teams)
+        self._header = np.ndarray((1,), dtype=np.uint32, buffer=buffer)
+        self.vectors = np.ndarray((n, VECTOR_WIDTH), dtype=np.float32, buffer=buffer, offset=HEADER_BYTES)
+        self.h2h_wins = np.ndarray(
+            (n, n), dtype=np.float32, buffer=buffer, offset=HEADER_BYTES + 4 * n * VECTOR_WIDTH,
+        )
+
+    @classmethod
+    def load(cls, version, teams, fill):
+        """Map the shared block for `version`, creating it with fill(store) if needed"""
+        teams = list(teams)
+        name, size = block_name(version), block_size(len(teams))
+        try:
+            block = _untracked(name=name, create=True, size=size)
+            # Workers that attached keep their mapping; later ones create a fresh block
+            atexit.register(_release, block)
+        except FileExistsError:
+            block = _attach(name, size)
+            if block is not None:
+                return cls(teams, block.buf, block)
+        except OSError as e:
+            print(f"⚠️ Shared feature store unavailable ({e}), using a private copy")
+            block = None
+        if block is None:
+            store = cls(teams, bytearray(size))
+        else:
+            store = cls(teams, block.buf, block)
+        fill(store)
+        store._header[0] = MAGIC
+        return store
+
+    def elo_probability(self, team1_idx, team2_idx):
+        """Elo probability that team1 beats team2 at home"""
+        return expected_score(self.vectors[team1_idx, ELO_INDEX].astype(float),
+                              self.vectors[team2_idx, ELO_INDEX].astype(float))
+
+    def head_to_head(self, team1_idx, team2_idx):
+        """(team1 wins, team2 wins) over every cached meeting"""
+        return self.h2h_wins[team1_idx, team2_idx], self.h2h_wins[team2_idx, team1_idx]
+
+    def rows(self, team1_idx, team2_idx, elo=True):
+        """Feature matrix for home teams team1_idx against team2_idx, in features.model_columns() order"""
+        team1_idx = np.asarray(team1_idx, dtype=np.intp).reshape(-1)
+        team2_idx = np.asarray(team2_idx, dtype=np.intp).reshape(-1)
+        n_stats = len(TEAM_STAT_KEYS)
+        n_season = 2 * n_stats + 2 + (1 if elo else 0)
+
+        X = np.empty((len(team1_idx), n_season + 2))
+        X[:, 0:2 * n_stats:2] = self.vectors[team1_idx, :n_stats]
+        X[:, 1:2 * n_stats:2] = self.vectors[team2_idx, :n_stats]
+        X[:, 2 * n_stats] = 1
+        X[:, 2 * n_stats + 1] = 0
+        if elo:
+            X[:, 2 * n_stats + 2] = self.elo_probability(team1_idx, team2_idx)
+        X[:, :n_season] *= SEASON_WEIGHT
+
+        team1_wins, team2_wins = self.head_to_head(team1_idx, team2_idx)
+        total = team1_wins + team2_wins
+        played = total > 0
+        for column, wins in ((n_season, team1_wins), (n_season + 1, team2_wins)):
+            X[:, column] = np.divide(wins, total, out=np.full(len(total), 0.5), where=played) * MATCHUP_WEIGHT
+        return X
+
+    def close(self):
+        if self._block is not None:
+            self._header = self.vectors = self.h2h_wins = None
+            self._block.close()
+            self._block = None
@@ -0,0 +1,66 @@
+"""
+Model feature registry
+
+Every model input is declared once here. training_data.py writes the CSV
+columns from TEAM_FEATURES, train_model.py reads them back in
+season_columns() order, and predictor.feature_store lays out the per-team
+vectors it serves from the same list, so adding or reordering a feature
+is a one-line change.
+
+This module has no Django dependency so the training scripts can use it.
+"""
+from typing import NamedTuple
+
+
+class TeamFeature(NamedTuple):
+    name: str    # CSV column suffix: team1_<name>, team2_<name>
+    source: str  # key in training_data.compute_team_stats() output
+
+
+# Model order: team1 and team2 values are interleaved per feature
+TEAM_FEATURES = [
+    TeamFeature('win_pct', 'win_pct'),
+    TeamFeature('wins', 'wins'),
+    TeamFeature('losses', 'losses'),
+    TeamFeature('recent_win_pct', 'recent_win_pct'),
+    TeamFeature('avg_pts', 'avg_pts'),
+    TeamFeature('avg_pts_allowed', 'avg_pts_allowed'),
+    TeamFeature('fg_pct', 'avg_fg_pct'),
+    TeamFeature('fg3_pct', 'avg_fg3_pct'),
+    TeamFeature('ft_pct', 'avg_ft_pct'),
+    TeamFeature('off_reb', 'avg_off_reb'),
+    TeamFeature('def_reb', 'avg_def_reb'),
+    TeamFeature('turnovers', 'avg_turnovers'),
+    TeamFeature('ast_to_to_ratio', 'assist_turnover_ratio'),
+]
+TEAM_STAT_KEYS = [feature.name for feature in TEAM_FEATURES]
+
+HOME_COLUMNS = ['team1_home', 'team2_home']
+# team1's pre-game Elo win probability
+ELO_COLUMN = 'elo_win_prob'
+MATCHUP_COLUMNS = ['team1_matchup_win_pct', 'team2_matchup_win_pct']
+
+# Season features carry 90% of the weight, head-to-head 10%
+SEASON_WEIGHT = 0.9
+MATCHUP_WEIGHT = 0.1
+
+SIDES = ('team1', 'team2')
+
+
+def season_columns(elo=True):
+    """Season feature columns in model order (without Elo for pre-Elo models)"""
+    columns = [f'{side}_{key}' for key in TEAM_STAT_KEYS for side in SIDES]
+    return columns + HOME_COLUMNS + ([ELO_COLUMN] if elo else [])
+
+
+def model_columns(elo=True):
+    """Every column of a model feature row, in order"""
+    return season_columns(elo) + MATCHUP_COLUMNS
+
+
+FEATURE_COUNT = len(model_columns())
+
+
+def team_columns(side, stats):
+    """CSV columns for one side of a game from a compute_team_stats() entry"""
+    return {f'{side}_{feature.name}': stats[feature.source] for feature in TEAM_FEATURES}
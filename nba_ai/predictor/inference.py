@@ -0,0 +1,179 @@
+"""
+Cached training data, the trained model and feature assembly for predictions
+"""
+import os
+import pandas as pd
+import numpy as np
+import joblib
+from .elo import matchup_elo
+from .encoding import dumps, msgpack, packb
+from .feature_store import ELO_INDEX, FeatureStore
+from .features import FEATURE_COUNT, TEAM_STAT_KEYS
+
+TRAINING_DATA_FILE = 'nba_training_data.csv'
+MODEL_FILE = 'nba_predictor_model.pkl'
+LINEAR_MODEL_FILE = 'nba_predictor_linear.pkl'
+
+# Load cached training data and model once when server starts
+try:
+    training_data = pd.read_csv(TRAINING_DATA_FILE)
+    print(f"Loaded {len(training_data)} cached games")
+except:
+    training_data = None
+    print("No cached training data found")
+
+try:
+    model = joblib.load(MODEL_FILE)
+    print("ML Model loaded successfully")
+except:
+    model = None
+    print("ML Model not found")
+
+try:
+    linear_model = joblib.load(LINEAR_MODEL_FILE)
+    print("Linear model loaded successfully")
+except:
+    linear_model = None
+    print("Linear model not found")
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'none'
+    return f"{int(stat.st_mtime)}-{stat.st_size}"
+
+
+def current_data_version():
+    """DATA_VERSION of the data and model files as they are on disk now"""
+    return f"{_file_version(TRAINING_DATA_FILE)}.{_file_version(MODEL_FILE)}"
+
+
+# Identifies the loaded data + model; anything derived from them is cached per version.
+# Both are read once per process, so web workers serve new files after a restart
+# (job workers reload them, see utils.load_inference)
+DATA_VERSION = current_data_version()
+
+
+def _compute_team_stats(team_abbr):
+    """Latest stats for a team from cached data instead of the API"""
+    if training_data is None:
+        return None
+
+    # The team's most recent game, from whichever side it played on
+    for side in ('team1', 'team2'):
+        games = training_data[training_data[f'{side}_abbr'] == team_abbr]
+        if not games.empty:
+            latest = games.iloc[-1]
+            return {
+                'abbreviation': team_abbr,
+                **{key: latest[f'{side}_{key}'] for key in TEAM_STAT_KEYS},
+            }
+    return None
+
+
+def _load_team_stats():
+    """Per-team stat dicts (plain Python types) and their encoded JSON, built once"""
+    if training_data is None:
+        return {}, {}
+
+    # Elo after replaying every cached game
+    _, _, engine = matchup_elo(training_data)
+
+    team_stats = {}
+    for abbr in pd.unique(training_data[['team1_abbr', 'team2_abbr']].values.ravel()):
+        stats = _compute_team_stats(abbr)
+        team_stats[abbr] = {
+            key: value.item() if isinstance(value, np.generic) else value
+            for key, value in stats.items()
+        }
+        team_stats[abbr]['elo'] = round(float(engine.rating(abbr)), 1)
+    return team_stats, {abbr: dumps(stats) for abbr, stats in team_stats.items()}
+
+
+TEAM_STATS, TEAM_STATS_JSON = _load_team_stats()
+TEAM_STATS_MSGPACK = {abbr: packb(stats) for abbr, stats in TEAM_STATS.items()} if msgpack is not None else {}
+
+
+def get_team_stats_from_cache(team_abbr):
+    """Precomputed stats for a team, or None if it is not in the cached data"""
+    return TEAM_STATS.get(team_abbr)
+
+
+def get_team_stats_json(team_abbr):
+    """Pre-encoded JSON bytes of get_team_stats_from_cache(team_abbr)"""
+    return TEAM_STATS_JSON.get(team_abbr)
+
+
+def get_team_stats_msgpack(team_abbr):
+    """Pre-packed MessagePack bytes of get_team_stats_from_cache(team_abbr) (needs msgpack)"""
+    return TEAM_STATS_MSGPACK.get(team_abbr)
+
+
+def _fill_feature_store(store):
+    """Team vectors from TEAM_STATS and head-to-head wins from every cached game"""
+    for abbr, i in store.index.items():
+        stats = TEAM_STATS[abbr]
+        store.vectors[i, :ELO_INDEX] = [stats[key] for key in TEAM_STAT_KEYS]
+        store.vectors[i, ELO_INDEX] = stats['elo']
+
+    store.h2h_wins[:] = 0
+    if training_data is not None and len(training_data):
+        team1 = training_data['team1_abbr'].map(store.index).to_numpy()
+        team2 = training_data['team2_abbr'].map(store.index).to_numpy()
+        team1_won = training_data['winner'].to_numpy() == 1
+        np.add.at(store.h2h_wins, (np.where(team1_won, team1, team2), np.where(team1_won, team2, team1)), 1)
+
+
+FEATURE_STORE = FeatureStore.load(DATA_VERSION, sorted(TEAM_STATS), _fill_feature_store)
+
+
+def team_index(team_abbr):
+    """Row of a team in FEATURE_STORE, or None if it is not in the cached data"""
+    return FEATURE_STORE.index.get(team_abbr)
+
+
+def get_head_to_head_from_cache(team1_abbr, team2_abbr):
+    """Get head-to-head record from cached data"""
+    team1, team2 = team_index(team1_abbr), team_index(team2_abbr)
+    if team1 is None or team2 is None:
+        return {'team1_wins': 0, 'team2_wins': 0, 'total': 0}
+
+    team1_wins, team2_wins = (int(wins) for wins in FEATURE_STORE.head_to_head(team1, team2))
+    total = team1_wins + team2_wins
+    if total == 0:
+        return {'team1_wins': 0, 'team2_wins': 0, 'total': 0}
+
+    return {
+        'team1_wins': team1_wins,
+        'team2_wins': team2_wins,
+        'total': total,
+        'team1_win_pct': team1_wins / total,
+        'team2_win_pct': team2_wins / total,
+    }
+
+
+# Models trained before the Elo feature was added expect one column fewer
+ELO_FEATURE = getattr(model, 'n_features_in_', FEATURE_COUNT) == FEATURE_COUNT
+LINEAR_ELO_FEATURE = linear_model is None or linear_model['n_features'] == FEATURE_COUNT
+
+
+def feature_rows(team1_idx, team2_idx, elo=None):
+    """Feature matrix for home teams against away teams, given as team_index() rows.
+
+    `elo` overrides whether the Elo column is included (default: whatever
+    the loaded forest expects).
+    """
+    return FEATURE_STORE.rows(team1_idx, team2_idx, elo=ELO_FEATURE if elo is None else elo)
+
+
+def predict_proba(X):
+    """Class probabilities for a 2-D feature matrix; column 1 is team1 winning"""
+    return model.predict_proba(X)
+
+
+def predict_fast(X):
+    """Team1 win probabilities from the linear tier: one dot product per row"""
+    z = X @ linear_model['coef'] + linear_model['intercept']
+    return 1.0 / (1.0 + np.exp(-z))
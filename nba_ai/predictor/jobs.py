@@ -0,0 +1,231 @@
+"""
+Background jobs
+
+Expensive work (ingestion, data collection, retraining, precomputing
+predictions) runs in `manage.py run_jobs` workers, never in the web
+process. Jobs are rows in the Job table:
+
+    enqueue()        adds a job, or returns the queued/running job that
+                     already has the same dedupe_key
+    schedule_due()   enqueues settings.JOB_SCHEDULES entries once per slot
+                     (daily "at" HH:MM, or "every_minutes")
+    claim()          takes the oldest due job whose type is under its
+                     settings.JOB_CONCURRENCY limit, across all workers
+    work()           the worker loop
+
+Handlers are registered with @job and called with the job's args.
+Retraining runs the training scripts in a subprocess; web workers pick
+up new models when they restart. The nightly retrain is incremental and
+registers each increment as a PredictionModel version.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Job
+from .ratings import rebuild_ratings
+from .utils import get_recent_games, precompute_predictions
+
+HANDLERS = {}
+SCRIPT_OUTPUT_CHARS = 2000
+
+
+def job(job_type):
+    """Register the decorated function as the handler for job_type"""
+    def register(handler):
+        HANDLERS[job_type] = handler
+        return handler
+    return register
+
+
+def concurrency(job_type):
+    return getattr(settings, 'JOB_CONCURRENCY', {}).get(job_type, 1)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_script(script, *args, timeout=None):
+    """Run one of the project's scripts in a child process; returns the end of its output"""
+    completed = subprocess.run(
+        [sys.executable, script, *args], cwd=settings.BASE_DIR, capture_output=True, text=True,
+        timeout=timeout or getattr(settings, 'JOB_SCRIPT_TIMEOUT_SECONDS', 3 * 3600),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{script} exited with {completed.returncode}: {completed.stderr[-SCRIPT_OUTPUT_CHARS:]}")
+    return completed.stdout[-SCRIPT_OUTPUT_CHARS:]
+
+
+@job('ingest')
+def ingest(days=2):
+    return {'games_created': get_recent_games(days=days)}
+
+
+@job('collect_training_data')
+def collect_training_data():
+    return {'output': run_script('training_data.py')}
+
+
+@job('retrain')
+def retrain(collect=False, incremental=False):
+    """With incremental, only games new since the last run are trained on (see train_model.py)"""
+    output = run_script('training_data.py') if collect else ''
+    return {'output': output + run_script('train_model.py', *(['--incremental'] if incremental else []))}
+
+
+@job('precompute')
+def precompute(days=7):
+    return {'predictions': precompute_predictions(days=days)}
+
+
+@job('rebuild_ratings')
+def rebuild():
+    return {'ratings': rebuild_ratings()}
+
+
+def enqueue(job_type, args=None, dedupe_key=None, run_at=None, max_attempts=1):
+    """(job, created); an active job with the same dedupe_key is returned instead of a new one"""
+    if job_type not in HANDLERS:
+        raise ValueError(f"Unknown job type {job_type!r}")
+    if dedupe_key:
+        existing = Job.objects.active().filter(dedupe_key=dedupe_key).first()
+        if existing:
+            return existing, False
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                job_type=job_type, args=args or {}, dedupe_key=dedupe_key,
+                run_at=run_at or timezone.now(), max_attempts=max_attempts,
+            ), True
+    except IntegrityError:
+        # Another process enqueued the same key in between
+        return Job.objects.active().get(dedupe_key=dedupe_key), False
+
+
+def latest_slot(entry, now):
+    """Start of the most recent slot of a schedule entry at or before now"""
+    if 'every_minutes' in entry:
+        period = entry['every_minutes'] * 60
+        return datetime.fromtimestamp(now.timestamp() // period * period, tz=now.tzinfo)
+    hour, minute = (int(part) for part in entry['at'].split(':'))
+    local = timezone.localtime(now)
+    slot = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return slot if slot <= local else slot - timedelta(days=1)
+
+
+def schedule_due(now=None):
+    """Enqueue each schedule's current slot unless it already has a job; returns jobs created"""
+    now = now or timezone.now()
+    created = 0
+    for entry in getattr(settings, 'JOB_SCHEDULES', []):
+        slot = latest_slot(entry, now)
+        key = f"schedule:{entry['name']}:{slot.isoformat()}"
+        # Finished jobs count too: each slot runs once
+        if Job.objects.filter(dedupe_key=key).exists():
+            continue
+        created += enqueue(entry['job_type'], entry.get('args'), dedupe_key=key, run_at=slot,
+                           max_attempts=entry.get('max_attempts', 1))[1]
+    return created
+
+
+def recover_stale(now=None):
+    """Requeue (or fail) running jobs whose worker has not finished them in JOB_STALE_SECONDS"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'JOB_STALE_SECONDS', 6 * 3600))
+    stale = Job.objects.filter(status='running', started_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(status='queued', run_at=now, worker='')
+    failed = stale.update(status='failed', finished_at=now, error='Worker stopped before the job finished')
+    return requeued + failed
+
+
+def claim(worker, job_types=None, now=None):
+    """Mark the oldest due job that fits the concurrency limits as running and return it"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        running = dict(
+            Job.objects.filter(status='running').values('job_type').annotate(n=Count('id')).values_list('job_type', 'n')
+        )
+        full = [job_type for job_type, n in running.items() if n >= concurrency(job_type)]
+        candidates = Job.objects.due(now).exclude(job_type__in=full).filter(job_type__in=job_types or list(HANDLERS))
+        candidate = candidates.select_for_update(skip_locked=True).order_by('run_at', 'pk').first()
+        if candidate is None:
+            return None
+        claimed = Job.objects.filter(pk=candidate.pk, status='queued').update(
+            status='running', worker=worker, started_at=now, attempts=F('attempts') + 1,
+        )
+    if not claimed:
+        return None
+    candidate.refresh_from_db()
+    return candidate
+
+
+def run(job):
+    """Run a claimed job and record its outcome; returns the final status"""
+    print(f"⚙️ Running {job}")
+    try:
+        result = HANDLERS[job.job_type](**job.args)
+    except Exception:
+        error = traceback.format_exc()
+        retry = job.attempts < job.max_attempts
+        Job.objects.filter(pk=job.pk).update(
+            status='queued' if retry else 'failed',
+            run_at=timezone.now() + timedelta(seconds=getattr(settings, 'JOB_RETRY_SECONDS', 300)),
+            finished_at=None if retry else timezone.now(),
+            error=error,
+        )
+        print(f"❌ {job.job_type} #{job.pk} failed{', will retry' if retry else ''}: {error.strip().splitlines()[-1]}")
+        return 'queued' if retry else 'failed'
+
+    Job.objects.filter(pk=job.pk).update(status='succeeded', finished_at=timezone.now(), result=result, error='')
+    print(f"✅ {job.job_type} #{job.pk} done")
+    return 'succeeded'
+
+
+def _run_in_thread(job):
+    try:
+        return run(job)
+    except Exception as e:
+        print(f"❌ Could not record the outcome of {job}: {e}")
+    finally:
+        close_old_connections()
+
+
+def work(threads=1, once=False, poll=None, job_types=None, schedule=True, worker=None):
+    """Claim and run jobs, up to `threads` at a time; with once, stop when nothing is due.
+
+    A single-threaded worker runs jobs inline between queue checks.
+    """
+    worker = worker or worker_name()
+    poll = poll if poll is not None else getattr(settings, 'JOB_POLL_SECONDS', 5)
+    started = 0
+    with (ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job') if threads > 1 else nullcontext()) as pool:
+        pending = set()
+        while True:
+            pending = {future for future in pending if not future.done()}
+            if schedule:
+                schedule_due()
+            recover_stale()
+            while len(pending) < threads:
+                claimed = claim(worker, job_types)
+                if claimed is None:
+                    break
+                started += 1
+                if pool is None:
+                    run(claimed)
+                else:
+                    pending.add(pool.submit(_run_in_thread, claimed))
+            if once and not pending:
+                return started
+            time.sleep(0.05 if once else poll)
@@ -0,0 +1,126 @@
+"""
+Live score polling
+
+Polls the NBA live scoreboard for the games we still consider scheduled or
+live, and writes only the rows whose status or score moved since the last
+poll. Games that go final are handed to utils.finalize_games().
+"""
+import asyncio
+import json
+import urllib.request
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Game
+from .utils import finalize_games
+
+# gameStatus codes used by the live scoreboard feed
+STATUS_BY_CODE = {1: 'scheduled', 2: 'live', 3: 'finished'}
+TRACKED_STATUSES = ['scheduled', 'live']
+
+
+class LiveScorePoller:
+    """Diff the live scoreboard against an in-memory snapshot of tracked games"""
+
+    def __init__(self, url=None, interval=15.0, idle_interval=300.0, timeout=10.0, log=print):
+        self.url = url or settings.NBA_LIVE_SCOREBOARD_URL
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.timeout = timeout
+        self.log = log
+        # nba_game_id -> (pk, status, home_score, away_score)
+        self.snapshot = {}
+
+    def fetch_scoreboard(self):
+        request = urllib.request.Request(self.url, headers={
+            'Accept': 'application/json',
+            'User-Agent': 'nba-ai live poller',
+        })
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+    async def refresh_tracked(self):
+        """Track today's (and yesterday's late) games that have not finished yet"""
+        today = timezone.localdate()
+        rows = Game.objects.filter(
+            status__in=TRACKED_STATUSES,
+            game_date__date__gte=today - timedelta(days=1),
+            game_date__date__lte=today,
+        ).values_list('nba_game_id', 'pk', 'status', 'home_score', 'away_score')
+
+        tracked = {}
+        async for nba_game_id, pk, status, home_score, away_score in rows:
+            # Keep what we last saw for games already in the snapshot
+            tracked[nba_game_id] = self.snapshot.get(nba_game_id, (pk, status, home_score, away_score))
+        self.snapshot = tracked
+        return tracked
+
+    def diff(self, payload):
+        """Return [(nba_game_id, pk, status, home_score, away_score)] for rows that changed"""
+        changes = []
+        for game in payload.get('scoreboard', {}).get('games', []):
+            current = self.snapshot.get(str(game.get('gameId')))
+            if current is None:
+                continue
+
+            status = STATUS_BY_CODE.get(game.get('gameStatus'))
+            if status is None:
+                continue
+            if status == 'scheduled':
+                home_score = away_score = None
+            else:
+                home_score = game.get('homeTeam', {}).get('score')
+                away_score = game.get('awayTeam', {}).get('score')
+
+            pk = current[0]
+            if (status, home_score, away_score) != current[1:]:
+                changes.append((str(game['gameId']), pk, status, home_score, away_score))
+        return changes
+
+    async def apply(self, changes):
+        """Write changed rows and run finalization for games that went final"""
+        now = timezone.now()
+        finished = []
+        for nba_game_id, pk, status, home_score, away_score in changes:
+            await Game.objects.filter(pk=pk).aupdate(
+                status=status, home_score=home_score, away_score=away_score, updated_at=now,
+            )
+            if status == 'finished':
+                finished.append(pk)
+                self.snapshot.pop(nba_game_id, None)
+            else:
+                self.snapshot[nba_game_id] = (pk, status, home_score, away_score)
+            self.log(f"   🔄 {nba_game_id}: {status} {away_score}-{home_score}")
+
+        if finished:
+            await sync_to_async(finalize_games)(finished)
+        return finished
+
+    async def poll_once(self):
+        """One poll cycle. Returns the list of changes that were written."""
+        if not await self.refresh_tracked():
+            return []
+
+        payload = await asyncio.to_thread(self.fetch_scoreboard)
+        changes = self.diff(payload)
+        if changes:
+            await self.apply(changes)
+        return changes
+
+    async def run(self, stop=None):
+        """Poll until `stop` (an asyncio.Event) is set"""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.poll_once()
+            except Exception as e:
+                self.log(f"   ❌ Error polling live scores: {e}")
+
+            delay = self.interval if self.snapshot else self.idle_interval
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
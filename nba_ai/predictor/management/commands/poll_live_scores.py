@@ -0,0 +1,34 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from predictor.live import LiveScorePoller
+
+
+class Command(BaseCommand):
+    help = "Poll the live scoreboard and write score/status changes for today's games"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='scoreboard URL (defaults to settings.NBA_LIVE_SCOREBOARD_URL)')
+        parser.add_argument('--interval', type=float, default=15.0, help='seconds between polls while games are tracked')
+        parser.add_argument('--idle-interval', type=float, default=300.0, help='seconds between polls when nothing is tracked')
+        parser.add_argument('--once', action='store_true', help='poll a single time and exit')
+
+    def handle(self, *args, **options):
+        poller = LiveScorePoller(
+            url=options['url'],
+            interval=options['interval'],
+            idle_interval=options['idle_interval'],
+            log=self.stdout.write,
+        )
+
+        if options['once']:
+            changes = asyncio.run(poller.poll_once())
+            self.stdout.write(self.style.SUCCESS(f"{len(changes)} games changed"))
+            return
+
+        self.stdout.write(f"Polling {poller.url} every {poller.interval:.0f}s (Ctrl+C to stop)")
+        try:
+            asyncio.run(poller.run())
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from predictor.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute every team's Elo history from all finished games"
+
+    def handle(self, *args, **options):
+        rows = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Stored {rows} team ratings"))
@@ -0,0 +1,77 @@
+import io
+import json
+import pstats
+import shutil
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.profiling import profile_dir, stored_profiles
+
+
+def sampled_functions(paths):
+    """(Counter of self samples, Counter of inclusive samples, total samples) per function"""
+    own, inclusive, total = Counter(), Counter(), 0
+    for path in paths:
+        data = json.loads(path.read_text())
+        total += data['samples']
+        for stack, count in data['stacks'].items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+    return own, inclusive, total
+
+
+class Command(BaseCommand):
+    help = "List stored request profiles and summarize their hottest functions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help='only profiles of this view (url name)')
+        parser.add_argument('--id', help='only the profile with this X-Profile-Id')
+        parser.add_argument('--last', type=int, help='only the newest N matching profiles')
+        parser.add_argument('--top', type=int, default=20, help='functions to show in the summary')
+        parser.add_argument('--sort', choices=['tottime', 'cumulative'], default='tottime',
+                            help='order functions by own time or including callees')
+        parser.add_argument('--list', action='store_true', help='only list the matching profiles')
+        parser.add_argument('--clear', action='store_true', help='delete every stored profile')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            shutil.rmtree(profile_dir(), ignore_errors=True)
+            self.stdout.write("Deleted all stored profiles")
+            return
+
+        profiles = stored_profiles() if profile_dir().exists() else []
+        if options['view']:
+            profiles = [profile for profile in profiles if profile['view'] == options['view']]
+        if options['id']:
+            profiles = [profile for profile in profiles if profile['id'] == options['id']]
+        if options['last']:
+            profiles = profiles[-options['last']:]
+        if not profiles:
+            raise CommandError(f"No matching profiles in {profile_dir()}")
+
+        self.stdout.write(f"{'id':<20} {'view':<28} {'status':>6} {'ms':>7} {'kind':<8}")
+        for profile in profiles:
+            self.stdout.write(f"{profile['id']:<20} {profile['view']:<28} {profile['status']:>6} "
+                              f"{profile['elapsed_ms']:>7} {profile['kind']:<8}")
+        if options['list']:
+            return
+
+        traced = [str(profile['path']) for profile in profiles if profile['kind'] == 'cprofile']
+        if traced:
+            self.stdout.write(f"\ncProfile, {len(traced)} request{'s' if len(traced) != 1 else ''}:")
+            out = io.StringIO()
+            pstats.Stats(*traced, stream=out).strip_dirs().sort_stats(options['sort']).print_stats(options['top'])
+            self.stdout.write(out.getvalue().split('\n\n', 1)[-1].rstrip())
+
+        sampled = [profile['path'] for profile in profiles if profile['kind'] == 'sample']
+        if sampled:
+            own, inclusive, total = sampled_functions(sampled)
+            total = max(total, 1)
+            ranking = own if options['sort'] == 'tottime' else inclusive
+            self.stdout.write(f"\nSampled, {len(sampled)} request{'s' if len(sampled) != 1 else ''}, {total} samples:")
+            self.stdout.write(f"{'self':>7} {'total':>7}  function")
+            for function, _ in ranking.most_common(options['top']):
+                self.stdout.write(f"{own[function] / total:>7.1%} {inclusive[function] / total:>7.1%}  {function}")
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background jobs (ingest, retrain, precompute...) and enqueue scheduled ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=1, help='jobs this worker runs at once')
+        parser.add_argument('--types', help='comma-separated job types this worker takes (default: all)')
+        parser.add_argument('--poll', type=float, help='seconds between queue checks (default: settings.JOB_POLL_SECONDS)')
+        parser.add_argument('--once', action='store_true', help='run whatever is due, then exit')
+        parser.add_argument('--no-schedule', action='store_true', help='do not enqueue settings.JOB_SCHEDULES')
+        parser.add_argument('--enqueue', metavar='TYPE', help='add a job of this type and exit')
+        parser.add_argument('--job-args', default='{}', help='JSON keyword arguments for --enqueue')
+        parser.add_argument('--dedupe-key', help='skip --enqueue if an active job has this key')
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            try:
+                job, created = jobs.enqueue(options['enqueue'], json.loads(options['job_args']), options['dedupe_key'])
+            except (ValueError, json.JSONDecodeError) as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"{'Queued' if created else 'Already active'}: {job}")
+            return
+
+        job_types = options['types'].split(',') if options['types'] else None
+        unknown = set(job_types or []) - set(jobs.HANDLERS)
+        if unknown:
+            raise CommandError(f"Unknown job types: {', '.join(sorted(unknown))} (known: {', '.join(jobs.HANDLERS)})")
+
+        worker = jobs.worker_name()
+        if not options['once']:
+            self.stdout.write(f"Worker {worker} running {options['threads']} at a time (Ctrl+C to stop)")
+        try:
+            started = jobs.work(
+                threads=options['threads'], once=options['once'], poll=options['poll'],
+                job_types=job_types, schedule=not options['no_schedule'], worker=worker,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Ran {started} jobs"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, F, Q
+from django.db.models.functions import Abs
+
+from predictor.models import ShadowPrediction
+
+
+class Command(BaseCommand):
+    help = "Compare shadow models with the served model on the traffic they both saw"
+
+    def handle(self, *args, **options):
+        same_pick = (
+            Q(team1_win_probability__gt=0.5, served_team1_win_probability__gt=0.5)
+            | Q(team1_win_probability__lte=0.5, served_team1_win_probability__lte=0.5)
+        )
+        rows = ShadowPrediction.objects.values('model_version').annotate(
+            total=Count('id'),
+            agree=Count('id', filter=same_pick),
+            mean_gap=Avg(Abs(F('team1_win_probability') - F('served_team1_win_probability'))),
+            scored=Count('id', filter=Q(is_correct__isnull=False)),
+            correct=Count('id', filter=Q(is_correct=True)),
+        ).order_by('model_version')
+
+        if not rows:
+            self.stdout.write("No shadow predictions recorded yet")
+            return
+
+        self.stdout.write(f"{'version':<12} {'rows':>8} {'agree':>7} {'mean |dp|':>10} {'scored':>7} {'accuracy':>9}")
+        for row in rows:
+            accuracy = f"{row['correct'] / row['scored']:.1%}" if row['scored'] else '-'
+            self.stdout.write(
+                f"{row['model_version']:<12} {row['total']:>8} {row['agree'] / row['total']:>7.1%} "
+                f"{row['mean_gap']:>10.3f} {row['scored']:>7} {accuracy:>9}"
+            )
@@ -0,0 +1,51 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.models import Season
+from predictor.simulation import simulate_season
+
+
+class Command(BaseCommand):
+    help = "Simulate the remaining scheduled games and playoffs to estimate seeding and championship odds"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', help="season year such as 2024-25 (defaults to the current season)")
+        parser.add_argument('--sims', type=int, default=10000, help='number of simulated seasons')
+        parser.add_argument('--seed', type=int, help='random seed for a reproducible run')
+        parser.add_argument('--workers', type=int, help='worker processes (default: one, or a pool for very large runs)')
+        parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            season = Season.objects.get(year=options['season']) if options['season'] else Season.objects.get(is_current=True)
+        except Season.DoesNotExist:
+            raise CommandError(f"Season {options['season'] or '(current)'} not found")
+
+        started = time.perf_counter()
+        try:
+            result = simulate_season(season, n_sims=options['sims'], seed=options['seed'], workers=options['workers'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        self.stdout.write(
+            f"{result['season']}: {result['simulations']:,} simulations of {result['remaining_games']} remaining games "
+            f"in {elapsed:.2f}s ({result['workers']} worker{'s' if result['workers'] != 1 else ''})"
+        )
+        conference = None
+        for row in result['teams']:
+            if row['conference'] != conference:
+                conference = row['conference']
+                self.stdout.write(f"\n{conference:<6} {'W-L':>7} {'proj':>6} {'p10-p90':>9} {'playoffs':>9} "
+                                  f"{'#1 seed':>8} {'conf F':>7} {'finals':>7} {'title':>7}")
+            self.stdout.write(
+                f"{row['abbreviation']:<6} {row['wins']:>3}-{row['losses']:<3} {row['projected_wins']:>6} "
+                f"{row['wins_p10']:>4}-{row['wins_p90']:<4} {row['playoffs']:>9.1%} {row['seed_odds'][0]:>8.1%} "
+                f"{row['conference_finals']:>7.1%} {row['finals']:>7.1%} {row['champion']:>7.1%}"
+            )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['game_date'], name='game_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['status', 'game_date'], name='game_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['season', 'status', 'game_date'], name='game_season_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['home_team', 'game_date'], name='game_home_team_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['away_team', 'game_date'], name='game_away_team_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gameprediction',
+            index=models.Index(fields=['model_version', 'is_correct'], name='gamepred_version_correct_idx'),
+        ),
+    ]
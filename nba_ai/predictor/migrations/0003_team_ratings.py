@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('rating', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='predictor.game')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_ratings', to='predictor.season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='predictor.team')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['team', 'date'], name='teamrating_team_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:46
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0003_team_ratings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='predictionmodel',
+            name='is_shadow',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ShadowPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(max_length=20)),
+                ('team1', models.CharField(max_length=5)),
+                ('team2', models.CharField(max_length=5)),
+                ('predicted_winner', models.CharField(max_length=5)),
+                ('team1_win_probability', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('served_team1_win_probability', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('is_correct', models.BooleanField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shadow_predictions', to='predictor.game')),
+                ('prediction_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shadow_predictions', to='predictor.predictionmodel')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['model_version', 'created_at'], name='shadowpred_version_created_idx')],
+            },
+        ),
+    ]
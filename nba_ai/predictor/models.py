@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 # Create your models here.
 
 class Team(models.Model):
@@ -75,6 +77,13 @@ class Game(models.Model):
     class Meta:
         ordering = ['-game_date']
         unique_together = ['home_team', 'away_team', 'game_date']
+        indexes = [
+            models.Index(fields=['game_date'], name='game_date_idx'),
+            models.Index(fields=['status', 'game_date'], name='game_status_date_idx'),
+            models.Index(fields=['season', 'status', 'game_date'], name='game_season_status_date_idx'),
+            models.Index(fields=['home_team', 'game_date'], name='game_home_team_date_idx'),
+            models.Index(fields=['away_team', 'game_date'], name='game_away_team_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.away_team.abbreviation} @ {self.home_team.abbreviation} - {self.game_date.strftime('%Y-%m-%d')}"
@@ -135,6 +144,58 @@ class TeamStats(models.Model):
         return f"{self.team.name} - {self.season.year}"
 
 
+class TeamRating(models.Model):
+    """Elo rating of a team after its game on a given date"""
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='ratings')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='team_ratings')
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='ratings', null=True, blank=True)
+    date = models.DateField()
+    rating = models.FloatField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['team', 'date'], name='teamrating_team_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.team.abbreviation} {self.date}: {self.rating:.0f}"
+
+
+class GamePredictionQuerySet(models.QuerySet):
+    """Set-based operations over predictions"""
+
+    def update_accuracy(self):
+        """Score every prediction whose game is finished in a single UPDATE.
+
+        The winner is resolved inside the database from the game's scores, so
+        no Game or Team rows are loaded. Returns the number of rows scored.
+        """
+        winner_id = Subquery(
+            Game.objects.filter(pk=OuterRef('game_id')).annotate(
+                winner_id=Case(
+                    When(home_score__gt=F('away_score'), then=F('home_team_id')),
+                    default=F('away_team_id'),
+                )
+            ).values('winner_id')[:1]
+        )
+        return self.filter(
+            game__status='finished',
+            game__home_score__isnull=False,
+            game__away_score__isnull=False,
+        ).exclude(
+            Q(game__home_score=0) | Q(game__away_score=0)
+        ).update(
+            is_correct=Case(
+                When(predicted_winner_id=winner_id, then=Value(True)),
+                default=Value(False),
+            ),
+            updated_at=timezone.now(),
+        )
+
+
 class GamePrediction(models.Model):
     """ML Predictions for NBA games"""
     game = models.OneToOneField(Game, on_delete=models.CASCADE, related_name='prediction')
@@ -166,17 +227,21 @@ class GamePrediction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = GamePredictionQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['model_version', 'is_correct'], name='gamepred_version_correct_idx'),
+        ]
 
     def __str__(self):
         return f"Prediction: {self.game} - {self.predicted_winner.abbreviation} ({self.confidence_score:.2f})"
 
     def update_accuracy(self):
         """Update prediction accuracy after game finishes"""
-        if self.game.status == 'finished' and self.game.winner:
-            self.is_correct = (self.predicted_winner == self.game.winner)
-            self.save()
+        if GamePrediction.objects.filter(pk=self.pk).update_accuracy():
+            self.refresh_from_db(fields=['is_correct', 'updated_at'])
 
 
 class PredictionModel(models.Model):
@@ -200,6 +265,7 @@ class PredictionModel(models.Model):
     features_used = models.JSONField(default=list)
 
     is_active = models.BooleanField(default=False)  # Currently used model
+    is_shadow = models.BooleanField(default=False)  # Scored on live traffic alongside the active model
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -210,6 +276,121 @@ class PredictionModel(models.Model):
 
     def __str__(self):
         return f"{self.name} v{self.version} ({self.algorithm})"
+
+
+class ShadowPredictionQuerySet(models.QuerySet):
+    """Set-based operations over shadow predictions"""
+
+    def update_accuracy(self):
+        """Score shadow predictions tied to finished games in a single UPDATE"""
+        winner = Subquery(
+            Game.objects.filter(pk=OuterRef('game_id')).annotate(
+                winner=Case(
+                    When(home_score__gt=F('away_score'), then=F('home_team__abbreviation')),
+                    default=F('away_team__abbreviation'),
+                )
+            ).values('winner')[:1]
+        )
+        return self.filter(
+            game__status='finished',
+            game__home_score__isnull=False,
+            game__away_score__isnull=False,
+        ).exclude(
+            Q(game__home_score=0) | Q(game__away_score=0)
+        ).update(
+            is_correct=Case(
+                When(predicted_winner=winner, then=Value(True)),
+                default=Value(False),
+            ),
+        )
+
+
+class ShadowPrediction(models.Model):
+    """A shadow model's prediction on a request the active model served"""
+    prediction_model = models.ForeignKey(PredictionModel, on_delete=models.CASCADE, related_name='shadow_predictions')
+    model_version = models.CharField(max_length=20)
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='shadow_predictions', null=True, blank=True)
+
+    # team1 is the home side of the feature row
+    team1 = models.CharField(max_length=5)
+    team2 = models.CharField(max_length=5)
+    predicted_winner = models.CharField(max_length=5)
+    team1_win_probability = models.FloatField(
+        validators=[MinValueValidator(0.0), MaxValueValidator(1.0)]
+    )
+    served_team1_win_probability = models.FloatField(
+        validators=[MinValueValidator(0.0), MaxValueValidator(1.0)]
+    )
+
+    is_correct = models.BooleanField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ShadowPredictionQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['model_version', 'created_at'], name='shadowpred_version_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_version}: {self.team2} @ {self.team1} -> {self.predicted_winner}"
+
+
+class JobQuerySet(models.QuerySet):
+    def active(self):
+        """Queued or running jobs (the ones a dedupe_key is unique among)"""
+        return self.filter(status__in=Job.ACTIVE_STATUSES)
+
+    def due(self, now=None):
+        return self.filter(status='queued', run_at__lte=now or timezone.now())
+
+
+class Job(models.Model):
+    """A unit of background work run by `manage.py run_jobs` (see predictor.jobs)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['queued', 'running']
+
+    job_type = models.CharField(max_length=50)
+    args = models.JSONField(default=dict, blank=True)
+    # At most one queued or running job per key
+    dedupe_key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=1)
+
+    worker = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+            models.Index(fields=['dedupe_key'], name='job_dedupe_key_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'], condition=Q(status__in=['queued', 'running']), name='job_active_dedupe_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.job_type} #{self.pk} ({self.status})"
 from django.db import models
 
 # Create your models here.
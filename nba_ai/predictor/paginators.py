@@ -0,0 +1,23 @@
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips COUNT(*) on large, unfiltered tables.
+
+    SQLite has no cheap row-count statistic, but MAX(id) is a single index
+    lookup and is a close upper bound for tables that are rarely deleted from.
+    Filtered querysets, and tables below the threshold, still get an exact count.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            model = self.object_list.model
+            estimate = model._default_manager.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+            if estimate > self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,177 @@
+"""
+Precomputed team profiles
+
+All thirty profiles are built together from the cached training data in a
+single pass (plus one batched model call for the odds grid) and kept until
+the data version changes, so profile requests never touch the DataFrame.
+The data and model are loaded once per process (see inference.DATA_VERSION),
+so new training files reach the profiles on the next restart.
+The same home-win grid feeds the season simulator.
+"""
+import threading
+
+import pandas as pd
+
+from . import inference
+from .encoding import dumps
+
+RECENT_FORM_GAMES = 10
+
+_lock = threading.Lock()
+_cache = {'version': None, 'profiles': {}, 'encoded': {}, 'home_prob': {}}
+
+
+def _team_games(df):
+    """One row per (team, game) from the matchup rows, team-relative columns"""
+    perspectives = []
+    for side, other in (('team1', 'team2'), ('team2', 'team1')):
+        view = pd.DataFrame({
+            'abbreviation': df[f'{side}_abbr'],
+            'opponent': df[f'{other}_abbr'],
+            'season': df['season'],
+            'game_date': df['game_date'],
+            'home': df[f'{side}_home'].astype(bool),
+            'points': df[f'{side}_score'],
+            'opponent_points': df[f'{other}_score'],
+            'won': df['winner'] == (1 if side == 'team1' else 0),
+        })
+        for key in inference.TEAM_STAT_KEYS:
+            view[key] = df[f'{side}_{key}']
+        perspectives.append(view)
+    return pd.concat(perspectives, ignore_index=True).sort_values('game_date', kind='stable')
+
+
+def _season_stats(games):
+    stats = games.groupby(['abbreviation', 'season']).last()[inference.TEAM_STAT_KEYS]
+    splits = games.groupby(['abbreviation', 'season', 'home'])['won'].agg(['sum', 'count'])
+
+    seasons = {}
+    for (abbr, season), entry in stats.to_dict('index').items():
+        for home, label in ((True, 'home'), (False, 'away')):
+            wins, played = splits.loc[(abbr, season, home)] if (abbr, season, home) in splits.index else (0, 0)
+            entry[f'{label}_wins'] = int(wins)
+            entry[f'{label}_losses'] = int(played - wins)
+        seasons.setdefault(abbr, {})[season] = entry
+    return seasons
+
+
+def _recent_form(games):
+    form = {}
+    for abbr, recent in games.groupby('abbreviation').tail(RECENT_FORM_GAMES).groupby('abbreviation'):
+        wins = int(recent['won'].sum())
+        form[abbr] = {
+            'wins': wins,
+            'losses': len(recent) - wins,
+            'games': [
+                {
+                    'game_date': row.game_date,
+                    'opponent': row.opponent,
+                    'home': bool(row.home),
+                    'result': 'W' if row.won else 'L',
+                    'points': int(row.points),
+                    'opponent_points': int(row.opponent_points),
+                }
+                for row in recent.itertuples()
+            ],
+        }
+    return form
+
+
+def _head_to_head(games):
+    records = games.groupby(['abbreviation', 'opponent'])['won'].agg(['sum', 'count'])
+    h2h = {}
+    for (abbr, opponent), (wins, total) in records.iterrows():
+        h2h.setdefault(abbr, {})[opponent] = {
+            'wins': int(wins),
+            'losses': int(total - wins),
+            'total': int(total),
+            'win_pct': round(wins / total, 3) if total else 0.5,
+        }
+    return h2h
+
+
+def _home_win_probabilities():
+    """{(home, away): probability the home team wins} for every ordered pair"""
+    teams = inference.FEATURE_STORE.teams
+    pairs = [(team, opponent) for team in teams for opponent in teams if team != opponent]
+    if not pairs:
+        return {}
+
+    home_idx = [inference.team_index(team) for team, _ in pairs]
+    away_idx = [inference.team_index(opponent) for _, opponent in pairs]
+    if inference.model is not None:
+        probabilities = inference.predict_proba(inference.feature_rows(home_idx, away_idx))[:, 1]
+    else:
+        # Elo when no model is loaded
+        probabilities = inference.FEATURE_STORE.elo_probability(home_idx, away_idx)
+    return dict(zip(pairs, probabilities.tolist()))
+
+
+def _odds(home_prob):
+    """Win percentage for every team against every other, at home and away"""
+    odds = {}
+    for team, opponent in home_prob:
+        odds.setdefault(team, {})[opponent] = {
+            'home': round(home_prob[(team, opponent)] * 100, 1),
+            'away': round((1 - home_prob[(opponent, team)]) * 100, 1),
+        }
+    return odds
+
+
+def build_team_profiles():
+    """(profiles keyed by abbreviation, home win probability grid) from the cached data"""
+    df = inference.training_data
+    if df is None or df.empty:
+        return {}, {}
+
+    games = _team_games(df)
+    seasons = _season_stats(games)
+    form = _recent_form(games)
+    h2h = _head_to_head(games)
+    home_prob = _home_win_probabilities()
+    odds = _odds(home_prob)
+
+    profiles = {}
+    for abbr, stats in inference.TEAM_STATS.items():
+        profiles[abbr] = {
+            'abbreviation': abbr,
+            'data_version': inference.DATA_VERSION,
+            'model_type': 'ML' if inference.model is not None else 'elo',
+            'current': stats,
+            'seasons': seasons.get(abbr, {}),
+            'recent_form': form.get(abbr, {'wins': 0, 'losses': 0, 'games': []}),
+            'head_to_head': h2h.get(abbr, {}),
+            'odds': odds.get(abbr, {}),
+        }
+    return profiles, home_prob
+
+
+def _ensure_current():
+    if _cache['version'] == inference.DATA_VERSION:
+        return
+    with _lock:
+        if _cache['version'] != inference.DATA_VERSION:
+            profiles, home_prob = build_team_profiles()
+            _cache.update(
+                profiles=profiles,
+                encoded={abbr: dumps(profile) for abbr, profile in profiles.items()},
+                home_prob=home_prob,
+                version=inference.DATA_VERSION,
+            )
+
+
+def get_team_profile(abbr):
+    _ensure_current()
+    return _cache['profiles'].get(abbr)
+
+
+def get_team_profile_json(abbr):
+    """Pre-encoded JSON bytes of get_team_profile(abbr), or None"""
+    _ensure_current()
+    return _cache['encoded'].get(abbr)
+
+
+def get_home_win_probabilities():
+    """{(home, away): probability the home team wins}, shared with the profiles' odds"""
+    _ensure_current()
+    return _cache['home_prob']
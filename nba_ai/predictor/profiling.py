@@ -0,0 +1,237 @@
+"""
+Opt-in request profiling
+
+ProfilingMiddleware profiles a request when it carries the PROFILING_HEADER
+(value "cprofile" or "sample"; anything else means cprofile) or is picked
+by PROFILING_SAMPLE_RATE, and its path starts with one of
+PROFILING_PATH_PREFIXES. Streaming responses are profiled while their body
+is produced as well. Each profile is written to PROFILING_DIR, which is
+kept as a ring buffer of the newest PROFILING_MAX_FILES files. The response
+carries X-Profile-Id so a slow call can be looked up with
+`manage.py request_profiles --id`. Outside DEBUG the header is only honoured
+when PROFILING_TOKEN is set and supplied.
+
+    cprofile  deterministic cProfile, saved as a pstats .prof file
+    sample    a background thread records the request thread's stack
+              every PROFILING_SAMPLE_INTERVAL_MS; lower overhead on hot
+              code, saved as collapsed stacks in .samples.json
+"""
+import cProfile
+import json
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_SUFFIX = '.prof'
+SAMPLES_SUFFIX = '.samples.json'
+KINDS = ['cprofile', 'sample']
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def frame_label(code):
+    """pstats-style "file:line(function)" for a code object"""
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+
+class Sampler:
+    """Records one thread's call stack at a fixed interval while active"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._active = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._done.is_set():
+            if not self._active.wait(timeout=0.05):
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+    def enable(self):
+        self._active.set()
+
+    def disable(self):
+        self._active.clear()
+
+    def close(self):
+        self._active.clear()
+        self._done.set()
+        self._thread.join()
+
+
+class RequestProfile:
+    """One profiled request: the active profiler and where its result goes"""
+
+    def __init__(self, kind, label='request'):
+        self.kind = kind
+        self.id = f"{time.time_ns()}"
+        self.label = label
+        self.started = time.perf_counter()
+        self.status = None
+        interval = getattr(settings, 'PROFILING_SAMPLE_INTERVAL_MS', 1) / 1000
+        if kind == 'sample':
+            self.profiler = Sampler(threading.get_ident(), interval)
+        else:
+            self.profiler = cProfile.Profile()
+
+    def enable(self):
+        self.profiler.enable()
+
+    def disable(self):
+        self.profiler.disable()
+
+    def discard(self):
+        if self.kind == 'sample':
+            self.profiler.close()
+
+    def save(self):
+        """Write the profile and trim the ring buffer; returns the path"""
+        elapsed_ms = round((time.perf_counter() - self.started) * 1000)
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.id}_{self.label}_{self.status}_{elapsed_ms}ms"
+        if self.kind == 'sample':
+            self.profiler.close()
+            path = directory / f"{stem}{SAMPLES_SUFFIX}"
+            path.write_text(json.dumps({
+                'interval_ms': self.profiler.interval * 1000,
+                'samples': self.profiler.samples,
+                'stacks': self.profiler.stacks,
+            }))
+        else:
+            path = directory / f"{stem}{PROFILE_SUFFIX}"
+            self.profiler.dump_stats(path)
+        prune(directory, getattr(settings, 'PROFILING_MAX_FILES', 200))
+        return path
+
+
+def stored_profiles(directory=None):
+    """[{id, view, status, elapsed_ms, kind, path}] oldest first"""
+    profiles = []
+    for path in (directory or profile_dir()).glob('*_*_*_*ms*'):
+        name = path.name
+        if name.endswith(SAMPLES_SUFFIX):
+            kind, stem = 'sample', name[:-len(SAMPLES_SUFFIX)]
+        elif name.endswith(PROFILE_SUFFIX):
+            kind, stem = 'cprofile', name[:-len(PROFILE_SUFFIX)]
+        else:
+            continue
+        profile_id, rest = stem.split('_', 1)
+        view, status, elapsed = rest.rsplit('_', 2)
+        profiles.append({
+            'id': profile_id, 'view': view, 'status': status, 'elapsed_ms': int(elapsed[:-2]),
+            'kind': kind, 'path': path,
+        })
+    return sorted(profiles, key=lambda profile: int(profile['id']))
+
+
+def prune(directory, keep):
+    """Delete all but the newest `keep` profiles"""
+    profiles = stored_profiles(directory)
+    for profile in profiles[:max(len(profiles) - keep, 0)]:
+        profile['path'].unlink(missing_ok=True)
+
+
+def _label(request):
+    match = getattr(request, 'resolver_match', None)
+    name = match.url_name if match and match.url_name else request.path
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', name).strip('-') or 'root'
+
+
+class ProfilingMiddleware:
+    """Profile requests selected by header or sample rate (see module docstring)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def requested_kind(self, request):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            return None
+        if not request.path.startswith(tuple(getattr(settings, 'PROFILING_PATH_PREFIXES', ['/api/']))):
+            return None
+
+        header = request.headers.get(getattr(settings, 'PROFILING_HEADER', 'X-Profile'))
+        token = getattr(settings, 'PROFILING_TOKEN', None)
+        if header is not None:
+            kind, _, supplied = header.partition(':')
+            if token:
+                if supplied.strip() != token:
+                    return None
+            elif not settings.DEBUG:
+                # Without a token anyone could make the server profile itself
+                return None
+            return kind.strip() if kind.strip() in KINDS else 'cprofile'
+        if random.random() < getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0):
+            return getattr(settings, 'PROFILING_SAMPLE_KIND', 'sample')
+        return None
+
+    def __call__(self, request):
+        kind = self.requested_kind(request)
+        if kind is None:
+            return self.get_response(request)
+
+        profile = RequestProfile(kind)
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler already owns this interpreter (Python 3.12+)
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            profile.disable()
+            profile.discard()
+            raise
+        profile.disable()
+
+        profile.label = _label(request)
+        profile.status = response.status_code
+        response['X-Profile-Id'] = profile.id
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._profiled_stream(response.streaming_content, profile)
+        else:
+            self._save(profile)
+        return response
+
+    def _profiled_stream(self, chunks, profile):
+        chunks = iter(chunks)
+        try:
+            while True:
+                profile.enable()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    profile.disable()
+                yield chunk
+        finally:
+            self._save(profile)
+
+    def _save(self, profile):
+        try:
+            profile.save()
+        except Exception as e:
+            print(f"❌ Could not save profile {profile.id}: {e}")
@@ -0,0 +1,85 @@
+"""
+Persisted Elo ratings
+
+One TeamRating row per team per game date holds the rating after that
+game. rebuild_ratings() replays every finished game; update_ratings()
+extends the history for games that just went final, starting from each
+team's latest row, so keeping ratings current costs O(1) per game.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .elo import BASE_RATING, EloEngine, carry_over
+from .models import Game, TeamRating
+
+REBUILD_BATCH_SIZE = 5000
+
+
+def _finished_games():
+    return Game.objects.filter(
+        status='finished', home_score__isnull=False, away_score__isnull=False,
+    ).order_by('game_date', 'pk').values_list(
+        'pk', 'season_id', 'game_date', 'home_team_id', 'away_team_id', 'home_score', 'away_score',
+    )
+
+
+def _rating_rows(engine, pk, season_id, game_date, home, away):
+    date = timezone.localdate(game_date)
+    return [
+        TeamRating(team_id=team, season_id=season_id, game_id=pk, date=date, rating=engine.ratings[team])
+        for team in (home, away)
+    ]
+
+
+@transaction.atomic
+def rebuild_ratings():
+    """Replace every stored rating by replaying all finished games in date order"""
+    TeamRating.objects.all().delete()
+    engine = EloEngine()
+    rows = []
+    for pk, season_id, game_date, home, away, home_score, away_score in _finished_games().iterator():
+        engine.start_season(season_id)
+        engine.update(home, away, home_score, away_score)
+        rows.extend(_rating_rows(engine, pk, season_id, game_date, home, away))
+        if len(rows) >= REBUILD_BATCH_SIZE:
+            TeamRating.objects.bulk_create(rows)
+            rows = []
+    TeamRating.objects.bulk_create(rows)
+    return TeamRating.objects.count()
+
+
+def latest_ratings(team_ids=None):
+    """{team_id: (rating, season_id)} from each team's most recent row"""
+    newest = TeamRating.objects.filter(team=OuterRef('team')).order_by('-date', '-pk').values('pk')[:1]
+    rows = TeamRating.objects.filter(pk=Subquery(newest))
+    if team_ids is not None:
+        rows = rows.filter(team_id__in=team_ids)
+    return {team: (rating, season) for team, rating, season in rows.values_list('team_id', 'rating', 'season_id')}
+
+
+@transaction.atomic
+def update_ratings(game_ids):
+    """Apply finished games that have no ratings yet; returns how many were applied.
+
+    Results that arrive out of date order are applied on top of the latest
+    ratings rather than re-running the history after them.
+    """
+    games = list(_finished_games().filter(pk__in=game_ids, ratings__isnull=True).distinct())
+    if not games:
+        return 0
+
+    latest = latest_ratings({team for game in games for team in game[3:5]})
+    engine = EloEngine()
+    rows = []
+    for pk, season_id, game_date, home, away, home_score, away_score in games:
+        for team in (home, away):
+            rating, season = latest.get(team, (BASE_RATING, season_id))
+            engine.ratings[team] = rating if season == season_id else carry_over(rating)
+        engine.update(home, away, home_score, away_score)
+        for team in (home, away):
+            latest[team] = (engine.ratings[team], season_id)
+        rows.extend(_rating_rows(engine, pk, season_id, game_date, home, away))
+
+    TeamRating.objects.bulk_create(rows)
+    return len(games)
@@ -0,0 +1,136 @@
+"""
+Stage timing and peak-memory run reports
+
+The data collection and training scripts wrap each step in
+RunReport.stage(); every stage records wall time, CPU time and the
+process's peak RSS so far. With trace_memory (the scripts' --trace-memory)
+it also records the peak of Python-traced allocations (tracemalloc, which
+NumPy reports to as well); tracing slows allocation-heavy stages down, so
+timings from traced runs are not comparable with untraced ones. save()
+writes everything as JSON next to the artifact the run produced, so
+pipeline cost can be compared across runs as the data grows.
+
+Stages do not nest. This module has no Django dependency so the scripts
+can use it directly.
+"""
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows: peak RSS is left out
+    resource = None
+
+MB = 1024 * 1024
+
+
+def report_path(artifact):
+    """nba_training_data.csv -> nba_training_data.report.json"""
+    return Path(artifact).with_suffix('.report.json')
+
+
+def peak_rss_mb():
+    """The process's peak resident set size so far, or None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (MB if sys.platform == 'darwin' else 1024), 1)
+
+
+def stage(report, name, **details):
+    """report.stage(...), or a no-op block when there is no report"""
+    return report.stage(name, **details) if report is not None else nullcontext({})
+
+
+class RunReport:
+    """Named stages of one script run and the artifact it produced"""
+
+    def __init__(self, name, artifact, trace_memory=False):
+        self.name = name
+        self.artifact = str(artifact)
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.details = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._owns_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, **details):
+        """Measure the enclosed block; the yielded dict is stored with the stage for extra details"""
+        entry = {'name': name, **details}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield entry
+        except Exception as e:
+            entry['error'] = str(e)
+            raise
+        finally:
+            entry['wall_s'] = round(time.perf_counter() - wall, 3)
+            entry['cpu_s'] = round(time.process_time() - cpu, 3)
+            if self.trace_memory:
+                entry['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+            entry['peak_rss_mb'] = peak_rss_mb()
+            self.stages.append(entry)
+
+    def totals(self):
+        """Wall and CPU seconds summed per stage name, in first-seen order"""
+        totals = {}
+        for entry in self.stages:
+            total = totals.setdefault(entry['name'], {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_traced_mb': None})
+            total['count'] += 1
+            total['wall_s'] = round(total['wall_s'] + entry['wall_s'], 3)
+            total['cpu_s'] = round(total['cpu_s'] + entry['cpu_s'], 3)
+            if 'peak_traced_mb' in entry:
+                total['peak_traced_mb'] = max(total['peak_traced_mb'] or 0.0, entry['peak_traced_mb'])
+        return totals
+
+    def as_dict(self):
+        return {
+            'run': self.name,
+            'artifact': self.artifact,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'wall_s': round(time.perf_counter() - self._wall, 3),
+            'cpu_s': round(time.process_time() - self._cpu, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'trace_memory': self.trace_memory,
+            'details': self.details,
+            'totals': self.totals(),
+            'stages': self.stages,
+        }
+
+    def save(self, path=None):
+        """Write the report as JSON (default: next to the artifact); returns the path"""
+        path = Path(path) if path else report_path(self.artifact)
+        report = self.as_dict()
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self.trace_memory = self._owns_tracing = False
+        path.write_text(json.dumps(report, indent=2, default=str))
+        self.print_summary(report)
+        print(f"Run report saved to {path}")
+        return path
+
+    def print_summary(self, report=None):
+        report = report or self.as_dict()
+        print(f"\n{'stage':<18} {'runs':>4} {'wall s':>9} {'cpu s':>9} {'peak MB':>8}")
+        for name, total in report['totals'].items():
+            peak = '-' if total['peak_traced_mb'] is None else f"{total['peak_traced_mb']:.1f}"
+            print(f"{name:<18} {total['count']:>4} {total['wall_s']:>9.2f} {total['cpu_s']:>9.2f} {peak:>8}")
+        print(f"{'total':<18} {'':>4} {report['wall_s']:>9.2f} {report['cpu_s']:>9.2f} "
+              f"{'' if report['peak_rss_mb'] is None else report['peak_rss_mb']:>8} (peak RSS)")
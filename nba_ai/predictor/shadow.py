@@ -0,0 +1,112 @@
+"""
+Shadow model inference
+
+Requests are answered by the active model only. The feature matrix they
+already assembled is handed to a background worker, which runs every
+PredictionModel flagged is_shadow on it and stores ShadowPrediction rows,
+so candidates are evaluated on live traffic without recomputing features
+or adding latency. If the worker falls behind, new batches are dropped
+rather than queued without bound.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import Game, PredictionModel, ShadowPrediction
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(getattr(settings, 'SHADOW_MAX_PENDING', 64))
+_registry = {'loaded_at': None, 'models': []}
+dropped = 0
+
+
+def enabled():
+    return getattr(settings, 'SHADOW_MODELS_ENABLED', True)
+
+
+def _fresh():
+    loaded_at = _registry['loaded_at']
+    return loaded_at is not None and time.monotonic() - loaded_at < getattr(settings, 'SHADOW_REFRESH_SECONDS', 300)
+
+
+def shadow_models():
+    """[(PredictionModel, estimator)] for shadow models, reloaded every SHADOW_REFRESH_SECONDS"""
+    with _lock:
+        if _fresh():
+            return _registry['models']
+
+        cached = {record.pk: (record, estimator) for record, estimator in _registry['models']}
+        models = []
+        for record in PredictionModel.objects.filter(is_shadow=True):
+            previous = cached.get(record.pk)
+            if previous and previous[0].model_file_path == record.model_file_path:
+                models.append((record, previous[1]))
+                continue
+            try:
+                models.append((record, joblib.load(record.model_file_path)))
+            except Exception as e:
+                print(f"❌ Could not load shadow model {record}: {e}")
+        _registry.update(loaded_at=time.monotonic(), models=models)
+        return models
+
+
+def run(X, served_probabilities, matchups, nba_game_ids=None):
+    """Run every shadow model on X and store the results; returns rows written.
+
+    matchups are (team1, team2) per row of X, nba_game_ids the matching
+    game ids (or None) when rows come from scheduled games.
+    """
+    game_pks = {}
+    if nba_game_ids:
+        game_pks = dict(Game.objects.filter(
+            nba_game_id__in=[game_id for game_id in nba_game_ids if game_id],
+        ).values_list('nba_game_id', 'pk'))
+
+    rows = []
+    for record, estimator in shadow_models():
+        if getattr(estimator, 'n_features_in_', X.shape[1]) != X.shape[1]:
+            continue
+        probabilities = estimator.predict_proba(X)[:, 1]
+        for i, ((team1, team2), probability) in enumerate(zip(matchups, probabilities)):
+            rows.append(ShadowPrediction(
+                prediction_model=record,
+                model_version=record.version,
+                game_id=game_pks.get(nba_game_ids[i]) if nba_game_ids else None,
+                team1=team1,
+                team2=team2,
+                predicted_winner=team1 if probability > 0.5 else team2,
+                team1_win_probability=float(probability),
+                served_team1_win_probability=float(served_probabilities[i]),
+            ))
+    ShadowPrediction.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _run_in_background(*args):
+    try:
+        run(*args)
+    except Exception as e:
+        print(f"❌ Shadow inference failed: {e}")
+    finally:
+        _pending.release()
+        close_old_connections()
+
+
+def submit(X, served_probabilities, matchups, nba_game_ids=None):
+    """Queue shadow inference for a batch the active model just served"""
+    global dropped
+    if not enabled():
+        return False
+    # No shadow models registered as of the last refresh: nothing to run
+    if _fresh() and not _registry['models']:
+        return False
+    if not _pending.acquire(blocking=False):
+        dropped += 1
+        return False
+    _executor.submit(_run_in_background, X, served_probabilities, matchups, nba_game_ids)
+    return True
@@ -0,0 +1,225 @@
+"""
+Monte Carlo season and playoff simulator
+
+The remaining schedule is drawn for every simulation at once as a single
+(sims x games) array against the model's home-win probability grid, so
+the cost is a few NumPy passes rather than a Python loop per game. Series
+odds are exact (best-of-7, 2-2-1-1-1 home court) and precomputed for every
+pair, leaving one draw per series per round. Large runs are split across a
+process pool with independent SeedSequence streams.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .models import Game, Season, Team
+from .profiles import get_home_win_probabilities
+
+PLAYOFF_TEAMS = 8  # per conference; the play-in is not modelled
+SERIES_HOME_PATTERN = [True, True, False, False, True, False, True]  # for the higher seed
+CHUNK_SIMS = 8192
+PARALLEL_MIN_SIMS = 200_000
+MAX_WINS = 82
+
+
+def series_win_matrix(home_prob):
+    """S[i, j]: probability team i wins a best-of-7 in which it has home court over j"""
+    # Per-game probability that i wins, at home and on the road
+    at_home = home_prob
+    on_road = 1 - home_prob.T
+    # state[a, b]: probability i has a wins and j has b wins
+    n = len(home_prob)
+    state = np.zeros((4, 4, n, n))
+    state[0, 0] = 1.0
+    won = np.zeros((n, n))
+    for game, i_home in enumerate(SERIES_HOME_PATTERN):
+        p = at_home if i_home else on_road
+        next_state = np.zeros_like(state)
+        for a in range(4):
+            b = game - a
+            if b < 0 or b > 3:
+                continue
+            if a == 3:
+                won += state[a, b] * p
+            else:
+                next_state[a + 1, b] += state[a, b] * p
+            if b < 3:
+                next_state[a, b + 1] += state[a, b] * (1 - p)
+        state = next_state
+    return won
+
+
+def _play_series(higher, lower, series, rng):
+    """Vectorised winners of one series per simulation"""
+    return np.where(rng.random(len(higher)) < series[higher, lower], higher, lower)
+
+
+def _home_court(a, b, wins, tiebreak):
+    """(team with home court, the other) per simulation; better record first"""
+    rows = np.arange(len(a))
+    a_first = (wins[rows, a] + tiebreak[rows, a]) >= (wins[rows, b] + tiebreak[rows, b])
+    return np.where(a_first, a, b), np.where(a_first, b, a)
+
+
+def simulate_chunk(base_wins, home_idx, away_idx, game_prob, series, conferences, n_sims, seed):
+    """Simulate n_sims seasons; returns summed counters (safe to add across chunks)"""
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_wins)
+    # Each game adds a win to the home team when it wins, to the away team otherwise
+    home_onehot = np.zeros((len(home_idx), n_teams), dtype=np.float32)
+    away_onehot = np.zeros_like(home_onehot)
+    home_onehot[np.arange(len(home_idx)), home_idx] = 1
+    away_onehot[np.arange(len(away_idx)), away_idx] = 1
+    swing = home_onehot - away_onehot
+    floor = base_wins + away_onehot.sum(axis=0)
+
+    totals = {
+        'wins_hist': np.zeros((n_teams, MAX_WINS + 1), dtype=np.int64),
+        'seed': np.zeros((n_teams, PLAYOFF_TEAMS), dtype=np.int64),
+        'second_round': np.zeros(n_teams, dtype=np.int64),
+        'conference_finals': np.zeros(n_teams, dtype=np.int64),
+        'finals': np.zeros(n_teams, dtype=np.int64),
+        'champion': np.zeros(n_teams, dtype=np.int64),
+    }
+
+    for start in range(0, n_sims, CHUNK_SIMS):
+        sims = min(CHUNK_SIMS, n_sims - start)
+        home_won = (rng.random((sims, len(game_prob)), dtype=np.float32) < game_prob).astype(np.float32)
+        wins = np.rint(home_won @ swing + floor).astype(np.int64)
+        tiebreak = rng.random((sims, n_teams)) * 0.5  # random tiebreaks, never outweighs a win
+
+        clipped = np.clip(wins, 0, MAX_WINS)
+        totals['wins_hist'] += np.stack([np.bincount(clipped[:, t], minlength=MAX_WINS + 1) for t in range(n_teams)])
+
+        finalists = []
+        for members in conferences:
+            order = np.argsort(-(wins[:, members] + tiebreak[:, members]), axis=1)[:, :PLAYOFF_TEAMS]
+            seeds = members[order]  # (sims, 8) team indices, seed 1 first
+            for position in range(PLAYOFF_TEAMS):
+                totals['seed'][:, position] += np.bincount(seeds[:, position], minlength=n_teams)
+
+            # 1v8, 4v5, 3v6, 2v7; bracket order keeps 1/8 facing 4/5
+            round_teams = [_play_series(seeds[:, hi], seeds[:, lo], series, rng) for hi, lo in ((0, 7), (3, 4), (2, 5), (1, 6))]
+            for stage in ('second_round', 'conference_finals'):
+                for team in round_teams:
+                    totals[stage] += np.bincount(team, minlength=n_teams)
+                round_teams = [
+                    _play_series(*_home_court(round_teams[k], round_teams[k + 1], wins, tiebreak), series, rng)
+                    for k in range(0, len(round_teams), 2)
+                ]
+            finalists.append(round_teams[0])
+
+        if len(finalists) == 2:
+            for team in finalists:
+                totals['finals'] += np.bincount(team, minlength=n_teams)
+            champion = _play_series(*_home_court(finalists[0], finalists[1], wins, tiebreak), series, rng)
+        else:
+            champion = finalists[0]
+        totals['champion'] += np.bincount(champion, minlength=n_teams)
+
+    return totals
+
+
+def _percentile(hist, q):
+    return int(np.searchsorted(np.cumsum(hist), q * hist.sum()))
+
+
+def season_inputs(season):
+    """Teams, current records and the remaining regular-season schedule for a season"""
+    teams = list(Team.objects.order_by('conference', 'abbreviation').values('id', 'abbreviation', 'conference'))
+    index = {team['id']: i for i, team in enumerate(teams)}
+    base_wins = np.zeros(len(teams))
+    base_losses = np.zeros(len(teams))
+
+    finished = Game.objects.filter(
+        season=season, status='finished', playoff_game=False,
+        home_score__isnull=False, away_score__isnull=False,
+    ).values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+    for home, away, home_score, away_score in finished.iterator():
+        winner, loser = (home, away) if home_score > away_score else (away, home)
+        base_wins[index[winner]] += 1
+        base_losses[index[loser]] += 1
+
+    remaining = np.array(list(Game.objects.filter(
+        season=season, status='scheduled', playoff_game=False,
+    ).values_list('home_team_id', 'away_team_id')), dtype=np.int64).reshape(-1, 2)
+    home_idx = np.array([index[pk] for pk in remaining[:, 0]], dtype=np.int64)
+    away_idx = np.array([index[pk] for pk in remaining[:, 1]], dtype=np.int64)
+    return teams, base_wins, base_losses, home_idx, away_idx
+
+
+def probability_grid(abbreviations):
+    """P[i, j]: probability team i beats team j at home; 0.5 where the model has no data"""
+    home_prob = get_home_win_probabilities()
+    grid = np.full((len(abbreviations), len(abbreviations)), 0.5)
+    for i, home in enumerate(abbreviations):
+        for j, away in enumerate(abbreviations):
+            grid[i, j] = home_prob.get((home, away), 0.5)
+    return grid
+
+
+def simulate_season(season=None, n_sims=10000, seed=None, workers=None, grid=None):
+    """Simulate the rest of a season's regular season and playoffs n_sims times.
+
+    Returns a dict with the inputs' summary and, per team, projected record,
+    playoff and seeding odds, and round-by-round odds through the title.
+    """
+    if season is None:
+        season = Season.objects.get(is_current=True)
+
+    teams, base_wins, base_losses, home_idx, away_idx = season_inputs(season)
+    abbreviations = [team['abbreviation'] for team in teams]
+    grid = probability_grid(abbreviations) if grid is None else grid
+    series = series_win_matrix(grid)
+    game_prob = grid[home_idx, away_idx].astype(np.float32)
+    conferences = [
+        np.array([i for i, team in enumerate(teams) if team['conference'] == conference], dtype=np.int64)
+        for conference in sorted({team['conference'] for team in teams})
+    ]
+    conferences = [members for members in conferences if len(members) >= PLAYOFF_TEAMS]
+    if not conferences:
+        raise ValueError(f"Need at least {PLAYOFF_TEAMS} teams in a conference to seed a bracket")
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8) if n_sims >= PARALLEL_MIN_SIMS else 1
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    shares = [n_sims // workers + (1 if k < n_sims % workers else 0) for k in range(workers)]
+    args = (base_wins, home_idx, away_idx, game_prob, series, conferences)
+
+    if workers == 1:
+        parts = [simulate_chunk(*args, n_sims, streams[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(simulate_chunk, *args, share, stream) for share, stream in zip(shares, streams)]
+            parts = [future.result() for future in futures]
+    totals = {key: sum(part[key] for part in parts) for key in parts[0]}
+
+    results = []
+    for i, team in enumerate(teams):
+        hist = totals['wins_hist'][i]
+        seed_odds = totals['seed'][i] / n_sims
+        results.append({
+            'abbreviation': team['abbreviation'],
+            'conference': team['conference'],
+            'wins': int(base_wins[i]),
+            'losses': int(base_losses[i]),
+            'projected_wins': round(float(hist @ np.arange(MAX_WINS + 1)) / n_sims, 1),
+            'wins_p10': _percentile(hist, 0.10),
+            'wins_p90': _percentile(hist, 0.90),
+            'playoffs': round(float(seed_odds.sum()), 4),
+            'seed_odds': [round(float(p), 4) for p in seed_odds],
+            'second_round': round(float(totals['second_round'][i]) / n_sims, 4),
+            'conference_finals': round(float(totals['conference_finals'][i]) / n_sims, 4),
+            'finals': round(float(totals['finals'][i]) / n_sims, 4),
+            'champion': round(float(totals['champion'][i]) / n_sims, 4),
+        })
+    results.sort(key=lambda row: (row['conference'], -row['projected_wins']))
+
+    return {
+        'season': season.year,
+        'simulations': n_sims,
+        'remaining_games': len(home_idx),
+        'workers': workers,
+        'teams': results,
+    }
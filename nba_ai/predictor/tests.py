@@ -1,3 +1,917 @@
-from django.test import TestCase
+import contextlib
+import copy
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from . import admission, inference, jobs, views
+from .feature_store import ELO_INDEX, FeatureStore
+from .elo import EloEngine
+from .encoding import dumps, msgpack, splice, splice_msgpack
+from .features import TEAM_STAT_KEYS, model_columns, season_columns
+from .live import LiveScorePoller
+from .models import Team, Season, Game, GamePrediction, Job, PredictionModel, ShadowPrediction, TeamRating
+from .paginators import EstimatedCountPaginator
+from .profiling import stored_profiles
+from .ratings import rebuild_ratings, update_ratings
+from .runreport import RunReport
+from . import shadow
+from .simulation import series_win_matrix, simulate_season
+from .utils import (
+    attach_line_scores, finalize_games, ingest_scoreboard_games, load_inference, precompute_predictions,
+)
+from .views import OPTIONAL_FIELDS, requested_tier
+from backtest import asof_frame, walk_forward_folds
+from compact_model import round_thresholds
+from train_model import (
+    SEASON_FEATURES, add_elo_features, add_matchup_stats, build_feature_matrix, feature_cache, game_keys,
+    grow_forest, load_feature_cache, pair_wins, row_digests, save_feature_cache, update_feature_cache,
+)
+
+
+class LeagueFixtureMixin:
+    """Small league builder shared by the test cases"""
+
+    def create_league(self):
+        self.home = Team.objects.create(
+            name='Celtics', city='Boston', abbreviation='BOS',
+            conference='East', division='Atlantic', nba_team_id=1610612738,
+        )
+        self.away = Team.objects.create(
+            name='Lakers', city='Los Angeles', abbreviation='LAL',
+            conference='West', division='Pacific', nba_team_id=1610612747,
+        )
+        self.season = Season.objects.create(
+            year='2024-25', start_date=datetime(2024, 10, 22).date(),
+            end_date=datetime(2025, 4, 13).date(), is_current=True,
+        )
+        self.tip_off = timezone.make_aware(datetime(2024, 10, 22, 19, 0))
+        self.games_added = 0
+
+    def add_games(self, count, predictions=True):
+        games = []
+        for _ in range(count):
+            game = Game.objects.create(
+                nba_game_id=f"00224{self.games_added:05d}",
+                home_team=self.home,
+                away_team=self.away,
+                season=self.season,
+                game_date=self.tip_off + timedelta(hours=self.games_added),
+                status='finished',
+                home_score=110,
+                away_score=100 + self.games_added % 20,
+            )
+            if predictions:
+                GamePrediction.objects.create(
+                    game=game, predicted_winner=self.home,
+                    home_win_probability=0.6, away_win_probability=0.4,
+                )
+            self.games_added += 1
+            games.append(game)
+        return games
+
+
+class AdminQueryCountTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def assertConstantQueries(self, url):
+        self.add_games(3)
+        self.count_queries(url)  # warm session and content type caches
+        small = self.count_queries(url)
+        self.add_games(30)
+        large = self.count_queries(url)
+        self.assertEqual(small, large)
+
+    def test_game_changelist_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('admin:predictor_game_changelist'))
+
+    def test_prediction_changelist_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('admin:predictor_gameprediction_changelist'))
+
+    def test_requeue_action_skips_only_jobs_whose_key_is_active(self):
+        unkeyed = [Job.objects.create(job_type='ingest', status='failed') for _ in range(3)]
+        held = Job.objects.create(job_type='ingest', status='failed', dedupe_key='nightly')
+        Job.objects.create(job_type='ingest', status='queued', dedupe_key='nightly')
+        selected = [job.pk for job in unkeyed + [held]]
+
+        response = self.client.post(reverse('admin:predictor_job_changelist'),
+                                    {'action': 'requeue', '_selected_action': selected}, follow=True)
+        self.assertContains(response, 'Queued 3 jobs')
+        self.assertEqual([Job.objects.get(pk=pk).status for pk in selected], ['queued', 'queued', 'queued', 'failed'])
+
+    def test_estimated_count_skips_count_on_large_tables(self):
+        games = self.add_games(5, predictions=False)
+        paginator = EstimatedCountPaginator(Game.objects.all(), 100)
+        paginator.estimate_threshold = 0
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(paginator.count, games[-1].pk)
+        self.assertNotIn('COUNT(', ctx.captured_queries[0]['sql'].upper())
+
+    def test_filtered_querysets_get_exact_count(self):
+        self.add_games(5, predictions=False)
+        paginator = EstimatedCountPaginator(Game.objects.filter(status='finished'), 100)
+        paginator.estimate_threshold = 0
+        self.assertEqual(paginator.count, 5)
+
+
+class FakeScoreboardServer:
+    """Serves a mutable live-scoreboard payload on a local port"""
+
+    def __init__(self):
+        self.games = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps({'scoreboard': {'games': server.games}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/scoreboard.json"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LiveScorePollerTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+        self.tip_off = timezone.now().replace(hour=0, minute=5)
+        self.server = FakeScoreboardServer()
+        self.addCleanup(self.server.close)
+        self.poller = LiveScorePoller(url=self.server.url, log=lambda message: None)
+
+        self.final, self.quiet = self.add_games(2)
+        Game.objects.filter(pk__in=[self.final.pk, self.quiet.pk]).update(
+            status='scheduled', home_score=None, away_score=None,
+        )
+        GamePrediction.objects.filter(game=self.final).update(is_correct=None)
+
+    def scoreboard_game(self, game, status, home, away):
+        return {
+            'gameId': game.nba_game_id, 'gameStatus': status,
+            'homeTeam': {'score': home}, 'awayTeam': {'score': away},
+        }
+
+    def test_only_changed_games_are_written(self):
+        self.server.games = [
+            self.scoreboard_game(self.final, 2, 30, 28),
+            self.scoreboard_game(self.quiet, 1, 0, 0),
+        ]
+        quiet_updated = Game.objects.get(pk=self.quiet.pk).updated_at
+
+        changes = async_to_sync(self.poller.poll_once)()
+
+        self.assertEqual([change[0] for change in changes], [self.final.nba_game_id])
+        self.assertEqual(Game.objects.get(pk=self.final.pk).status, 'live')
+        self.assertEqual(Game.objects.get(pk=self.quiet.pk).updated_at, quiet_updated)
+
+        # Same payload again: nothing to write
+        self.assertEqual(async_to_sync(self.poller.poll_once)(), [])
+
+    def test_finalized_games_are_scored(self):
+        self.server.games = [self.scoreboard_game(self.final, 3, 112, 104)]
+
+        async_to_sync(self.poller.poll_once)()
+
+        game = Game.objects.get(pk=self.final.pk)
+        self.assertEqual((game.status, game.home_score, game.away_score), ('finished', 112, 104))
+        self.assertTrue(GamePrediction.objects.get(game=game).is_correct)
+        self.assertNotIn(self.final.nba_game_id, self.poller.snapshot)
+
+
+class ScheduleApiTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+        self.games = self.add_games(5)
+        self.url = reverse('schedule')
+
+    def test_keyset_pages_cover_every_game_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            with self.assertNumQueries(2):
+                payload = self.client.get(self.url, params).json()
+            seen += [game['game_id'] for game in payload['results']]
+            cursor = payload['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [game.nba_game_id for game in self.games])
+        self.assertEqual(self.client.get(self.url).json()['results'][0]['prediction']['predicted_winner'], 'BOS')
+
+    def test_unchanged_page_revalidates_with_304(self):
+        response = self.client.get(self.url, {'team': 'LAL'})
+        etag = response['ETag']
+
+        # Answered from the team lookup and the page aggregate, no rows fetched
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url, {'team': 'LAL'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Game.objects.filter(pk=self.games[0].pk).update(status='postponed', updated_at=timezone.now())
+        response = self.client.get(self.url, {'team': 'LAL'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        GamePrediction.objects.filter(game=self.games[1]).delete()
+        self.assertEqual(self.client.get(self.url, {'team': 'LAL'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_impossible_dates_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'start': '2025-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'end': 'soon'}).status_code, 400)
+
+
+class ScoreboardIngestTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+
+    def test_api_shaped_frames_are_ingested_with_scores(self):
+        # ScoreboardV2 sends ISO datetimes and keeps points in LineScore, not GameHeader
+        header = pd.DataFrame([{
+            'GAME_ID': '0022400001', 'GAME_DATE_EST': '2024-10-22T00:00:00', 'GAME_STATUS_TEXT': 'Final',
+            'HOME_TEAM_ID': self.home.nba_team_id, 'VISITOR_TEAM_ID': self.away.nba_team_id,
+        }])
+        line_score = pd.DataFrame([
+            {'GAME_ID': '0022400001', 'TEAM_ID': self.away.nba_team_id, 'PTS': 101},
+            {'GAME_ID': '0022400001', 'TEAM_ID': self.home.nba_team_id, 'PTS': 112},
+        ])
+
+        created, finished = ingest_scoreboard_games(attach_line_scores(header, line_score), self.season)
+
+        game = Game.objects.get(nba_game_id='0022400001')
+        self.assertEqual((created, finished), (1, [game.pk]))
+        self.assertEqual((game.home_score, game.away_score), (112, 101))
+        self.assertEqual(timezone.localtime(game.game_date).date(), datetime(2024, 10, 22).date())
+
+
+class SeasonSimulationTests(TestCase):
+    def setUp(self):
+        self.season = Season.objects.create(
+            year='2024-25', start_date=datetime(2024, 10, 22).date(),
+            end_date=datetime(2025, 4, 13).date(), is_current=True,
+        )
+        self.teams = [
+            Team.objects.create(
+                name=f'Team {n}', city='City', abbreviation=f'T{n:02d}',
+                conference='East' if n < 8 else 'West', division='Division', nba_team_id=n,
+            )
+            for n in range(16)
+        ]
+        tip_off = timezone.make_aware(datetime(2025, 1, 1, 19, 0))
+        for n, home in enumerate(self.teams):
+            away = self.teams[(n + 1) % 16]
+            Game.objects.create(
+                nba_game_id=f'sim{n}', home_team=home, away_team=away, season=self.season,
+                game_date=tip_off + timedelta(days=n), status='scheduled',
+            )
+
+    def test_series_odds_are_symmetric_for_even_teams(self):
+        series = series_win_matrix(np.full((3, 3), 0.5))
+        self.assertTrue(np.allclose(series, 0.5))
+
+    def test_dominant_team_wins_every_simulated_title(self):
+        # T03 wins every game it plays, home or away; everything else is a coin flip
+        grid = np.full((16, 16), 0.5)
+        grid[3, :] = 1.0
+        grid[:, 3] = 0.0
+
+        result = simulate_season(self.season, n_sims=2000, seed=7, workers=1, grid=grid)
+
+        by_team = {row['abbreviation']: row for row in result['teams']}
+        self.assertEqual(result['remaining_games'], 16)
+        self.assertEqual(by_team['T03']['champion'], 1.0)
+        self.assertAlmostEqual(sum(row['champion'] for row in result['teams']), 1.0)
+        self.assertAlmostEqual(sum(row['playoffs'] for row in result['teams']), 16.0)
+
+
+class TeamRatingTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+        self.games = self.add_games(3, predictions=False)
+
+    def latest(self, team):
+        return TeamRating.objects.filter(team=team).order_by('-date', '-pk').first().rating
+
+    def test_incremental_updates_match_a_full_replay(self):
+        for game in self.games:
+            self.assertEqual(update_ratings([game.pk]), 1)
+        self.assertEqual(update_ratings([game.pk for game in self.games]), 0)  # already applied
+        incremental = (self.latest(self.home), self.latest(self.away))
+
+        rebuild_ratings()
+
+        self.assertEqual(TeamRating.objects.count(), 6)
+        self.assertAlmostEqual(self.latest(self.home), incremental[0])
+        self.assertAlmostEqual(self.latest(self.away), incremental[1])
+        self.assertGreater(incremental[0], 1500)  # the home side won all three
+        self.assertAlmostEqual(sum(incremental), 3000)
+
+
+class AlwaysHome:
+    """Stand-in estimator that backs the home side at a fixed probability"""
+    n_features_in_ = 3
+
+    def __init__(self, probability):
+        self.probability = probability
+
+    def predict_proba(self, X):
+        return np.tile([1 - self.probability, self.probability], (len(X), 1))
+
+
+class ShadowInferenceTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+        self.game = self.add_games(1, predictions=False)[0]  # home side won
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        model_path = os.path.join(workdir.name, 'candidate.pkl')
+        joblib.dump(AlwaysHome(0.3), model_path)
+        PredictionModel.objects.create(
+            name='candidate', version='v9', algorithm='Test', model_file_path=model_path,
+            training_data_start=datetime(2022, 10, 1).date(), training_data_end=datetime(2025, 4, 1).date(),
+            is_shadow=True,
+        )
+        shadow._registry.update(loaded_at=None, models=[])
+        self.addCleanup(shadow._registry.update, loaded_at=None, models=[])
+
+    def test_shadow_rows_share_the_served_features_and_are_scored(self):
+        X = np.zeros((2, 3))
+        written = shadow.run(X, [0.8, 0.6], [('BOS', 'LAL'), ('LAL', 'BOS')], [self.game.nba_game_id, None])
+
+        self.assertEqual(written, 2)
+        linked = ShadowPrediction.objects.get(game=self.game)
+        self.assertEqual((linked.model_version, linked.predicted_winner), ('v9', 'LAL'))
+        self.assertEqual(linked.served_team1_win_probability, 0.8)
+
+        self.assertEqual(ShadowPrediction.objects.update_accuracy(), 1)
+        self.assertIs(ShadowPrediction.objects.get(game=self.game).is_correct, False)
+
+    def test_unplayed_games_are_not_scored(self):
+        Game.objects.filter(pk=self.game.pk).update(home_score=0, away_score=0)
+        shadow.run(np.zeros((1, 3)), [0.8], [('BOS', 'LAL')], [self.game.nba_game_id])
+
+        self.assertEqual(ShadowPrediction.objects.update_accuracy(), 0)
+        self.assertIsNone(ShadowPrediction.objects.get(game=self.game).is_correct)
+
+    def test_nothing_is_queued_while_no_shadow_model_is_registered(self):
+        shadow._registry.update(loaded_at=time.monotonic(), models=[])
+        self.assertFalse(shadow.submit(np.zeros((1, 3)), [0.5], [('BOS', 'LAL')]))
+
+
+class FeatureStoreTests(SimpleTestCase):
+    def fill(self, store):
+        self.fills += 1
+        store.vectors[:, :ELO_INDEX] = np.arange(2 * ELO_INDEX).reshape(2, ELO_INDEX)
+        store.vectors[:, ELO_INDEX] = [1600, 1500]
+        store.h2h_wins[:] = [[0, 3], [1, 0]]
+
+    def test_workers_share_one_block_and_gather_rows_by_team(self):
+        self.fills = 0
+        version = f'test-{os.getpid()}-{threading.get_ident()}'
+        first = FeatureStore.load(version, ['AAA', 'BBB'], self.fill)
+        second = FeatureStore.load(version, ['AAA', 'BBB'], self.fill)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+
+        self.assertEqual(self.fills, 1)
+        self.assertTrue(second.shared)
+        X = second.rows([0, 1], [1, 0])
+        self.assertEqual(X.shape, (2, len(model_columns())))
+        n = len(TEAM_STAT_KEYS)
+        # team1/team2 values interleave per feature, then home flags, Elo and head-to-head
+        self.assertEqual(list(X[0, :4] / 0.9), [0, n, 1, n + 1])
+        self.assertEqual(list(X[0, 2 * n:2 * n + 2] / 0.9), [1, 0])
+        self.assertGreater(X[0, 2 * n + 2], X[1, 2 * n + 2])
+        self.assertTrue(np.allclose(X[:, -2:] / 0.1, [[0.75, 0.25], [0.25, 0.75]]))
+        self.assertEqual(second.rows([0], [1], elo=False).shape, (1, len(model_columns(elo=False))))
+
+
+class InferenceTierTests(SimpleTestCase):
+    def tier(self, data, query=''):
+        return requested_tier(RequestFactory().post(f'/api/predict_winner/{query}'), data)
+
+    def test_tier_comes_from_the_request_or_the_latency_budget(self):
+        self.assertEqual(self.tier({}), 'full')
+        self.assertEqual(self.tier({'tier': 'fast'}), 'fast')
+        self.assertEqual(self.tier({}, '?tier=fast'), 'fast')
+        with self.settings(FULL_TIER_LATENCY_MS=25):
+            self.assertEqual(self.tier({'latency_budget_ms': 5}), 'fast')
+            self.assertEqual(self.tier({'latency_budget_ms': 100}), 'full')
+            self.assertEqual(self.tier({'tier': 'full', 'latency_budget_ms': 5}), 'full')
+        self.assertIsNone(self.tier({'tier': 'turbo'}))
+        self.assertIsNone(self.tier({'latency_budget_ms': 'soon'}))
+
+
+class RequestProfilingTests(SimpleTestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.directory = workdir.name
+
+    def post(self, **headers):
+        return self.client.post('/api/predict_winner/', '{}', content_type='application/json', headers=headers)
+
+    def test_opted_in_requests_land_in_a_bounded_ring_buffer(self):
+        with self.settings(PROFILING_ENABLED=True, PROFILING_DIR=self.directory, PROFILING_MAX_FILES=2,
+                           PROFILING_TOKEN='secret'):
+            self.assertNotIn('X-Profile-Id', self.post())
+            self.assertNotIn('X-Profile-Id', self.post(**{'X-Profile': 'cprofile:guess'}))
+            ids = [self.post(**{'X-Profile': 'cprofile:secret'})['X-Profile-Id'] for _ in range(2)]
+            ids.append(self.post(**{'X-Profile': 'sample:secret'})['X-Profile-Id'])
+
+            profiles = stored_profiles()
+            self.assertEqual([profile['id'] for profile in profiles], ids[1:])
+            self.assertEqual([profile['kind'] for profile in profiles], ['cprofile', 'sample'])
+            self.assertEqual({profile['view'] for profile in profiles}, {'predict_winner'})
+
+            out = io.StringIO()
+            call_command('request_profiles', view='predict_winner', stdout=out)
+            self.assertIn('views.py', out.getvalue())
+
+    def test_the_header_needs_a_token_outside_debug(self):
+        with self.settings(PROFILING_ENABLED=True, PROFILING_DIR=self.directory, PROFILING_TOKEN=None):
+            self.assertNotIn('X-Profile-Id', self.post(**{'X-Profile': 'cprofile'}))
+            with self.settings(DEBUG=True):
+                self.assertIn('X-Profile-Id', self.post(**{'X-Profile': 'cprofile'}))
+
+    def test_a_token_authorizes_profiling_outside_debug(self):
+        with self.settings(PROFILING_DIR=self.directory, PROFILING_TOKEN='secret', DEBUG=False):
+            self.assertIn('X-Profile-Id', self.post(**{'X-Profile': 'sample:secret'}))
+            self.assertNotIn('X-Profile-Id', self.post(**{'X-Profile': 'sample'}))
+
+
+class RunReportTests(SimpleTestCase):
+    def test_stages_are_timed_and_saved_next_to_the_artifact(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        report = RunReport('test', os.path.join(workdir.name, 'model.pkl'), trace_memory=True)
+        for season in ('2023-24', '2024-25'):
+            with report.stage('aggregate', season=season) as stage:
+                stage['rows'] = len(np.ones(100_000).tolist())
+        with self.assertRaises(ValueError), report.stage('fit'):
+            raise ValueError('bad data')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = report.save()
+
+        saved = json.loads(path.read_text())
+        self.assertEqual(path.name, 'model.report.json')
+        self.assertEqual([stage['name'] for stage in saved['stages']], ['aggregate', 'aggregate', 'fit'])
+        self.assertEqual(saved['stages'][2]['error'], 'bad data')
+        self.assertEqual(saved['totals']['aggregate']['count'], 2)
+        first = saved['stages'][0]
+        self.assertEqual((first['season'], first['rows']), ('2023-24', 100_000))
+        self.assertGreater(first['peak_traced_mb'], 0.5)
+        self.assertGreaterEqual(first['cpu_s'], 0)
+        self.assertTrue(saved['trace_memory'])
+
+    def test_memory_tracing_is_opt_in(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        report = RunReport('test', os.path.join(workdir.name, 'model.pkl'))
+        with report.stage('fit'):
+            pass
+        with contextlib.redirect_stdout(io.StringIO()):
+            saved = json.loads(report.save().read_text())
+        self.assertFalse(saved['trace_memory'])
+        self.assertNotIn('peak_traced_mb', saved['stages'][0])
+
+
+class JobQueueTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.calls = []
+        handlers = dict(jobs.HANDLERS)
+        jobs.HANDLERS['record'] = lambda **kwargs: self.calls.append(kwargs) or {'ok': True}
+        jobs.HANDLERS['explode'] = lambda: 1 / 0
+        self.addCleanup(lambda: (jobs.HANDLERS.clear(), jobs.HANDLERS.update(handlers)))
+
+    def test_dedupe_keys_and_schedules_enqueue_once(self):
+        first, created = jobs.enqueue('record', {'n': 1}, dedupe_key='nightly')
+        again, created_again = jobs.enqueue('record', {'n': 2}, dedupe_key='nightly')
+        self.assertEqual((first.pk, created, created_again), (again.pk, True, False))
+
+        now = timezone.make_aware(datetime(2025, 1, 2, 10, 30))
+        schedule = [{'name': 'nightly', 'job_type': 'record', 'at': '09:00'}]
+        with self.settings(JOB_SCHEDULES=schedule):
+            self.assertEqual(jobs.schedule_due(now), 1)
+            Job.objects.filter(dedupe_key__startswith='schedule:').update(status='succeeded')
+            self.assertEqual(jobs.schedule_due(now + timedelta(hours=1)), 0)  # same slot, already ran
+            self.assertEqual(jobs.schedule_due(now + timedelta(days=1)), 1)
+
+    def test_concurrency_limits_hold_across_workers(self):
+        for n in range(3):
+            jobs.enqueue('record', {'n': n})
+        with self.settings(JOB_CONCURRENCY={'record': 2}):
+            claimed = [jobs.claim('worker-a'), jobs.claim('worker-b'), jobs.claim('worker-c')]
+        self.assertIsNone(claimed[2])
+        self.assertEqual(Job.objects.filter(status='running').count(), 2)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(jobs.run(claimed[0]), 'succeeded')
+        self.assertEqual(Job.objects.get(pk=claimed[0].pk).result, {'ok': True})
+
+    def test_worker_drains_due_jobs_and_records_failures(self):
+        jobs.enqueue('record', {'n': 1})
+        jobs.enqueue('explode')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(jobs.work(once=True, schedule=False), 2)
+
+        self.assertEqual(self.calls, [{'n': 1}])
+        failed = Job.objects.get(job_type='explode')
+        self.assertEqual(failed.status, 'failed')
+        self.assertIn('ZeroDivisionError', failed.error)
+
+    def test_precompute_job_predicts_upcoming_games_once_each(self):
+        self.create_league()
+        game = Game.objects.create(
+            nba_game_id='0022400999', home_team=self.home, away_team=self.away, season=self.season,
+            game_date=timezone.now() + timedelta(days=1), status='scheduled',
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(2):
+                jobs.enqueue('precompute', {'days': 2})
+                jobs.work(once=True, schedule=False)
+
+        prediction = GamePrediction.objects.get(game=game)
+        self.assertAlmostEqual(prediction.home_win_probability + prediction.away_win_probability, 1.0)
+        self.assertEqual(Job.objects.filter(job_type='precompute', status='succeeded').count(), 2)
+        if inference.model is not None:
+            self.assertEqual(prediction.model_version, inference.DATA_VERSION)
+
+    @skipUnless(inference.model is not None, 'no trained model')
+    def test_precompute_labels_predictions_with_the_active_model_version(self):
+        self.create_league()
+        self.add_games(1, predictions=False)
+        Game.objects.update(status='scheduled', game_date=timezone.now() + timedelta(days=1))
+        PredictionModel.objects.create(
+            name='random-forest-v7', version='v7', algorithm='Random Forest', model_file_path='v7.pkl',
+            training_data_start=date(2024, 10, 22), training_data_end=date(2025, 4, 13), is_active=True,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(precompute_predictions(days=2), 1)
+        self.assertEqual(GamePrediction.objects.get().model_version, 'v7')
+
+    def test_changed_model_files_are_reloaded_before_precomputing(self):
+        with patch.object(inference, 'DATA_VERSION', 'stale'), contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertIs(load_inference(), inference)
+            self.assertEqual(inference.DATA_VERSION, inference.current_data_version())
+        self.assertIn('reloading', out.getvalue())
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            load_inference()
+        self.assertNotIn('reloading', out.getvalue())
+
+
+def synthetic_games(n, seasons=('2024-25',)):
+    """nba_training_data.csv-shaped rows for four teams, one game a day, split evenly over seasons"""
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame(rng.random((n, len(season_columns(elo=False)))), columns=season_columns(elo=False))
+    df['team1_home'], df['team2_home'] = 1, 0
+    pairs = [rng.choice(['BOS', 'LAL', 'NYK', 'MIA'], 2, replace=False) for _ in range(n)]
+    df['team1_abbr'], df['team2_abbr'] = [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+    df['team1_score'] = rng.integers(90, 130, n)
+    df['team2_score'] = df['team1_score'] + rng.choice([-7, 4], n)
+    df['winner'] = (df['team1_score'] > df['team2_score']).astype(int)
+    df['season'] = np.repeat(seasons, -(-n // len(seasons)))[:n]
+    df['game_date'] = pd.date_range('2024-10-22', periods=n).strftime('%Y-%m-%d')
+    return df
+
+
+class CompactModelTests(SimpleTestCase):
+    def test_rounded_thresholds_leave_float32_predictions_unchanged(self):
+        rng = np.random.default_rng(3)
+        X = rng.normal(size=(400, 5))
+        y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+        original = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+        rounded = round_thresholds(copy.deepcopy(original))
+
+        before = np.concatenate([tree.tree_.threshold for tree in original.estimators_])
+        after = np.concatenate([tree.tree_.threshold for tree in rounded.estimators_])
+        self.assertTrue((before != after).any())
+        self.assertTrue((after.astype(np.float32).astype(np.float64) == after).all())
+
+        # Random rows plus rows sitting exactly on, and one float32 step either side of, each rounded split
+        rows = [rng.normal(size=(200, 5)).astype(np.float32)]
+        for tree in rounded.estimators_:
+            splits = tree.tree_.feature >= 0
+            for feature, threshold in zip(tree.tree_.feature[splits], tree.tree_.threshold[splits]):
+                at = np.float32(threshold)
+                for value in (np.nextafter(at, np.float32(-np.inf)), at, np.nextafter(at, np.float32(np.inf))):
+                    row = np.zeros((1, 5), dtype=np.float32)
+                    row[0, feature] = value
+                    rows.append(row)
+        X_test = np.concatenate(rows)
+
+        np.testing.assert_array_equal(original.predict_proba(X_test), rounded.predict_proba(X_test))
+
+
+class IncrementalTrainingTests(SimpleTestCase):
+    def test_new_games_extend_the_cached_features_and_forest(self):
+        full = synthetic_games(60)
+        old = full.iloc[:50].copy()
+        engine = EloEngine()
+        X, y, scaler = build_feature_matrix(add_elo_features(add_matchup_stats(old.copy()), engine))
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        path = os.path.join(workdir.name, 'cache.npz')
+        save_feature_cache(feature_cache(
+            game_keys(old), row_digests(old), old['game_date'], X, y, np.zeros(50, dtype=bool),
+            scaler.min_, scaler.scale_, engine, pair_wins(old),
+        ), path)
+
+        full.loc[0, 'team1_wins'] += 1  # a re-collected row
+        updated, new = update_feature_cache(full, load_feature_cache(path))
+
+        self.assertEqual(new.nonzero()[0].tolist(), list(range(50, 60)))
+        np.testing.assert_array_equal(updated['X'][1:50], X[1:50])
+        changed = np.flatnonzero(updated['X'][0] != X[0])
+        self.assertEqual([SEASON_FEATURES[i] for i in changed], ['team1_wins'])
+        # New games match a full rebuild of their Elo and head-to-head features
+        rebuilt = add_elo_features(add_matchup_stats(full.copy()))
+        elo = len(SEASON_FEATURES) - 1
+        np.testing.assert_allclose(
+            updated['X'][50:, elo], 0.9 * (rebuilt['elo_win_prob'][50:] * scaler.scale_[elo] + scaler.min_[elo]),
+        )
+        np.testing.assert_allclose(updated['X'][50:, -2:], 0.1 * rebuilt[['team1_matchup_win_pct', 'team2_matchup_win_pct']][50:])
+
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+        grow_forest(model, updated['X'][new], updated['y'][new], trees=3, max_trees=6)
+        self.assertEqual((len(model.estimators_), model.n_estimators, model.warm_start), (6, 6, False))
+        self.assertEqual(model.predict_proba(updated['X']).shape, (60, 2))
+
+
+class TeamProfileTests(SimpleTestCase):
+    def test_unknown_teams_are_not_found(self):
+        self.assertEqual(self.client.get(reverse('team_profile', args=['XXX'])).status_code, 404)
+
+    def test_unchanged_profile_revalidates_with_304(self):
+        response = self.client.get(reverse('team_profile', args=['bos']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{inference.DATA_VERSION}"')
+        self.assertEqual(self.client.get(reverse('team_profile', args=['BOS']),
+                                         HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_odds_cover_every_opponent_home_and_away(self):
+        profile = self.client.get(reverse('team_profile', args=['BOS'])).json()
+        self.assertEqual(profile['abbreviation'], 'BOS')
+        self.assertEqual(set(profile['odds']), set(inference.TEAM_STATS) - {'BOS'})
+        for opponent, odds in profile['odds'].items():
+            self.assertEqual(set(odds), {'home', 'away'}, opponent)
+            self.assertTrue(0 <= odds['home'] <= 100 and 0 <= odds['away'] <= 100, opponent)
+
+
+@override_settings(SHADOW_MODELS_ENABLED=False)
+class ResponseFormatTests(SimpleTestCase):
+    def predict(self, fields=None, **headers):
+        query = '' if fields is None else f'?fields={fields}'
+        return self.client.post(f'/api/predict_winner/{query}', {'team1': 'BOS', 'team2': 'LAL'},
+                                content_type='application/json', headers=headers)
+
+    def test_large_bodies_are_compressed_for_clients_that_accept_it(self):
+        plain = self.predict()
+        compressed = self.predict(accept_encoding='gzip;q=0.8, identity')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(compressed.content)), json.loads(plain.content))
+
+        # Probabilities only is smaller than the coding overhead
+        small = self.predict(fields='', accept_encoding='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertEqual(set(json.loads(small.content)) & {'team1_stats', 'head_to_head'}, set())
+
+    def test_only_api_paths_are_compressed(self):
+        with self.settings(COMPRESSION_PATH_PREFIXES=['/other/']):
+            response = self.predict(accept_encoding='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(response.content)['winner'], json.loads(self.predict().content)['winner'])
+
+    def test_fields_select_the_optional_blocks(self):
+        body = json.loads(self.predict(fields='team1_stats, head_to_head').content)
+        self.assertEqual(set(body) & {'team1_stats', 'team2_stats', 'head_to_head'}, {'team1_stats', 'head_to_head'})
+        self.assertEqual(body['team1_stats'], json.loads(self.predict().content)['team1_stats'])
+
+        for fields, status, blocks in [(['team2_stats'], 200, {'team2_stats'}), ([], 200, set()),
+                                       (5, 400, None), (['team2_stats', 3], 400, None), ({'team1_stats': 1}, 400, None)]:
+            response = self.client.post('/api/predict_winner/', {'team1': 'BOS', 'team2': 'LAL', 'fields': fields},
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, status, fields)
+            if blocks is not None:
+                self.assertEqual(set(json.loads(response.content)) & set(OPTIONAL_FIELDS), blocks)
+
+    def test_numpy_scalars_and_spliced_fragments_encode_as_json(self):
+        payload = {'elo': np.float64(1500.5), 'wins': np.int64(3), 'home': np.bool_(True), 'last': np.array([1, 2])}
+        self.assertEqual(json.loads(dumps(payload)), {'elo': 1500.5, 'wins': 3, 'home': True, 'last': [1, 2]})
+
+        self.assertEqual(splice(payload, {}), dumps(payload))
+        self.assertEqual(json.loads(splice(payload, {'stats': b'{"elo":1500.5}'}))['stats'], {'elo': 1500.5})
+        self.assertEqual(json.loads(splice({}, {'stats': b'{}', 'h2h': b'[1]'})), {'stats': {}, 'h2h': [1]})
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_is_negotiated_and_matches_the_json_body(self):
+        payload = {f'key{i}': i for i in range(15)}
+        fragments = {'stats': msgpack.packb({'elo': 1500.5}), 'more': msgpack.packb([1, 2])}
+        self.assertEqual(msgpack.unpackb(splice_msgpack(payload, fragments)), json.loads(splice(payload, {
+            'stats': b'{"elo":1500.5}', 'more': b'[1,2]',
+        })))
+
+        packed = self.predict(accept='application/msgpack, application/json;q=0.5')
+        self.assertEqual(packed['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(packed.content), json.loads(self.predict(accept='application/json').content))
+
+
+class AdmissionControlTests(SimpleTestCase):
+    def setUp(self):
+        controller = admission.controller
+        admission.controller = admission.AdmissionController(concurrency=1, queue_size=1, timeout=0.05)
+        admission.recent.clear()
+        self.addCleanup(setattr, admission, 'controller', controller)
+        self.addCleanup(admission.recent.clear)
+
+    def predict(self, team1='BOS', team2='LAL'):
+        return self.client.post('/api/predict_winner/', {'team1': team1, 'team2': team2, 'tier': 'fast', 'fields': ''},
+                                content_type='application/json')
+
+    def test_full_queue_serves_stale_predictions_or_503(self):
+        fresh = self.predict().json()
+        self.assertNotIn('stale', fresh)
+
+        held, waiting = threading.Event(), threading.Event()
+
+        def hold_slot():
+            with admission.controller.admit():
+                held.set()
+                waiting.wait(5)
+
+        threads = [threading.Thread(target=hold_slot) for _ in range(2)]  # one running, one queued
+        for thread in threads:
+            thread.start()
+        held.wait(5)
+        while admission.controller.waiting < 1:
+            time.sleep(0.001)
+        try:
+            stale = self.predict().json()
+            unknown_pair = self.predict('LAL', 'BOS')
+        finally:
+            waiting.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertIs(stale['stale'], True)
+        self.assertEqual(stale['team1_win_probability'], fresh['team1_win_probability'])
+        self.assertEqual((unknown_pair.status_code, unknown_pair['Retry-After']), (503, '1'))
+        self.assertEqual(admission.controller.stats['rejected'], 2)
+
+    def test_waiters_past_the_deadline_are_turned_away(self):
+        with admission.controller.admit():
+            with self.assertRaises(admission.Overloaded):
+                with admission.controller.admit():
+                    pass
+        self.assertEqual(admission.controller.stats, {'admitted': 1, 'queued': 1, 'rejected': 0, 'timed_out': 1})
+        invalid = self.client.post('/api/predict_winner/', 'not json', content_type='application/json')
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(self.predict(team1=['BOS']).status_code, 400)
+
+
+class BacktestTests(SimpleTestCase):
+    def test_asof_features_only_use_earlier_games(self):
+        games = synthetic_games(40, seasons=('2023-24', '2024-25'))
+        code = {'BOS': 1, 'LAL': 2, 'NYK': 3, 'MIA': 4}
+        for side in ('team1', 'team2'):
+            # Season aggregates are one value per team and season, as in the CSV
+            games[f'{side}_fg_pct'] = (games[f'{side}_abbr'].map(code) + 10 * (games['season'] == '2024-25')) / 100
+        changed = games.copy()
+        changed.loc[30:, ['team1_score', 'team2_score', 'team1_fg_pct']] = [[150, 80, 0.9]] * 10
+        changed['winner'] = (changed['team1_score'] > changed['team2_score']).astype(int)
+
+        asof, asof_changed = asof_frame(games), asof_frame(changed)
+        pd.testing.assert_frame_equal(asof[model_columns()][:31], asof_changed[model_columns()][:31])
+
+        # BOS's wins going into each game are its wins in earlier games that season
+        season = games[games['season'] == '2024-25']
+        home, away = season['team1_abbr'] == 'BOS', season['team2_abbr'] == 'BOS'
+        won = np.where(home, season['winner'], 1 - season['winner'])[home | away]
+        asof_wins = np.where(home, asof.loc[season.index, 'team1_wins'], asof.loc[season.index, 'team2_wins'])
+        self.assertEqual(asof_wins[home | away].tolist(), np.concatenate([[0], np.cumsum(won)[:-1]]).tolist())
+        # Shooting comes from the previous season; the first season gets the league average
+        self.assertEqual(asof.loc[season.index, 'team1_fg_pct'].tolist(), (season['team1_abbr'].map(code) / 100).tolist())
+        self.assertEqual(asof.loc[:19, 'team1_fg_pct'].nunique(), 1)
+
+    def test_folds_train_only_on_earlier_periods(self):
+        dates = pd.to_datetime(synthetic_games(60)['game_date']).to_numpy()
+        folds = walk_forward_folds(dates, 'week', min_train=14, trees=5)
+        self.assertEqual(sum(len(fold['test']) for fold in folds), 60 - len(folds[0]['train']))
+        for fold in folds:
+            self.assertLess(dates[fold['train']].max(), dates[fold['test']].min())
+
+
+class PredictionScoringTests(LeagueFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_league()
+
+    def test_one_update_scores_finished_games_only(self):
+        home_win, away_win, scoreless, upcoming = self.add_games(4)  # every prediction picks the home team
+        Game.objects.filter(pk=away_win.pk).update(home_score=99, away_score=104)
+        Game.objects.filter(pk=scoreless.pk).update(home_score=0, away_score=0)
+        Game.objects.filter(pk=upcoming.pk).update(status='scheduled', home_score=None, away_score=None)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(GamePrediction.objects.update_accuracy(), 2)
+        self.assertEqual([query['sql'].split()[0] for query in queries.captured_queries], ['UPDATE'])
+
+        results = dict(GamePrediction.objects.values_list('game_id', 'is_correct'))
+        self.assertEqual(
+            [results[game.pk] for game in (home_win, away_win, scoreless, upcoming)], [True, False, None, None],
+        )
+
+    def test_finalize_games_scores_games_that_went_final(self):
+        header = pd.DataFrame([{
+            'GAME_ID': '0022400001', 'GAME_DATE_EST': '2024-10-22T00:00:00', 'GAME_STATUS_TEXT': '7:30 pm ET',
+            'HOME_TEAM_ID': self.home.nba_team_id, 'VISITOR_TEAM_ID': self.away.nba_team_id,
+        }])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(ingest_scoreboard_games(header, self.season), (1, []))
+            game = Game.objects.get(nba_game_id='0022400001')
+            GamePrediction.objects.create(
+                game=game, predicted_winner=self.away, home_win_probability=0.4, away_win_probability=0.6,
+            )
+
+            final = header.assign(GAME_STATUS_TEXT='Final', PTS_HOME=98, PTS_AWAY=103)
+            created, finished = ingest_scoreboard_games(final, self.season)
+            self.assertEqual((created, finished), (0, [game.pk]))
+            self.assertEqual(finalize_games(finished), 1)
+
+        game.refresh_from_db()
+        self.assertEqual((game.status, game.away_score), ('finished', 103))
+        self.assertIs(GamePrediction.objects.get(game=game).is_correct, True)
+
+
+@override_settings(SHADOW_MODELS_ENABLED=False)
+class SlateStreamTests(LeagueFixtureMixin, TestCase):
+    url = '/api/predictions/stream/'
+
+    def setUp(self):
+        self.create_league()
+        games = self.add_games(130, predictions=False)
+        Game.objects.filter(pk=games[-1].pk).update(away_team=Team.objects.create(
+            name='Unknowns', city='Nowhere', abbreviation='XXX', conference='East', division='Atlantic', nba_team_id=1,
+        ))
+
+    def stream(self, **params):
+        response = self.client.get(self.url, {'start': '2024-10-22', 'end': '2024-10-31', **params})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [[json.loads(line) for line in chunk.decode().splitlines()] for chunk in response.streaming_content]
+
+    def test_one_line_per_game_in_growing_batches(self):
+        chunks = self.stream()
+        self.assertEqual([len(chunk) for chunk in chunks], [8, 16, 32, 64, 10])
+        lines = [line for chunk in chunks for line in chunk]
+        self.assertEqual([line['game_id'] for line in lines], [f"00224{n:05d}" for n in range(130)])
+        self.assertEqual(lines[-1]['error'], 'Team data not found in cache')
+        self.assertTrue(all(line['winner'] in ('BOS', 'LAL') for line in lines[:-1]))
+
+    def test_elo_answers_when_no_model_is_loaded(self):
+        with patch.object(views, 'model', None), patch.object(views, 'linear_model', None):
+            lines = [line for chunk in self.stream(tier='fast') for line in chunk]
+        self.assertEqual({(line['model_type'], line['tier']) for line in lines[:-1]}, {('elo', 'fast')})
+        self.assertAlmostEqual(lines[0]['home_win_probability'] + lines[0]['away_win_probability'], 100)
+
+    def test_impossible_dates_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'start': '2025-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': '2025-02-03', 'end': '2025-02-01'}).status_code, 400)
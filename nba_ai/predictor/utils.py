@@ -1,12 +1,16 @@
 """
 NBA Data Collection Utilities
 """
+import importlib
+import threading
 import time
 from datetime import datetime, timedelta
 from django.utils import timezone
 from nba_api.stats.static import teams
 from nba_api.stats.endpoints import scoreboardv2, leaguegamefinder
-from .models import Team, Season, Game
+from .features import model_columns
+from .models import Team, Season, Game, GamePrediction, PredictionModel, ShadowPrediction
+from .ratings import update_ratings
 
 
 def setup_teams():
@@ -94,6 +98,100 @@ def setup_current_season():
     return season
 
 
+def ingest_scoreboard_games(games_data, season):
+    """Store one ScoreboardV2 GameHeader frame.
+
+    Returns (games_created, ids of games that went final in this frame).
+    """
+    games_created = 0
+    finished_game_ids = []
+
+    for _, game_data in games_data.iterrows():
+        try:
+            home_team = Team.objects.get(nba_team_id=game_data['HOME_TEAM_ID'])
+            away_team = Team.objects.get(nba_team_id=game_data['VISITOR_TEAM_ID'])
+
+            # Parse game date and time (the API sends '2024-10-22T00:00:00')
+            game_date_str = str(game_data['GAME_DATE_EST'])[:10]
+            game_time = game_data.get('GAMETIME_EST', '7:00 PM')
+
+            try:
+                # Combine date and time
+                datetime_str = f"{game_date_str} {game_time}"
+                game_datetime = datetime.strptime(datetime_str, '%Y-%m-%d %I:%M %p')
+            except ValueError:
+                # Fallback if time parsing fails
+                game_datetime = datetime.strptime(game_date_str, '%Y-%m-%d')
+
+            game_datetime = timezone.make_aware(game_datetime)
+
+            # Determine game status
+            status_text = str(game_data.get('GAME_STATUS_TEXT', '')).lower()
+            if 'final' in status_text:
+                status = 'finished'
+            elif any(word in status_text for word in ['q1', 'q2', 'q3', 'q4', 'ot', 'half']):
+                status = 'live'
+            else:
+                status = 'scheduled'
+
+            game, created = Game.objects.get_or_create(
+                nba_game_id=str(game_data['GAME_ID']),
+                defaults={
+                    'home_team': home_team,
+                    'away_team': away_team,
+                    'season': season,
+                    'game_date': game_datetime,
+                    'status': status,
+                    'home_score': game_data.get('PTS_HOME') if status == 'finished' else None,
+                    'away_score': game_data.get('PTS_AWAY') if status == 'finished' else None,
+                }
+            )
+
+            if created:
+                games_created += 1
+                score_info = ""
+                if game.home_score and game.away_score:
+                    score_info = f" ({game.away_score}-{game.home_score})"
+                print(f"   ✅ {game}{score_info}")
+                if status == 'finished':
+                    finished_game_ids.append(game.pk)
+            elif status == 'finished' and game.status != 'finished':
+                # Game was stored earlier as scheduled/live and has since gone final
+                game.status = status
+                game.home_score = game_data.get('PTS_HOME')
+                game.away_score = game_data.get('PTS_AWAY')
+                game.save(update_fields=['status', 'home_score', 'away_score', 'updated_at'])
+                finished_game_ids.append(game.pk)
+                print(f"   🏁 {game} ({game.away_score}-{game.home_score})")
+
+        except Team.DoesNotExist:
+            print(f"   ❌ Team not found for game {game_data['GAME_ID']}")
+            continue
+        except Exception as e:
+            print(f"   ❌ Error processing game: {e}")
+            continue
+
+    return games_created, finished_game_ids
+
+
+def attach_line_scores(games_data, line_scores):
+    """Copy final points from the LineScore frame onto GameHeader rows as PTS_HOME/PTS_AWAY"""
+    if games_data.empty or line_scores.empty or 'PTS_HOME' in games_data:
+        return games_data
+
+    points = {
+        (str(game_id), int(team_id)): pts
+        for game_id, team_id, pts in line_scores[['GAME_ID', 'TEAM_ID', 'PTS']].itertuples(index=False)
+    }
+    games_data = games_data.copy()
+    for column, team_column in (('PTS_HOME', 'HOME_TEAM_ID'), ('PTS_AWAY', 'VISITOR_TEAM_ID')):
+        games_data[column] = [
+            points.get((str(game_id), int(team_id)))
+            for game_id, team_id in zip(games_data['GAME_ID'], games_data[team_column])
+        ]
+    return games_data
+
+
 def get_recent_games(days=7):
     """Get games from recent days"""
     print(f"\n🎯 Fetching games from last {days} days...")
@@ -106,6 +204,7 @@ def get_recent_games(days=7):
 
     games_created = 0
     total_games_found = 0
+    finished_game_ids = []
 
     for days_ago in range(days):
         game_date = (timezone.now() - timedelta(days=days_ago)).date()
@@ -114,66 +213,15 @@ def get_recent_games(days=7):
         try:
             # Get scoreboard for the date
             board = scoreboardv2.ScoreboardV2(game_date=game_date.strftime('%m/%d/%Y'))
-            games_data = board.get_data_frames()[0]
+            games_data = attach_line_scores(board.game_header.get_data_frame(), board.line_score.get_data_frame())
 
             if not games_data.empty:
                 total_games_found += len(games_data)
                 print(f"   Found {len(games_data)} games")
 
-                for _, game_data in games_data.iterrows():
-                    try:
-                        home_team = Team.objects.get(nba_team_id=game_data['HOME_TEAM_ID'])
-                        away_team = Team.objects.get(nba_team_id=game_data['VISITOR_TEAM_ID'])
-
-                        # Parse game date and time
-                        game_date_str = game_data['GAME_DATE_EST']
-                        game_time = game_data.get('GAMETIME_EST', '7:00 PM')
-
-                        try:
-                            # Combine date and time
-                            datetime_str = f"{game_date_str} {game_time}"
-                            game_datetime = datetime.strptime(datetime_str, '%Y-%m-%d %I:%M %p')
-                        except ValueError:
-                            # Fallback if time parsing fails
-                            game_datetime = datetime.strptime(game_date_str, '%Y-%m-%d')
-
-                        game_datetime = timezone.make_aware(game_datetime)
-
-                        # Determine game status
-                        status_text = str(game_data.get('GAME_STATUS_TEXT', '')).lower()
-                        if 'final' in status_text:
-                            status = 'finished'
-                        elif any(word in status_text for word in ['q1', 'q2', 'q3', 'q4', 'ot', 'half']):
-                            status = 'live'
-                        else:
-                            status = 'scheduled'
-
-                        game, created = Game.objects.get_or_create(
-                            nba_game_id=str(game_data['GAME_ID']),
-                            defaults={
-                                'home_team': home_team,
-                                'away_team': away_team,
-                                'season': season,
-                                'game_date': game_datetime,
-                                'status': status,
-                                'home_score': game_data.get('PTS_HOME') if status == 'finished' else None,
-                                'away_score': game_data.get('PTS_AWAY') if status == 'finished' else None,
-                            }
-                        )
-
-                        if created:
-                            games_created += 1
-                            score_info = ""
-                            if game.home_score and game.away_score:
-                                score_info = f" ({game.away_score}-{game.home_score})"
-                            print(f"   ✅ {game}{score_info}")
-
-                    except Team.DoesNotExist:
-                        print(f"   ❌ Team not found for game {game_data['GAME_ID']}")
-                        continue
-                    except Exception as e:
-                        print(f"   ❌ Error processing game: {e}")
-                        continue
+                created_count, finished_ids = ingest_scoreboard_games(games_data, season)
+                games_created += created_count
+                finished_game_ids.extend(finished_ids)
             else:
                 print(f"   No games found for {game_date}")
 
@@ -185,6 +233,8 @@ def get_recent_games(days=7):
             time.sleep(1)
             continue
 
+    finalize_games(finished_game_ids)
+
     print(f"\n🎮 Games collection complete!")
     print(f"📊 Found {total_games_found} total games")
     print(f"✅ Created {games_created} new games")
@@ -192,6 +242,86 @@ def get_recent_games(days=7):
     return games_created
 
 
+def finalize_games(game_ids):
+    """Run downstream recomputation for games that just went final"""
+    if not game_ids:
+        return 0
+
+    scored = GamePrediction.objects.filter(game_id__in=game_ids).update_accuracy()
+    print(f"🎯 Scored {scored} predictions for {len(game_ids)} finished games")
+    shadow_scored = ShadowPrediction.objects.filter(game_id__in=game_ids).update_accuracy()
+    if shadow_scored:
+        print(f"👥 Scored {shadow_scored} shadow predictions")
+    rated = update_ratings(game_ids)
+    print(f"📈 Updated Elo ratings for {rated} games")
+    return scored
+
+
+_inference_lock = threading.Lock()
+
+
+def load_inference():
+    """predictor.inference, reloaded if its data or model file changed since it was loaded.
+
+    Imported here rather than at module level so that importing utils does
+    not load the training data and models.
+    """
+    from . import inference
+    with _inference_lock:
+        if inference.current_data_version() != inference.DATA_VERSION:
+            print("🔄 Model or training data changed, reloading")
+            importlib.reload(inference)
+    return inference
+
+
+def precompute_predictions(days=7):
+    """Store predictions for scheduled games in the next `days` days; returns how many"""
+    inference = load_inference()
+    now = timezone.now()
+    games = Game.objects.filter(
+        status='scheduled', game_date__gte=now, game_date__lt=now + timedelta(days=days),
+    ).values_list('pk', 'home_team_id', 'away_team_id', 'home_team__abbreviation', 'away_team__abbreviation')
+
+    rows = []
+    for pk, home_id, away_id, home, away in games:
+        home_idx, away_idx = inference.team_index(home), inference.team_index(away)
+        if home_idx is not None and away_idx is not None:
+            rows.append((pk, home_id, away_id, home_idx, away_idx))
+    if not rows:
+        print(f"🔮 No scheduled games with team data in the next {days} days")
+        return 0
+
+    home_rows, away_rows = [row[3] for row in rows], [row[4] for row in rows]
+    if inference.model is not None:
+        probabilities = inference.predict_proba(inference.feature_rows(home_rows, away_rows))[:, 1]
+        active = PredictionModel.objects.filter(is_active=True).values_list('version', flat=True).first()
+        version, features = active or inference.DATA_VERSION, model_columns(elo=inference.ELO_FEATURE)
+    else:
+        probabilities = inference.FEATURE_STORE.elo_probability(home_rows, away_rows)
+        version, features = 'elo', ['elo_win_prob']
+
+    existing = GamePrediction.objects.in_bulk([row[0] for row in rows], field_name='game_id')
+    created, updated = [], []
+    for (pk, home_id, away_id, _, _), home_prob in zip(rows, probabilities.tolist()):
+        prediction = existing.get(pk) or GamePrediction(game_id=pk)
+        prediction.predicted_winner_id = home_id if home_prob > 0.5 else away_id
+        prediction.home_win_probability = home_prob
+        prediction.away_win_probability = 1 - home_prob
+        prediction.confidence_score = max(home_prob, 1 - home_prob)
+        prediction.model_version = version
+        prediction.features_used = features
+        prediction.updated_at = now
+        (updated if prediction.pk else created).append(prediction)
+
+    GamePrediction.objects.bulk_create(created)
+    GamePrediction.objects.bulk_update(updated, [
+        'predicted_winner', 'home_win_probability', 'away_win_probability',
+        'confidence_score', 'model_version', 'features_used', 'updated_at',
+    ])
+    print(f"🔮 Precomputed {len(rows)} predictions ({len(created)} new) for the next {days} days")
+    return len(rows)
+
+
 def quick_setup():
     """Run complete quick setup"""
     print("🚀 === NBA Data Quick Setup ===\n")
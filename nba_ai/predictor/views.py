@@ -1,120 +1,116 @@
-from django.http import JsonResponse
+import base64
+import hashlib
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Count, Max, Q, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import quote_etag
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
-import pandas as pd
-import numpy as np
-import joblib
-import os
-from django.conf import settings
+from .encoding import FORMATS, EncodedJsonResponse, dumps, response_format
+from .inference import (
+    model, feature_rows, predict_proba, team_index, get_team_stats_json, get_team_stats_msgpack,
+    get_head_to_head_from_cache, linear_model, predict_fast, FEATURE_STORE, LINEAR_ELO_FEATURE,
+)
+from .models import Game, Team
+from .profiles import get_team_profile_json
+from . import admission, inference, shadow
 
-# Load cached training data and model once when server starts
-try:
-    training_data = pd.read_csv('nba_training_data.csv')
-    print(f"Loaded {len(training_data)} cached games")
-except:
-    training_data = None
-    print("No cached training data found")
-
-try:
-    model = joblib.load('nba_predictor_model.pkl')
-    print("ML Model loaded successfully")
-except:
-    model = None
-    print("ML Model not found")
-
-
-def get_team_stats_from_cache(team_abbr):
-    """Get team stats from cached data instead of API"""
-    if training_data is None:
-        return None
+# Streaming batches start small so the first lines leave immediately,
+# then double up to the cap to amortize model calls
+STREAM_FIRST_BATCH = 8
+STREAM_MAX_BATCH = 64
+STREAM_DEFAULT_DAYS = 31
+
+SCHEDULE_PAGE_SIZE = 100
+SCHEDULE_MAX_PAGE_SIZE = 500
+
+# Inference tiers: 'fast' is the linear model (or Elo), 'full' the forest
+TIERS = ['fast', 'full']
 
-    # Get all games where this team was team1
-    team1_games = training_data[training_data['team1_abbr'] == team_abbr]
-    # Get all games where this team was team2
-    team2_games = training_data[training_data['team2_abbr'] == team_abbr]
+# Optional blocks of a predict_winner response, selectable with `fields`
+OPTIONAL_FIELDS = ['team1_stats', 'team2_stats', 'head_to_head']
 
-    if team1_games.empty and team2_games.empty:
+
+def requested_fields(request, data):
+    """Optional response blocks asked for via `fields` (body or query string).
+
+    Missing means all of them; an empty value means probabilities only.
+    None if `fields` is neither a comma-separated string nor a list of strings.
+    """
+    fields = data.get('fields', request.GET.get('fields'))
+    if fields is None:
+        return OPTIONAL_FIELDS
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',')]
+    elif not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
         return None
+    return [field for field in OPTIONAL_FIELDS if field in fields]
 
-    # Use the most recent season data (last row)
-    if not team1_games.empty:
-        latest = team1_games.iloc[-1]
-        return {
-            'abbreviation': team_abbr,
-            'win_pct': latest['team1_win_pct'],
-            'wins': latest['team1_wins'],
-            'losses': latest['team1_losses'],
-            'recent_win_pct': latest['team1_recent_win_pct'],
-            'avg_pts': latest['team1_avg_pts'],
-            'avg_pts_allowed': latest['team1_avg_pts_allowed'],
-            'fg_pct': latest['team1_fg_pct'],
-            'fg3_pct': latest['team1_fg3_pct'],
-            'ft_pct': latest['team1_ft_pct'],
-            'off_reb': latest['team1_off_reb'],
-            'def_reb': latest['team1_def_reb'],
-            'turnovers': latest['team1_turnovers'],
-            'ast_to_to_ratio': latest['team1_ast_to_to_ratio']
-        }
-    else:
-        latest = team2_games.iloc[-1]
-        return {
-            'abbreviation': team_abbr,
-            'win_pct': latest['team2_win_pct'],
-            'wins': latest['team2_wins'],
-            'losses': latest['team2_losses'],
-            'recent_win_pct': latest['team2_recent_win_pct'],
-            'avg_pts': latest['team2_avg_pts'],
-            'avg_pts_allowed': latest['team2_avg_pts_allowed'],
-            'fg_pct': latest['team2_fg_pct'],
-            'fg3_pct': latest['team2_fg3_pct'],
-            'ft_pct': latest['team2_ft_pct'],
-            'off_reb': latest['team2_off_reb'],
-            'def_reb': latest['team2_def_reb'],
-            'turnovers': latest['team2_turnovers'],
-            'ast_to_to_ratio': latest['team2_ast_to_to_ratio']
-        }
-
-
-def get_head_to_head_from_cache(team1_abbr, team2_abbr):
-    """Get head-to-head record from cached data"""
-    if training_data is None:
-        return {'team1_wins': 0, 'team2_wins': 0, 'total': 0}
-
-    # Find all games between these teams
-    matchups = training_data[
-        ((training_data['team1_abbr'] == team1_abbr) & (training_data['team2_abbr'] == team2_abbr)) |
-        ((training_data['team1_abbr'] == team2_abbr) & (training_data['team2_abbr'] == team1_abbr))
-        ]
-
-    if matchups.empty:
-        return {'team1_wins': 0, 'team2_wins': 0, 'total': 0}
-
-    team1_wins = 0
-    team2_wins = 0
-
-    for _, game in matchups.iterrows():
-        if game['team1_abbr'] == team1_abbr:
-            if game['winner'] == 1:
-                team1_wins += 1
-            else:
-                team2_wins += 1
-        else:
-            if game['winner'] == 1:
-                team2_wins += 1
-            else:
-                team1_wins += 1
 
-    total = len(matchups)
+def requested_tier(request, data):
+    """'fast' or 'full' from `tier`, else from `latency_budget_ms`; None if either is invalid.
+
+    Budgets under settings.FULL_TIER_LATENCY_MS go to the fast tier.
+    """
+    tier = data.get('tier', request.GET.get('tier'))
+    budget = data.get('latency_budget_ms', request.GET.get('latency_budget_ms'))
+    if tier is None and budget is not None:
+        try:
+            budget = float(budget)
+        except (TypeError, ValueError):
+            return None
+        tier = 'fast' if budget < settings.FULL_TIER_LATENCY_MS else 'full'
+    tier = tier or 'full'
+    return tier if tier in TIERS else None
+
+
+def probability_payload(team1, team2, team1_prob, model_type, tier):
     return {
-        'team1_wins': team1_wins,
-        'team2_wins': team2_wins,
-        'total': total,
-        'team1_win_pct': team1_wins / total if total > 0 else 0.5,
-        'team2_win_pct': team2_wins / total if total > 0 else 0.5
+        'winner': team1 if team1_prob > 0.5 else team2,
+        'confidence': round(max(team1_prob, 1 - team1_prob) * 100, 1),
+        'model_type': model_type,
+        'tier': tier,
+        'team1_win_probability': round(team1_prob * 100, 1),
+        'team2_win_probability': round((1 - team1_prob) * 100, 1),
     }
 
 
+def query_date(value):
+    """A YYYY-MM-DD query value as a date, or None if it is malformed or not a real day"""
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def date_bounds(start, end):
+    """Aware [start 00:00, day after end 00:00) range, so game_date indexes apply"""
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    )
+
+
+def predict_matchup(team1, team2, team1_idx, team2_idx, tier):
+    """Probability payload for team1 at home against team2 from the requested tier's model"""
+    if tier == 'full' and model:
+        X = feature_rows(team1_idx, team2_idx)
+        team1_prob = float(predict_proba(X)[0][1])
+        shadow.submit(X, [team1_prob], [(team1, team2)])
+        return probability_payload(team1, team2, team1_prob, 'ML', 'full')
+    if linear_model is not None:
+        X = feature_rows(team1_idx, team2_idx, elo=LINEAR_ELO_FEATURE)
+        return probability_payload(team1, team2, float(predict_fast(X)[0]), 'linear', 'fast')
+    # Elo when neither trained model is loaded
+    team1_prob = float(FEATURE_STORE.elo_probability(team1_idx, team2_idx))
+    return probability_payload(team1, team2, team1_prob, 'elo', 'fast')
+
+
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
 def predict_winner(request):
@@ -123,94 +119,267 @@ def predict_winner(request):
         return JsonResponse({}, status=200)
     try:
         data = json.loads(request.body)
-        team1 = data.get('team1')
-        team2 = data.get('team2')
-
-        if not team1 or not team2:
-            return JsonResponse({'error': 'Both teams required'}, status=400)
-
-        # Get stats from cache
-        team1_stats = get_team_stats_from_cache(team1)
-        team2_stats = get_team_stats_from_cache(team2)
-
-        if not team1_stats or not team2_stats:
-            return JsonResponse({'error': 'Team data not found in cache'}, status=404)
-
-        # Get head-to-head
-        h2h = get_head_to_head_from_cache(team1, team2)
-
-        # Convert all numpy types to Python types
-        def convert_to_python(obj):
-            if isinstance(obj, dict):
-                return {k: convert_to_python(v) for k, v in obj.items()}
-            elif isinstance(obj, (np.integer, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float64)):
-                return float(obj)
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    team1 = data.get('team1')
+    team2 = data.get('team2')
+
+    if not team1 or not team2:
+        return JsonResponse({'error': 'Both teams required'}, status=400)
+    if not isinstance(team1, str) or not isinstance(team2, str):
+        return JsonResponse({'error': 'Teams must be abbreviations'}, status=400)
+
+    # Rows of the shared feature store
+    team1_idx, team2_idx = team_index(team1), team_index(team2)
+
+    if team1_idx is None or team2_idx is None:
+        return JsonResponse({'error': 'Team data not found in cache'}, status=404)
+
+    fields = requested_fields(request, data)
+    if fields is None:
+        return JsonResponse({'error': 'fields must be a comma-separated string or a list of strings'}, status=400)
+    tier = requested_tier(request, data)
+    if tier is None:
+        return JsonResponse({'error': "tier must be 'fast' or 'full' and latency_budget_ms a number"}, status=400)
+
+    try:
+        with admission.controller.admit():
+            payload = predict_matchup(team1, team2, team1_idx, team2_idx, tier)
+        admission.recent.store((team1, team2, tier), payload)
+    except admission.Overloaded as e:
+        # Shed load: the last answer for this matchup, else ask the client to come back
+        payload = admission.recent.stale((team1, team2, tier))
+        if payload is None:
+            response = JsonResponse({'error': str(e)}, status=503)
+            response['Retry-After'] = str(e.retry_after)
+            return response
+
+    # Team stat blocks were encoded once at load; splice them in as-is
+    body_format = response_format(request)
+    encode, splice_body, response_class = FORMATS[body_format]
+    stats_bytes = get_team_stats_msgpack if body_format == 'msgpack' else get_team_stats_json
+    fragments = {
+        'team1_stats': stats_bytes(team1) if 'team1_stats' in fields else None,
+        'team2_stats': stats_bytes(team2) if 'team2_stats' in fields else None,
+        'head_to_head': encode(get_head_to_head_from_cache(team1, team2)) if 'head_to_head' in fields else None,
+    }
+    response = response_class(splice_body(payload, {
+        field: fragment for field, fragment in fragments.items() if field in fields
+    }))
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def iter_batches(iterable, first=STREAM_FIRST_BATCH, largest=STREAM_MAX_BATCH):
+    """Group an iterable into lists of doubling size, capped at `largest`"""
+    batch, size = [], first
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch, size = [], min(size * 2, largest)
+    if batch:
+        yield batch
+
+
+def slate_payload(line, home_prob, model_type, tier):
+    return {
+        'winner': line['home_team'] if home_prob > 0.5 else line['away_team'],
+        'confidence': round(max(home_prob, 1 - home_prob) * 100, 1),
+        'model_type': model_type,
+        'tier': tier,
+        'home_win_probability': round(home_prob * 100, 1),
+        'away_win_probability': round((1 - home_prob) * 100, 1),
+    }
+
+
+def stream_predictions(games, tier='full'):
+    """Yield one NDJSON line per (nba_game_id, game_date, status, home, away) row"""
+    for batch in iter_batches(games):
+        lines, full, fast = [], [], []
+        for nba_game_id, game_date, status, home, away in batch:
+            line = {
+                'game_id': nba_game_id,
+                'game_date': game_date.isoformat(),
+                'status': status,
+                'home_team': home,
+                'away_team': away,
+            }
+            lines.append(line)
+
+            home_idx, away_idx = team_index(home), team_index(away)
+            if home_idx is None or away_idx is None:
+                line['error'] = 'Team data not found in cache'
+            elif tier == 'full' and model:
+                full.append((line, home_idx, away_idx))
+            elif linear_model is not None:
+                fast.append((line, home_idx, away_idx))
             else:
-                return obj
-
-        team1_stats = convert_to_python(team1_stats)
-        team2_stats = convert_to_python(team2_stats)
-        h2h = convert_to_python(h2h)
-
-        if model:
-            # Build feature array
-            season_features = [
-                team1_stats['win_pct'], team2_stats['win_pct'],
-                team1_stats['wins'], team2_stats['wins'],
-                team1_stats['losses'], team2_stats['losses'],
-                team1_stats['recent_win_pct'], team2_stats['recent_win_pct'],
-                team1_stats['avg_pts'], team2_stats['avg_pts'],
-                team1_stats['avg_pts_allowed'], team2_stats['avg_pts_allowed'],
-                team1_stats['fg_pct'], team2_stats['fg_pct'],
-                team1_stats['fg3_pct'], team2_stats['fg3_pct'],
-                team1_stats['ft_pct'], team2_stats['ft_pct'],
-                team1_stats['off_reb'], team2_stats['off_reb'],
-                team1_stats['def_reb'], team2_stats['def_reb'],
-                team1_stats['turnovers'], team2_stats['turnovers'],
-                team1_stats['ast_to_to_ratio'], team2_stats['ast_to_to_ratio'],
-                1, 0
-            ]
-
-            matchup_features = [
-                h2h['team1_win_pct'],
-                h2h['team2_win_pct']
-            ]
-
-            X = np.hstack([
-                np.array(season_features) * 0.9,
-                np.array(matchup_features) * 0.1
-            ]).reshape(1, -1)
-
-            prediction = model.predict(X)[0]
-            probabilities = model.predict_proba(X)[0]
-
-            winner = team1 if prediction == 1 else team2
-            confidence = float(max(probabilities) * 100)
-
-            return JsonResponse({
-                'winner': winner,
-                'confidence': round(confidence, 1),
-                'model_type': 'ML',
-                'team1_win_probability': round(float(probabilities[1]) * 100, 1),
-                'team2_win_probability': round(float(probabilities[0]) * 100, 1),
-                'team1_stats': team1_stats,
-                'team2_stats': team2_stats,
-                'head_to_head': h2h
-            })
-        else:
-            winner = team1 if team1_stats['win_pct'] > team2_stats['win_pct'] else team2
-            confidence = abs(team1_stats['win_pct'] - team2_stats['win_pct']) * 100
-
-            return JsonResponse({
-                'winner': winner,
-                'confidence': round(float(confidence), 1),
-                'model_type': 'rule-based',
-                'team1_stats': team1_stats,
-                'team2_stats': team2_stats,
-                'head_to_head': h2h
-            })
-
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+                line.update(slate_payload(line, float(FEATURE_STORE.elo_probability(home_idx, away_idx)), 'elo', 'fast'))
+
+        if full:
+            pending, home_rows, away_rows = zip(*full)
+            X = feature_rows(home_rows, away_rows)
+            probabilities = predict_proba(X)
+            shadow.submit(
+                X, probabilities[:, 1],
+                [(line['home_team'], line['away_team']) for line in pending],
+                [line['game_id'] for line in pending],
+            )
+            for line, home_prob in zip(pending, probabilities[:, 1]):
+                line.update(slate_payload(line, float(home_prob), 'ML', 'full'))
+        if fast:
+            pending, home_rows, away_rows = zip(*fast)
+            for line, home_prob in zip(pending, predict_fast(feature_rows(home_rows, away_rows, elo=LINEAR_ELO_FEATURE))):
+                line.update(slate_payload(line, float(home_prob), 'linear', 'fast'))
+
+        yield b''.join(dumps(line) + b'\n' for line in lines)
+
+
+@require_http_methods(["GET"])
+def stream_slate_predictions(request):
+    """Predictions for every game in [start, end] as newline-delimited JSON"""
+    start = query_date(request.GET['start']) if request.GET.get('start') else timezone.localdate()
+    if start is None:
+        return JsonResponse({'error': 'start and end must be YYYY-MM-DD with start <= end'}, status=400)
+    end = query_date(request.GET['end']) if request.GET.get('end') else start + timedelta(days=STREAM_DEFAULT_DAYS)
+    if end is None or end < start:
+        return JsonResponse({'error': 'start and end must be YYYY-MM-DD with start <= end'}, status=400)
+    tier = requested_tier(request, {})
+    if tier is None:
+        return JsonResponse({'error': "tier must be 'fast' or 'full' and latency_budget_ms a number"}, status=400)
+
+    lower, upper = date_bounds(start, end)
+    games = Game.objects.filter(
+        game_date__gte=lower,
+        game_date__lt=upper,
+    ).order_by('game_date', 'id').values_list(
+        'nba_game_id', 'game_date', 'status', 'home_team__abbreviation', 'away_team__abbreviation',
+    ).iterator(chunk_size=STREAM_MAX_BATCH)
+
+    response = StreamingHttpResponse(stream_predictions(games, tier), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def encode_cursor(game_date, pk):
+    return base64.urlsafe_b64encode(f"{game_date.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(game_date, pk) from encode_cursor(), or None if it is malformed"""
+    try:
+        game_date, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return parse_datetime(game_date), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+@require_http_methods(["GET"])
+def schedule(request):
+    """Games with their predictions, keyset-paginated on (game_date, id).
+
+    Query params: start, end (YYYY-MM-DD), team (abbreviation), limit, cursor.
+    Pages carry an ETag, so revalidating an unchanged page returns 304.
+    """
+    params = request.GET
+    games = Game.objects.all()
+
+    if params.get('start') or params.get('end'):
+        start = query_date(params['start']) if params.get('start') else None
+        end = query_date(params['end']) if params.get('end') else None
+        if (params.get('start') and start is None) or (params.get('end') and end is None):
+            return JsonResponse({'error': 'start and end must be YYYY-MM-DD'}, status=400)
+        if start:
+            games = games.filter(game_date__gte=date_bounds(start, start)[0])
+        if end:
+            games = games.filter(game_date__lt=date_bounds(end, end)[1])
+
+    if params.get('team'):
+        team_id = Team.objects.filter(abbreviation=params['team'].upper()).values_list('pk', flat=True).first()
+        if team_id is None:
+            return JsonResponse({'error': f"Unknown team {params['team']}"}, status=400)
+        games = games.filter(Q(home_team_id=team_id) | Q(away_team_id=team_id))
+
+    if params.get('cursor'):
+        position = decode_cursor(params['cursor'])
+        if position is None or position[0] is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        after_date, after_pk = position
+        games = games.filter(Q(game_date__gt=after_date) | Q(game_date=after_date, pk__gt=after_pk))
+
+    try:
+        limit = min(max(int(params.get('limit', SCHEDULE_PAGE_SIZE)), 1), SCHEDULE_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer'}, status=400)
+
+    # Revalidate on an aggregate over the page's keys before fetching any rows
+    page = games.order_by('game_date', 'pk').values('pk')[:limit + 1]
+    version = Game.objects.filter(pk__in=page).aggregate(
+        count=Count('pk'), pks=Sum('pk'), updated=Max('updated_at'),
+        predictions=Count('prediction'), predicted=Max('prediction__updated_at'),
+    )
+    has_more = version['count'] > limit
+    etag = quote_etag(hashlib.md5(repr(sorted(version.items())).encode()).hexdigest())
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    # Teams and the (optional) prediction come in through joins
+    rows = list(games.order_by('game_date', 'pk').values(
+        'pk', 'nba_game_id', 'game_date', 'status', 'home_score', 'away_score',
+        'home_team__abbreviation', 'away_team__abbreviation',
+        'prediction__predicted_winner__abbreviation', 'prediction__home_win_probability',
+        'prediction__away_win_probability', 'prediction__confidence_score',
+        'prediction__model_version', 'prediction__is_correct', 'prediction__updated_at',
+    )[:limit])
+
+    results = []
+    for row in rows:
+        prediction = None
+        if row['prediction__updated_at'] is not None:
+            prediction = {
+                'predicted_winner': row['prediction__predicted_winner__abbreviation'],
+                'home_win_probability': row['prediction__home_win_probability'],
+                'away_win_probability': row['prediction__away_win_probability'],
+                'confidence': row['prediction__confidence_score'],
+                'model_version': row['prediction__model_version'],
+                'is_correct': row['prediction__is_correct'],
+            }
+        results.append({
+            'game_id': row['nba_game_id'],
+            'game_date': row['game_date'].isoformat(),
+            'status': row['status'],
+            'home_team': row['home_team__abbreviation'],
+            'away_team': row['away_team__abbreviation'],
+            'home_score': row['home_score'],
+            'away_score': row['away_score'],
+            'prediction': prediction,
+        })
+
+    next_cursor = encode_cursor(rows[-1]['game_date'], rows[-1]['pk']) if has_more else None
+    response = EncodedJsonResponse(dumps({'results': results, 'next_cursor': next_cursor}))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_http_methods(["GET"])
+def team_profile(request, abbr):
+    """Precomputed season, split, form, head-to-head and odds profile for one team"""
+    body = get_team_profile_json(abbr.upper())
+    if body is None:
+        return JsonResponse({'error': 'Team data not found in cache'}, status=404)
+
+    etag = quote_etag(inference.DATA_VERSION)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = EncodedJsonResponse(body)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -1,42 +1,54 @@
+import argparse
+import json
+import os
+import shutil
+from collections import Counter
+from datetime import datetime
+
 import pandas as pd
 import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.metrics import accuracy_score, brier_score_loss, classification_report
 from sklearn.preprocessing import MinMaxScaler
 import joblib
-from predictor.matchup import get_matchup_data  # adjust path as needed
-
-def add_matchup_stats(df):
-    # Initialize matchup columns
-    df['team1_matchup_wins'] = 0
-    df['team2_matchup_wins'] = 0
-    df['matchup_total_games'] = 0
-
-    cache = {}
-
-    for idx, row in df.iterrows():
-        team1 = row['team1_abbr']
-        team2 = row['team2_abbr']
-        key = (team1, team2)
-
-        if key not in cache:
-            try:
-                cache[key] = get_matchup_data(team1, team2)
-            except Exception as e:
-                print(f"Error fetching matchup for {team1} vs {team2}: {e}")
-                cache[key] = None
-
-        stats = cache[key]
-
-        if stats:
-            df.at[idx, 'team1_matchup_wins'] = stats['head_to_head']['team1_wins']
-            df.at[idx, 'team2_matchup_wins'] = stats['head_to_head']['team2_wins']
-            df.at[idx, 'matchup_total_games'] = stats['head_to_head']['total_games']
-        else:
-            df.at[idx, 'team1_matchup_wins'] = 0
-            df.at[idx, 'team2_matchup_wins'] = 0
-            df.at[idx, 'matchup_total_games'] = 0
+from predictor.elo import EloEngine, expected_score, matchup_elo, HOME_ADVANTAGE
+from predictor.features import MATCHUP_COLUMNS, MATCHUP_WEIGHT, SEASON_WEIGHT, model_columns, season_columns
+from predictor.runreport import RunReport
+
+# Season stats features in model order (see predictor/features.py)
+SEASON_FEATURES = season_columns()
+
+MODEL_FILE = 'nba_predictor_model.pkl'
+LINEAR_MODEL_FILE = 'nba_predictor_linear.pkl'
+# Feature rows, holdout split, scaler and Elo/head-to-head state of the last run
+FEATURE_CACHE_FILE = 'nba_feature_cache.npz'
+# Every registered model version keeps its own file here
+MODEL_VERSIONS_DIR = 'models'
+
+
+def pair_wins(df):
+    """Counter of (winner, loser) -> games won over df"""
+    team1_won = (df['team1_score'] > df['team2_score']).to_numpy()
+    team1, team2 = df['team1_abbr'].to_numpy(), df['team2_abbr'].to_numpy()
+    return Counter(zip(np.where(team1_won, team1, team2).tolist(), np.where(team1_won, team2, team1).tolist()))
+
+
+def head_to_head_counts(df, wins=None):
+    """(team1 wins, team2 wins, meetings) against each other for every row's pair, over all of df
+    or the given pair_wins() counts"""
+    wins = pair_wins(df) if wins is None else wins
+    pairs = list(zip(df['team1_abbr'], df['team2_abbr']))
+    team1_wins = np.array([wins.get((team1, team2), 0) for team1, team2 in pairs], dtype=int)
+    team2_wins = np.array([wins.get((team2, team1), 0) for team1, team2 in pairs], dtype=int)
+    return team1_wins, team2_wins, team1_wins + team2_wins
+
+
+def add_matchup_stats(df, wins=None):
+    """Head-to-head record of each row's two teams over every game in df (or the given wins)"""
+    df['team1_matchup_wins'], df['team2_matchup_wins'], df['matchup_total_games'] = head_to_head_counts(df, wins)
 
     # Calculate matchup win percentages safely
     df['team1_matchup_win_pct'] = np.where(
@@ -53,79 +65,340 @@ def add_matchup_stats(df):
     return df
 
 
-if __name__ == "__main__":
-    print("Loading training data...")
-    df = pd.read_csv('nba_training_data.csv')
-    print(f"Loaded {len(df)} games")
-
-    print("Adding matchup data...")
-    df = add_matchup_stats(df)
-    
-
-    # List of season stats features to use
-    season_features = [
-        # Win/Loss
-        'team1_win_pct', 'team2_win_pct', #'win_pct_diff',
-        'team1_wins', 'team2_wins', #'wins_diff', #'wins_diff',
-        'team1_losses', 'team2_losses', #'losses_diff', #'losses_diff',
-
-        # Recent performance
-        'team1_recent_win_pct', 'team2_recent_win_pct', #'recent_win_pct_diff',
-
-        # Scoring
-        'team1_avg_pts', 'team2_avg_pts', #'avg_pts_diff',
-        'team1_avg_pts_allowed', 'team2_avg_pts_allowed', #'avg_pts_allowed_diff',
-
-        # Shooting
-        'team1_fg_pct', 'team2_fg_pct', #'fg_pct_diff',
-        'team1_fg3_pct', 'team2_fg3_pct', #'fg3_pct_diff',
-        'team1_ft_pct', 'team2_ft_pct', #'ft_pct_diff',
-
-        # Rebounding
-        'team1_off_reb', 'team2_off_reb', #'off_reb_diff',
-        'team1_def_reb', 'team2_def_reb', #'def_reb_diff',
-
-        # Ball control
-        'team1_turnovers', 'team2_turnovers', #'turnovers_diff',
-        'team1_ast_to_to_ratio', 'team2_ast_to_to_ratio', #'ast_to_to_ratio_diff',
+def add_elo_features(df, engine=None):
+    """Pre-game Elo ratings and team1's Elo win probability, replayed in date order
+    (continuing from engine's ratings when given; the engine is left after df's last game)"""
+    df['team1_elo'], df['team2_elo'], _ = matchup_elo(df, engine)
+    home_edge = np.where(df['team1_home'] == 1, HOME_ADVANTAGE, -HOME_ADVANTAGE)
+    df['elo_win_prob'] = expected_score(df['team1_elo'], df['team2_elo'], home_edge)
+    return df
 
-        # Home/Away
-        'team1_home', 'team2_home'
-    ]
 
+def build_feature_matrix(df):
+    """Scaled, weighted feature matrix and labels for a frame of matchup rows"""
     # Extract season stats features
-    X_season = df[season_features].values
+    X_season = df[SEASON_FEATURES].values
 
     # Normalize season features between 0 and 1
     scaler = MinMaxScaler()
     X_season_scaled = scaler.fit_transform(X_season)
 
     # Extract matchup head-to-head features
-    X_h2h = df[['team1_matchup_win_pct', 'team2_matchup_win_pct']].values
+    X_h2h = df[MATCHUP_COLUMNS].values
 
     # Combine with weighted scheme: 90% season stats, 10% matchup stats
     X = np.hstack([
-        X_season_scaled * 0.9,
-        X_h2h * 0.1
+        X_season_scaled * SEASON_WEIGHT,
+        X_h2h * MATCHUP_WEIGHT
     ])
 
     y = df['winner'].values
+    return X, y, scaler
+
+
+def fit_linear_tier(X_train, y_train, scaler):
+    """Platt-calibrated logistic regression folded into one weight vector.
+
+    The MinMax scaling and the 0.9 season weight are folded into the
+    coefficients, so serving applies it to the unscaled feature row that
+    inference.feature_rows assembles: P(team1 wins) = sigmoid(x . coef + intercept).
+    """
+    calibrated = CalibratedClassifierCV(LogisticRegression(max_iter=1000), method='sigmoid', cv=5, ensemble=False)
+    calibrated.fit(X_train, y_train)
+    fitted = calibrated.calibrated_classifiers_[0]
+    logistic, platt = fitted.estimator, fitted.calibrators[0]
+
+    # Platt: p = 1 / (1 + exp(a * f + b)) with f = w . x + w0
+    weights = -platt.a_ * logistic.coef_[0]
+    intercept = -(platt.a_ * logistic.intercept_[0] + platt.b_)
+
+    # Training rows are 0.9 * (raw * scale_ + min_); serving rows are 0.9 * raw
+    n_season = len(scaler.scale_)
+    intercept += float(np.dot(weights[:n_season], SEASON_WEIGHT * scaler.min_))
+    weights[:n_season] = weights[:n_season] * scaler.scale_
+
+    return {
+        'coef': weights.astype(float),
+        'intercept': float(intercept),
+        'n_features': len(weights),
+        'features': model_columns(),
+    }
+
+
+def serving_rows(X, scaler):
+    """Scaled training rows converted back to the unscaled rows served at prediction time"""
+    n_season = len(scaler.scale_)
+    return np.hstack([SEASON_WEIGHT * scaler.inverse_transform(X[:, :n_season] / SEASON_WEIGHT), X[:, n_season:]])
+
+
+def game_keys(df):
+    """One key per training row: game date and both teams"""
+    return (df['game_date'].astype(str) + '|' + df['team1_abbr'] + '|' + df['team2_abbr']).to_numpy(dtype=str)
+
+
+def row_digests(df):
+    """Hash of every CSV column of each row, so re-collected rows with changed stats are noticed"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def scale_rows(df, scaler_min, scaler_scale):
+    """build_feature_matrix() rows for df with an already fitted MinMax scaling"""
+    X_season = df[SEASON_FEATURES].values * scaler_scale + scaler_min
+    return np.hstack([X_season * SEASON_WEIGHT, df[MATCHUP_COLUMNS].values * MATCHUP_WEIGHT])
+
+
+def feature_cache(keys, digests, dates, X, y, is_test, scaler_min, scaler_scale, engine, wins):
+    """Everything an incremental run needs to extend the feature matrix without rebuilding it"""
+    return {
+        'keys': keys, 'digests': digests, 'dates': np.asarray(dates, dtype=str),
+        'X': X, 'y': y, 'is_test': is_test,
+        'scaler_min': scaler_min, 'scaler_scale': scaler_scale,
+        'engine': engine, 'wins': wins,
+    }
+
+
+def save_feature_cache(cache, path=FEATURE_CACHE_FILE):
+    engine = cache['engine']
+    np.savez(
+        path,
+        **{name: cache[name] for name in ('keys', 'digests', 'dates', 'X', 'y', 'is_test', 'scaler_min', 'scaler_scale')},
+        elo=json.dumps({'ratings': engine.ratings, 'season': engine.season}),
+        wins=json.dumps([[winner, loser, n] for (winner, loser), n in cache['wins'].items()]),
+    )
+
+
+def load_feature_cache(path=FEATURE_CACHE_FILE):
+    """The saved feature cache, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        cache = {name: data[name] for name in data.files if name not in ('elo', 'wins')}
+        elo, wins = json.loads(str(data['elo'])), json.loads(str(data['wins']))
+    cache['engine'] = EloEngine(elo['ratings'])
+    cache['engine'].season = elo['season']
+    cache['wins'] = Counter({(winner, loser): n for winner, loser, n in wins})
+    return cache
+
+
+def update_feature_cache(df, cache):
+    """(cache for df, mask of df rows that are new games) reusing the cached rows.
+
+    Only new games get Elo and head-to-head features, continuing from the
+    cached ratings and counts (games older than the cache are applied on
+    top, as ratings.update_ratings does). Cached games keep their Elo and
+    head-to-head features; if their CSV row changed, only the season stat
+    columns are refreshed. Everything uses the cached scaling, so the work
+    grows with the number of new games.
+    """
+    keys, digests = game_keys(df), row_digests(df)
+    position = {key: i for i, key in enumerate(cache['keys'].tolist())}
+    cached = np.array([position.get(key, -1) for key in keys.tolist()], dtype=int)
+    new = cached < 0
+    known = ~new
+    changed = known & (digests != cache['digests'][np.maximum(cached, 0)])
+
+    X = np.empty((len(df), cache['X'].shape[1]))
+    X[known] = cache['X'][cached[known]]
+    is_test = np.zeros(len(df), dtype=bool)
+    is_test[known] = cache['is_test'][cached[known]]
+
+    stat_columns = season_columns(elo=False)
+    n_stats = len(stat_columns)
+    if changed.any():
+        X[changed, :n_stats] = SEASON_WEIGHT * (
+            df.loc[changed, stat_columns].values * cache['scaler_scale'][:n_stats] + cache['scaler_min'][:n_stats]
+        )
+
+    engine, wins = cache['engine'], Counter(cache['wins'])
+    if new.any():
+        fresh = df[new].copy()
+        wins.update(pair_wins(fresh))
+        fresh = add_elo_features(add_matchup_stats(fresh, wins), engine)
+        X[new] = scale_rows(fresh, cache['scaler_min'], cache['scaler_scale'])
+
+    return feature_cache(
+        keys, digests, df['game_date'], X, df['winner'].values, is_test,
+        cache['scaler_min'], cache['scaler_scale'], engine, wins,
+    ), new
+
+
+def grow_forest(model, X, y, trees, max_trees):
+    """Add `trees` trees fit on X, y to a fitted forest, then drop the oldest beyond max_trees"""
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + trees)
+    model.fit(X, y)
+    model.estimators_ = model.estimators_[-max_trees:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return model
+
+
+def save_model_version(model, version):
+    """Write the model to its versioned file; returns the path"""
+    os.makedirs(MODEL_VERSIONS_DIR, exist_ok=True)
+    path = os.path.join(MODEL_VERSIONS_DIR, f"nba_predictor_model.{version}.pkl")
+    joblib.dump(model, path)
+    return path
+
+
+def register_model_version(path, version, accuracy, dates, trees):
+    """Record a saved model as the active PredictionModel version"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nba_ai.settings')
+    import django
+    django.setup()
+    from django.db import transaction
+    from predictor.models import PredictionModel
+
+    dates = pd.to_datetime(dates)
+    with transaction.atomic():
+        PredictionModel.objects.filter(is_active=True).update(is_active=False)
+        record = PredictionModel.objects.create(
+            name=f"random-forest-{version}", version=version, algorithm=f"Random Forest ({trees} trees)",
+            model_file_path=os.path.abspath(path), accuracy=accuracy,
+            training_data_start=dates.min().date(), training_data_end=dates.max().date(),
+            features_used=model_columns(), is_active=True,
+        )
+    print(f"Registered model version {record.version}")
+    return record
+
+
+def train_full(df, report, args):
+    """Rebuild every feature and fit the forest and the fast tier from scratch"""
+    keys, digests = game_keys(df), row_digests(df)
+
+    print("Adding matchup data...")
+    with report.stage('matchup_features'):
+        df = add_matchup_stats(df)
+    engine = EloEngine()
+    with report.stage('elo_features'):
+        df = add_elo_features(df, engine)
+
+
+    X, y, scaler = build_feature_matrix(df)
 
     print("\nSplitting dataset...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = X[train_idx], X[test_idx], y[train_idx], y[test_idx]
 
     print("\nTraining model...")
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    with report.stage('fit', rows=len(X_train), features=X.shape[1]):
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X_train, y_train)
 
     print("\nEvaluating model...")
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
+    with report.stage('evaluate', rows=len(X_test)) as stage:
+        y_pred = model.predict(X_test)
+        accuracy = accuracy_score(y_test, y_pred)
+        stage['accuracy'] = round(accuracy, 4)
 
     print(f"Model Accuracy: {accuracy:.3f}")
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
 
     print("\nSaving model...")
-    joblib.dump(model, 'nba_predictor_model.pkl')
-    print("Model saved to nba_predictor_model.pkl")
+    with report.stage('save'):
+        joblib.dump(model, MODEL_FILE)
+        is_test = np.zeros(len(X), dtype=bool)
+        is_test[test_idx] = True
+        save_feature_cache(feature_cache(
+            keys, digests, df['game_date'], X, y, is_test, scaler.min_, scaler.scale_, engine, pair_wins(df),
+        ))
+    print(f"Model saved to {MODEL_FILE}")
+    if args.register:
+        version = datetime.now().strftime('%Y%m%d.%H%M%S')
+        register_model_version(save_model_version(model, version), version, accuracy, df['game_date'], len(model.estimators_))
+
+    print("\nTraining fast tier (calibrated logistic regression)...")
+    with report.stage('fit_linear', rows=len(X_train)):
+        linear = fit_linear_tier(X_train, y_train, scaler)
+    with report.stage('evaluate_linear', rows=len(X_test)) as stage:
+        z = serving_rows(X_test, scaler) @ linear['coef'] + linear['intercept']
+        linear_prob = 1 / (1 + np.exp(-z))
+        stage['accuracy'] = round(accuracy_score(y_test, linear_prob > 0.5), 4)
+    print(f"Linear Accuracy: {stage['accuracy']:.3f}")
+    print(f"Linear Brier score: {brier_score_loss(y_test, linear_prob):.4f} "
+          f"(forest {brier_score_loss(y_test, model.predict_proba(X_test)[:, 1]):.4f})")
+    with report.stage('save_linear'):
+        joblib.dump(linear, LINEAR_MODEL_FILE)
+    print(f"Linear model saved to {LINEAR_MODEL_FILE}")
+
+    report.details.update(mode='full', games=len(df), accuracy=round(accuracy, 4))
+
+
+def train_incremental(df, cache, report, args):
+    """Grow the saved forest with trees fit on games that are not in the feature cache.
+
+    The new trees see the new games plus the newest `window` training rows;
+    the holdout rows of the last full run stay the holdout. The fast tier is
+    left as it is until the next full run.
+    """
+    with report.stage('update_features') as stage:
+        cache, new = update_feature_cache(df, cache)
+        stage['new_games'] = int(new.sum())
+    X, y, is_test = cache['X'], cache['y'], cache['is_test']
+    print(f"{new.sum()} new games since the last run")
+    if not new.any():
+        save_feature_cache(cache)
+        report.details.update(mode='incremental', games=len(df), new_games=0)
+        return
+
+    model = joblib.load(MODEL_FILE)
+    with report.stage('prequential', rows=int(new.sum())) as stage:
+        # The current model has not seen these games yet
+        stage['accuracy'] = round(accuracy_score(y[new], model.predict(X[new])), 4)
+    print(f"Accuracy on the new games before updating: {stage['accuracy']:.3f}")
+
+    earlier = np.flatnonzero(~is_test & ~new)
+    window = earlier[np.argsort(cache['dates'][earlier], kind='stable')[-args.window:]]
+    fit_idx = np.concatenate([np.flatnonzero(new), window])
+    print(f"\nAdding {args.trees} trees on {len(fit_idx)} rows...")
+    with report.stage('fit', rows=len(fit_idx), features=X.shape[1]) as stage:
+        grow_forest(model, X[fit_idx], y[fit_idx], args.trees, args.max_trees)
+        stage['trees'] = len(model.estimators_)
+
+    with report.stage('evaluate', rows=int(is_test.sum())) as stage:
+        accuracy = accuracy_score(y[is_test], model.predict(X[is_test]))
+        stage['accuracy'] = round(accuracy, 4)
+    print(f"Model Accuracy: {accuracy:.3f} ({len(model.estimators_)} trees)")
+
+    version = datetime.now().strftime('%Y%m%d.%H%M%S')
+    with report.stage('save'):
+        path = save_model_version(model, version)
+        register_model_version(path, version, accuracy, df['game_date'], len(model.estimators_))
+        # Only a registered increment is served and moves the cache forward
+        shutil.copyfile(path, MODEL_FILE)
+        save_feature_cache(cache)
+    print(f"Model saved to {path} and {MODEL_FILE}")
+
+    report.details.update(mode='incremental', games=len(df), new_games=int(new.sum()),
+                          trees=len(model.estimators_), accuracy=round(accuracy, 4))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the game outcome models from nba_training_data.csv")
+    parser.add_argument('--incremental', action='store_true',
+                        help='add trees for games not seen by the last run instead of retraining')
+    parser.add_argument('--trees', type=int, default=10, help='trees added by an incremental run')
+    parser.add_argument('--max-trees', type=int, default=150, help='the oldest trees beyond this are dropped')
+    parser.add_argument('--window', type=int, default=500,
+                        help='newest earlier training rows the added trees see besides the new games')
+    parser.add_argument('--register', action='store_true',
+                        help='also register a full run as the active PredictionModel (incremental runs always are)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak traced allocations per stage in the run report (slows the run down)')
+    args = parser.parse_args()
+
+    report = RunReport('train_model', MODEL_FILE, trace_memory=args.trace_memory)
+
+    print("Loading training data...")
+    with report.stage('load') as stage:
+        df = pd.read_csv('nba_training_data.csv')
+        stage['rows'] = len(df)
+    print(f"Loaded {len(df)} games")
+
+    cache = load_feature_cache() if args.incremental else None
+    if args.incremental and (cache is None or not os.path.exists(MODEL_FILE)):
+        print(f"⚠️ No {FEATURE_CACHE_FILE} or {MODEL_FILE} yet, training from scratch")
+    if cache is not None and os.path.exists(MODEL_FILE):
+        train_incremental(df, cache, report, args)
+    else:
+        train_full(df, report, args)
+    report.save()